@@ -553,7 +553,7 @@ class Agent:
         # Migrate memory/events/fmm
         try:
             new_dir = agent_dir(self.agent_id)
-            for fname in ("memory.jsonl", "events.jsonl", "fmm.json"):
+            for fname in ("memory.jsonl", "events.jsonl", "fmm.json", "fmm.wal.jsonl"):
                 src = old_dir / fname
                 dst = new_dir / fname
                 if src.exists() and not dst.exists():
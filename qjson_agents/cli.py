@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import copy
+import functools
+import hashlib
+import heapq
+import io
 import json
 import sys
 from pathlib import Path
 import os
-from typing import Any, Dict, List, Tuple
-from urllib import request as _urlreq, error as _urlerr
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 from .agent import Agent
 from .qjson_types import load_manifest, save_manifest, scan_personas, find_persona
-from .yson import yson_to_manifest, yson_to_swarm, synthesize_manifest_from_yson_name, load_yson
+from .yson import yson_to_manifest, yson_to_swarm, yson_manifest_synthesizer, load_yson
 from .memory import (
     agent_dir,
     ensure_agent_dirs,
@@ -18,18 +23,37 @@ from .memory import (
     load_cluster_index,
     refresh_cluster_index,
     load_router_weights,
-    save_router_weights,
+    append_router_weights_delta,
     agents_home,
+    append_jsonl,
+    tail_jsonl,
+    iter_jsonl,
+    JsonlBatcher,
+    _now_ts,
 )
 from .ollama_client import OllamaClient
-from .plugin_manager import load_plugins
-from .web_crawler import Crawler
-from .web_indexer import upsert_outline
+from .plugin_manager import PluginPolicy, load_plugins
 import time
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 import math
 import random
+import re
+import threading
+from collections import ChainMap, Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # type: ignore
+except Exception:  # optional dependency
+    orjson = None  # type: ignore
+
+try:
+    import re2  # type: ignore
+except Exception:  # optional dependency (linear-time DFA matcher)
+    re2 = None  # type: ignore
 
 
 def _print(s: str) -> None:
@@ -37,6 +61,240 @@ def _print(s: str) -> None:
     sys.stdout.flush()
 
 
+def _dumps(obj: Any, *, indent: bool = False) -> str:
+    """Serialize obj to JSON text (orjson when available), compact unless indent."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+        except TypeError:
+            pass
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _dumpb(obj: Any, *, indent: bool = False) -> bytes:
+    """Like _dumps but returns UTF-8 bytes, skipping the str round trip under orjson."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass
+    return _dumps(obj, indent=indent).encode("utf-8")
+
+
+_loads: Callable[[Any], Any] = orjson.loads if orjson is not None else json.loads
+
+
+@contextlib.contextmanager
+def _env_override(values: Dict[str, Any]) -> Iterator[None]:
+    """Temporarily set environment variables (None unsets), restoring on exit."""
+    saved = {k: os.environ.get(k) for k in values}
+
+    def _apply(vals: Dict[str, Any]) -> None:
+        for k, v in vals.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = str(v)
+
+    _apply(values)
+    try:
+        yield
+    finally:
+        _apply(saved)
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message/traceback formatting to the listener thread.
+
+    The stock ``prepare`` renders records in the caller so they survive
+    pickling; an in-process queue does not need that.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _queued_file_logger(name: str, path: Path) -> Tuple[logging.Logger, logging.handlers.QueueListener]:
+    """DEBUG logger whose records are written to path by a background listener.
+
+    Hot loops only enqueue records; call ``_stop_file_logger(listener)`` to
+    drain the queue and close the file.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    # Reset handlers to avoid duplicates on multiple invocations
+    logger.handlers.clear()
+    fh = logging.FileHandler(path, encoding="utf-8")
+    fh.setLevel(logging.DEBUG)
+    fh.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(_InProcessQueueHandler(q))
+    listener = logging.handlers.QueueListener(q, fh, respect_handler_level=True)
+    listener.start()
+    return logger, listener
+
+
+def _stop_file_logger(listener: logging.handlers.QueueListener) -> None:
+    listener.stop()
+    for h in listener.handlers:
+        h.close()
+
+
+def _read_all(path: Path) -> bytes:
+    """Read a whole file through unbuffered FileIO (one fstat-sized read, no buffer copy)."""
+    with open(os.fspath(path), "rb", buffering=0) as f:
+        return f.read()
+
+
+def _load_json_file(path: Path) -> Any:
+    """Parse a JSON file straight from bytes (orjson when available)."""
+    return _loads(_read_all(path))
+
+
+def _write_file_bytes(path: Path, data: bytes) -> None:
+    """Write data to path with raw os.write calls (no Python-level buffer copy)."""
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+_YSON_SUFFIXES = frozenset((".yson", ".ysonx"))
+
+
+@functools.lru_cache(maxsize=64)
+def _load_manifest_cached(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a manifest once per (path, mtime_ns, size); callers get copies."""
+    p = Path(path_str)
+    if p.suffix.lower() in _YSON_SUFFIXES:
+        return yson_to_manifest(p)
+    return load_manifest(p)
+
+
+def _read_manifest(path: Path, *, use_cache: bool = True) -> Dict[str, Any]:
+    """Load a JSON/YSON manifest, memoized on file identity.
+
+    Returns a deep copy so callers may freely mutate ``agent_id``/``runtime``.
+    """
+    if not use_cache:
+        _load_manifest_cached.cache_clear()
+        if path.suffix.lower() in _YSON_SUFFIXES:
+            return yson_to_manifest(path)
+        return load_manifest(path)
+    rp = path.resolve()
+    st = rp.stat()
+    return copy.deepcopy(_load_manifest_cached(str(rp), st.st_mtime_ns, st.st_size))
+
+
+def _try_read_manifest(path: Path | None, *, use_cache: bool = True) -> Dict[str, Any] | None:
+    """Like _read_manifest, but None when no path is given or the file is missing.
+
+    Lets callers skip a separate exists() probe before loading.
+    """
+    if path is None:
+        return None
+    try:
+        return _read_manifest(path, use_cache=use_cache)
+    except FileNotFoundError:
+        return None
+
+
+# Completion markers that end a semi-autonomous run ("task completed" included)
+_SEMI_DONE_RE = re.compile(r"task complete|summary complete", re.IGNORECASE)
+
+
+# Role keywords that make an agent the default cluster summarizer (substring match)
+_SUMMARIZER_RE = re.compile(r"observer|coordinator|weaver|summarizer", re.IGNORECASE)
+
+
+# Process-wide /api/tags results, keyed by client type + base URL
+_TAGS_TTL_SEC = 30.0
+_TAGS_CACHE: Dict[Tuple[Any, str], Tuple[float, Any]] = {}
+
+
+def _cached_tags(client: Any, *, ttl: float = _TAGS_TTL_SEC, refresh: bool = False) -> Any:
+    """Return client.tags(), reusing a result fetched within the last ttl seconds."""
+    key = (type(client), str(getattr(client, "base_url", id(client))))
+    if refresh:
+        _TAGS_CACHE.pop(key, None)
+    now = time.monotonic()
+    hit = _TAGS_CACHE.get(key)
+    if hit is not None and ttl > 0 and now - hit[0] < ttl:
+        return hit[1]
+    models = client.tags()
+    if ttl > 0:
+        _TAGS_CACHE[key] = (now, models)
+    return models
+
+
+# Runs of alphanumerics; equivalent to mapping every other non-space char to " " and splitting
+_ALNUM_RUN_RE = re.compile(r"[^\W_]+")
+# Goal-template placeholders; substituted in one pass. Other braces in the
+# template are left alone (unlike str.format), so literal JSON stays intact.
+_GOAL_PLACEHOLDER_RE = re.compile(r"\{(agent_id|roles|index)\}")
+# Fallback "agents: [a, b]" scrape for YSON swarms the parser returns no agents for.
+# The negated class spans newlines without DOTALL and never backtracks; re2 if installed.
+_YSON_AGENTS_LIST_RE = (re2 or re).compile(r"agents\s*:\s*\[([^\]]*)\]")
+
+
+def _write_cluster_transcript(path: Path, header: str, events_path: Path) -> None:
+    """Write the human-readable cluster transcript through a large write buffer."""
+    with path.open("w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(header)
+        f.write("\n--- Dialogues ---\n")
+        for e in iter_jsonl(events_path):
+            if "reply" not in e:
+                continue
+            t = e.get("type")
+            if t == "handoff":
+                f.write(f"[tick {e.get('tick')}] handoff {e.get('from')} -> {e.get('to')}\n")
+            elif t == "broadcast":
+                f.write(f"[tick {e.get('tick')}] broadcast -> {e.get('to')}\n")
+            elif t == "moe":
+                f.write(f"[tick {e.get('tick')}] moe expert {e.get('expert')}\n")
+            elif t == "aggregate":
+                f.write(f"[tick {e.get('tick')}] aggregate by {e.get('summarizer')}\n")
+            if "prompt" in e:
+                f.write(f"  prompt: {e.get('prompt').strip()}\n")
+            f.write(f"  reply: {str(e.get('reply')).strip()}\n\n")
+
+
+def _trim_sentences(text: str, n: int) -> str:
+    """Keep the first n ". "-separated sentences (with their period); scan, don't split."""
+    idx = 0
+    for _ in range(n):
+        j = text.find(". ", idx)
+        if j < 0:
+            return text
+        idx = j + 2
+    return text[: idx - 1].strip()
+
+
+def _write_run_summary(path: Path, summary: Dict[str, Any], events_path: Path) -> None:
+    """Write a run summary JSON whose "events" array is spliced from an NDJSON file.
+
+    Events are copied line by line, so the run never needs them all in memory.
+    """
+    head = _dumps(summary)
+    with path.open("wb") as f:
+        f.write((head[:-1] + (', "events": [' if summary else '"events": [')).encode("utf-8"))
+        sep = b""
+        if events_path.exists():
+            with events_path.open("rb") as ev:
+                for line in ev:
+                    line = line.strip()
+                    if line:
+                        f.write(sep)
+                        f.write(line)
+                        sep = b","
+        f.write(b"]}")
+
+
 def _plugin_summary_line() -> str:
     allow = os.environ.get("QJSON_PLUGIN_ALLOW", "")
     # Show at most ~6 items to keep concise
@@ -67,6 +325,26 @@ def _parse_search_roots() -> List[str]:
     return out or [os.getcwd()]
 
 
+def _merge_search_roots(existing: List[str], paths: List[str]) -> str:
+    """Merge new directory roots into existing ones in a single dedup pass.
+
+    Existing entries are kept as-is (minus blanks); new paths are expanded once
+    and kept only if they are directories. Returns the os.pathsep-joined value.
+    """
+    seen: set[str] = set()
+    out: List[str] = []
+    for p in existing:
+        if p and p not in seen:
+            seen.add(p)
+            out.append(p)
+    for p in paths:
+        pr = os.path.expanduser(os.path.expandvars(p))
+        if pr and pr not in seen and os.path.isdir(pr):
+            seen.add(pr)
+            out.append(pr)
+    return os.pathsep.join(out)
+
+
 def _local_repo_search(query: str, max_results: int = 5) -> List[Dict[str, str]]:
     """Local search across configured roots as offline fallback.
 
@@ -240,6 +518,7 @@ def _fetch_url(url: str, *, timeout: float = 6.0, max_bytes: int = 200 * 1024) -
     if not url:
         return "", ""
     if url.startswith("http://") or url.startswith("https://"):
+        from urllib import request as _urlreq, error as _urlerr
         req = _urlreq.Request(url, headers={"User-Agent": "qjson-agents/0.1"})
         try:
             with _urlreq.urlopen(req, timeout=timeout) as resp:
@@ -444,6 +723,8 @@ def _engine_find(cmdline: str, *, default_mode: str = "online", agent_id: str |
         try:
             d = depth if depth is not None else 1
             m = pages if pages is not None else 10
+            from .web_crawler import Crawler
+            from .web_indexer import upsert_outline
             cr = Crawler(rate_per_host=float(os.environ.get("QJSON_CRAWL_RATE", "1.0")))
             outlines = cr.crawl(seeds, max_depth=d, max_pages=m)
             tgt = agent_id or os.environ.get("QJSON_AGENT_ID") or "WebCrawler"
@@ -560,6 +841,8 @@ def _engine_find(cmdline: str, *, default_mode: str = "online", agent_id: str |
             if fetch_flag and fetch_n > 0:
                 seeds2 = [r.get("url") for r in results if r.get("url")][:fetch_n]
                 if seeds2:
+                    from .web_crawler import Crawler
+                    from .web_indexer import upsert_outline
                     cr = Crawler(rate_per_host=float(os.environ.get("QJSON_CRAWL_RATE", "1.0")))
                     outlines = cr.crawl(seeds2, max_depth=0, max_pages=fetch_n)
                     tgt = agent_id or os.environ.get("QJSON_AGENT_ID") or "WebCrawler"
@@ -575,6 +858,51 @@ def _engine_find(cmdline: str, *, default_mode: str = "online", agent_id: str |
             return 1
 
 
+def _knob_int(lo: int) -> Callable[[str], str]:
+    return lambda v: str(max(lo, int(v)))
+
+
+def _knob_float(v: str) -> str:
+    return str(float(v))
+
+
+def _knob_flag(v: str) -> str:
+    return "1" if v in ("1", "on", "yes", "true") else "0"
+
+
+# Retrieval knobs shared by /retrieval, /retrieve and /settings edit:
+# key alias -> (env var, coercion). Values that fail coercion are ignored.
+_RETRIEVAL_KNOBS: Dict[str, Tuple[str, Callable[[str], str]]] = {}
+for _aliases, _env, _conv in (
+    (("k", "rk", "retrieval_k"), "QJSON_RETRIEVAL_TOPK", _knob_int(1)),
+    (("decay", "rd", "retrieval_decay"), "QJSON_RETRIEVAL_DECAY", _knob_float),
+    (("min", "minscore", "retrieval_min"), "QJSON_RETRIEVAL_MINSCORE", _knob_float),
+    (("hybrid",), "QJSON_RETRIEVAL_HYBRID", str),
+    (("tfidf_weight", "tw"), "QJSON_RETRIEVAL_TFIDF_WEIGHT", _knob_float),
+    (("fresh", "fresh_boost"), "QJSON_RETRIEVAL_FRESH_BOOST", _knob_float),
+    (("ivf", "fmm"), "QJSON_RETR_USE_FMM", _knob_flag),
+    (("ivf_k", "kivf"), "QJSON_RETR_IVF_K", _knob_int(2)),
+    (("nprobe", "ivf_nprobe"), "QJSON_RETR_IVF_NPROBE", _knob_int(1)),
+    (("thresh", "threshold", "reindex_threshold"), "QJSON_RETR_REINDEX_THRESHOLD", _knob_int(1)),
+):
+    for _a in _aliases:
+        _RETRIEVAL_KNOBS[_a] = (_env, _conv)
+del _aliases, _env, _conv, _a
+
+
+def _apply_retrieval_knob(k: str, v: str) -> bool:
+    """Set the env var behind retrieval knob k; return False if k is unknown."""
+    spec = _RETRIEVAL_KNOBS.get(k)
+    if spec is None:
+        return False
+    env, conv = spec
+    try:
+        os.environ[env] = conv(v)
+    except Exception:
+        pass
+    return True
+
+
 def _env_store_path() -> Path:
     try:
         return agents_home() / "env.json"
@@ -630,7 +958,7 @@ def cmd_chat(args: argparse.Namespace, default_api: Any = None) -> int:
     _load_persistent_env()
     try:
         client = OllamaClient()
-        models = client.tags()
+        models = _cached_tags(client, refresh=getattr(args, "refresh_models", False))
         if not models:
             _print("No local models found via /api/tags. Pull one with 'ollama pull <model>'.")
             return 1
@@ -653,25 +981,9 @@ def cmd_chat(args: argparse.Namespace, default_api: Any = None) -> int:
         _print(f"[models] selected default: {chosen_model}")
 
     if manifest_path and manifest_path.exists():
-        if manifest_path.suffix.lower() in (".yson", ".ysonx"):
-            prev_allow = os.environ.get("QJSON_ALLOW_YSON_EXEC")
-            try:
-                if getattr(args, "allow_yson_exec", False):
-                    os.environ["QJSON_ALLOW_YSON_EXEC"] = "1"
-                else:
-                    os.environ.pop("QJSON_ALLOW_YSON_EXEC", None)
-            except Exception:
-                pass
-            try:
+        if manifest_path.suffix.lower() in _YSON_SUFFIXES:
+            with _env_override({"QJSON_ALLOW_YSON_EXEC": "1" if getattr(args, "allow_yson_exec", False) else None}):
                 manifest = yson_to_manifest(manifest_path)
-            finally:
-                try:
-                    if prev_allow is None:
-                        os.environ.pop("QJSON_ALLOW_YSON_EXEC", None)
-                    else:
-                        os.environ["QJSON_ALLOW_YSON_EXEC"] = prev_allow
-                except Exception:
-                    pass
         else:
             manifest = load_manifest(manifest_path)
         rt = manifest.setdefault("runtime", {})
@@ -688,7 +1000,7 @@ def cmd_chat(args: argparse.Namespace, default_api: Any = None) -> int:
         if not mpath.exists():
             _print("No manifest found. Provide --manifest to initialize.")
             return 2
-        manifest = json.loads(mpath.read_text(encoding="utf-8"))
+        manifest = _load_json_file(mpath)
         rt = manifest.setdefault("runtime", {})
         rt["model"] = chosen_model # Set the validated model
         if getattr(args, "max_tokens", None):
@@ -847,6 +1159,100 @@ def cmd_chat(args: argparse.Namespace, default_api: Any = None) -> int:
     if engine_mode not in ("online", "local"):
         engine_mode = "online"
 
+    def _sync_retrieval() -> None:
+        # Retrieval knobs live in env (shared with Agent); mirror the session view
+        nonlocal retrieval_top_k, retrieval_decay, retrieval_minscore
+        try:
+            retrieval_top_k = max(1, int(os.environ.get("QJSON_RETRIEVAL_TOPK", retrieval_top_k)))
+        except Exception:
+            pass
+        try:
+            retrieval_decay = float(os.environ.get("QJSON_RETRIEVAL_DECAY", retrieval_decay))
+        except Exception:
+            pass
+        try:
+            retrieval_minscore = float(os.environ.get("QJSON_RETRIEVAL_MINSCORE", retrieval_minscore))
+        except Exception:
+            pass
+
+    # /settings edit handlers (key -> callback(value)); unknown keys fall back
+    # to the shared retrieval knob table.
+    def _set_include_as(v: str) -> None:
+        nonlocal include_as_role
+        if v in ('system', 'user'):
+            include_as_role = v
+
+    def _set_include_sys(v: str) -> None:
+        nonlocal include_sys_enabled, include_sys_count
+        if v.startswith('on'):
+            include_sys_enabled = True
+            try:
+                if ':' in v:
+                    include_sys_count = max(1, int(v.split(':', 1)[1]))
+            except Exception:
+                pass
+        elif v == 'off':
+            include_sys_enabled = False
+
+    def _set_auto(v: str) -> None:
+        nonlocal include_sys_auto
+        include_sys_auto = (v == 'on')
+
+    def _set_mem_trunc(v: str) -> None:
+        nonlocal mem_truncate_limit
+        if v == 'off':
+            mem_truncate_limit = None
+        elif v == 'on':
+            mem_truncate_limit = 8000
+        else:
+            try:
+                mem_truncate_limit = max(1, int(v))
+            except Exception:
+                pass
+
+    def _set_cap(v: str) -> None:
+        nonlocal include_max_chars
+        try:
+            include_max_chars = max(128, int(v))
+        except Exception:
+            pass
+
+    def _set_yson_exec(v: str) -> None:
+        nonlocal yson_exec_allowed
+        if v == 'on':
+            os.environ["QJSON_ALLOW_YSON_EXEC"] = "1"
+            yson_exec_allowed = True
+        elif v == 'off':
+            os.environ.pop("QJSON_ALLOW_YSON_EXEC", None)
+            yson_exec_allowed = False
+
+    def _set_retrieval(v: str) -> None:
+        nonlocal retrieval_enabled
+        if v == 'on':
+            os.environ["QJSON_RETRIEVAL"] = "1"
+            retrieval_enabled = True
+        elif v == 'off':
+            os.environ.pop("QJSON_RETRIEVAL", None)
+            retrieval_enabled = False
+
+    setting_handlers: Dict[str, Callable[[str], None]] = {
+        'include_as': _set_include_as,
+        'include_sys': _set_include_sys,
+        'auto': _set_auto,
+        'mem_trunc': _set_mem_trunc,
+        'cap': _set_cap,
+        'yson_exec': _set_yson_exec,
+        'retrieval': _set_retrieval,
+    }
+
+    # Streaming printer is stateless; define once rather than per turn
+    def _stream_printer(delta: str) -> None:
+        try:
+            sys.stdout.write(delta)
+            sys.stdout.flush()
+        except Exception:
+            pass
+
     while True:
         try:
             user = input("you > ").strip()
@@ -1169,7 +1575,6 @@ Slash commands:
             except Exception:
                 n = include_sys_count
             try:
-                from .memory import tail_jsonl
                 sys_msgs = [m for m in tail_jsonl(agent_dir(agent.agent_id) / "memory.jsonl", 256) if m.get("role") == "system"]
                 take = sys_msgs[-max(1, n):]
                 _print(f"[show_sys] Showing {len(take)} system message(s):")
@@ -1200,14 +1605,13 @@ Slash commands:
                 # Build a baseline prompt estimation using current inclusion
                 system_txt = agent._system_prompt()
                 sys_len = len(system_txt)
-                from .memory import tail_jsonl as _tail
-                hist = _tail(mpath, 32)
+                hist = tail_jsonl(mpath, 32)
                 hist_len = sum(len(h.get('content','')) for h in hist if h.get('role') in ("user","assistant"))
                 # Inclusion build (like in preflight)
                 extra_len = 0
                 n_to_include = include_sys_next_n if include_sys_next_n is not None else (include_sys_count if include_sys_enabled else None)
                 if n_to_include:
-                    sys_msgs = [m for m in _tail(mpath, 256) if m.get("role") == "system"]
+                    sys_msgs = [m for m in tail_jsonl(mpath, 256) if m.get("role") == "system"]
                     take_n = min(max(1, int(n_to_include)), include_max_msgs)
                     take = sys_msgs[-take_n:]
                     total = 0
@@ -1250,44 +1654,10 @@ Slash commands:
                 if hint_tokens:
                     os.environ["QJSON_RETRIEVAL_QUERY_HINT"] = " ".join(hint_tokens)
                 for p in parts:
-                    if "=" not in p:
-                        continue
-                    k, v = p.split("=", 1)
-                    if k == "k":
-                        try:
-                            retrieval_top_k = max(1, int(v))
-                            os.environ["QJSON_RETRIEVAL_TOPK"] = str(retrieval_top_k)
-                        except Exception:
-                            pass
-                    elif k == "decay":
-                        try:
-                            retrieval_decay = float(v)
-                            os.environ["QJSON_RETRIEVAL_DECAY"] = str(retrieval_decay)
-                        except Exception:
-                            pass
-                    elif k in ("min","minscore"):
-                        try:
-                            retrieval_minscore = float(v)
-                            os.environ["QJSON_RETRIEVAL_MINSCORE"] = str(retrieval_minscore)
-                        except Exception:
-                            pass
-                    elif k in ("ivf","fmm"):
-                        os.environ["QJSON_RETR_USE_FMM"] = "1" if v in ("1","on","yes","true") else "0"
-                    elif k in ("ivf_k","kivf"):
-                        try:
-                            os.environ["QJSON_RETR_IVF_K"] = str(max(2, int(v)))
-                        except Exception:
-                            pass
-                    elif k in ("nprobe","ivf_nprobe"):
-                        try:
-                            os.environ["QJSON_RETR_IVF_NPROBE"] = str(max(1, int(v)))
-                        except Exception:
-                            pass
-                    elif k in ("thresh","threshold","reindex_threshold"):
-                        try:
-                            os.environ["QJSON_RETR_REINDEX_THRESHOLD"] = str(max(1, int(v)))
-                        except Exception:
-                            pass
+                    k, sep, v = p.partition("=")
+                    if sep:
+                        _apply_retrieval_knob(k, v)
+                _sync_retrieval()
                 _print(f"[retrieval] armed once k={retrieval_top_k} decay={retrieval_decay} min={retrieval_minscore}")
                 continue
             if val in ("on", "yes"):
@@ -1299,46 +1669,11 @@ Slash commands:
                 os.environ.pop("QJSON_RETRIEVAL", None)
                 _print("[retrieval] Disabled")
             else:
-                parts = [p for p in val.replace(",", " ").split() if p]
-                for p in parts:
-                    if "=" not in p:
-                        continue
-                    k, v = p.split("=", 1)
-                    if k == "k":
-                        try:
-                            retrieval_top_k = max(1, int(v))
-                            os.environ["QJSON_RETRIEVAL_TOPK"] = str(retrieval_top_k)
-                        except Exception:
-                            pass
-                    elif k == "decay":
-                        try:
-                            retrieval_decay = float(v)
-                            os.environ["QJSON_RETRIEVAL_DECAY"] = str(retrieval_decay)
-                        except Exception:
-                            pass
-                    elif k in ("min","minscore"):
-                        try:
-                            retrieval_minscore = float(v)
-                            os.environ["QJSON_RETRIEVAL_MINSCORE"] = str(retrieval_minscore)
-                        except Exception:
-                            pass
-                    elif k in ("ivf","fmm"):
-                        os.environ["QJSON_RETR_USE_FMM"] = "1" if v in ("1","on","yes","true") else "0"
-                    elif k in ("ivf_k","kivf"):
-                        try:
-                            os.environ["QJSON_RETR_IVF_K"] = str(max(2, int(v)))
-                        except Exception:
-                            pass
-                    elif k in ("nprobe","ivf_nprobe"):
-                        try:
-                            os.environ["QJSON_RETR_IVF_NPROBE"] = str(max(1, int(v)))
-                        except Exception:
-                            pass
-                    elif k in ("thresh","threshold","reindex_threshold"):
-                        try:
-                            os.environ["QJSON_RETR_REINDEX_THRESHOLD"] = str(max(1, int(v)))
-                        except Exception:
-                            pass
+                for p in val.replace(",", " ").split():
+                    k, sep, v = p.partition("=")
+                    if sep:
+                        _apply_retrieval_knob(k, v)
+                _sync_retrieval()
                 _print(f"[retrieval] {'on' if retrieval_enabled else 'off'} k={retrieval_top_k} decay={retrieval_decay} min={retrieval_minscore}")
                 continue
         if user.startswith("/retrieve") or user == "/r":
@@ -1358,56 +1693,11 @@ Slash commands:
             elif arg.lower().split()[0] in ("off","no"):
                 os.environ.pop("QJSON_RETRIEVAL", None)
             val = arg.lower()
-            parts = [p for p in val.replace(",", " ").split() if p and "=" in p]
-            for p in parts:
-                k, v = p.split("=", 1)
-                if k == "k":
-                    try:
-                        retrieval_top_k = max(1, int(v))
-                        os.environ["QJSON_RETRIEVAL_TOPK"] = str(retrieval_top_k)
-                    except Exception:
-                        pass
-                elif k == "decay":
-                    try:
-                        retrieval_decay = float(v)
-                        os.environ["QJSON_RETRIEVAL_DECAY"] = str(retrieval_decay)
-                    except Exception:
-                        pass
-                elif k in ("min","minscore"):
-                    try:
-                        retrieval_minscore = float(v)
-                        os.environ["QJSON_RETRIEVAL_MINSCORE"] = str(retrieval_minscore)
-                    except Exception:
-                        pass
-                elif k == 'hybrid':
-                    os.environ["QJSON_RETRIEVAL_HYBRID"] = v
-                elif k in ('tfidf_weight','tw'):
-                    try:
-                        os.environ["QJSON_RETRIEVAL_TFIDF_WEIGHT"] = str(float(v))
-                    except Exception:
-                        pass
-                elif k in ('fresh','fresh_boost'):
-                    try:
-                        os.environ["QJSON_RETRIEVAL_FRESH_BOOST"] = str(float(v))
-                    except Exception:
-                        pass
-                elif k in ("ivf","fmm"):
-                    os.environ["QJSON_RETR_USE_FMM"] = "1" if v in ("1","on","yes","true") else "0"
-                elif k in ("ivf_k","kivf"):
-                    try:
-                        os.environ["QJSON_RETR_IVF_K"] = str(max(2, int(v)))
-                    except Exception:
-                        pass
-                elif k in ("nprobe","ivf_nprobe"):
-                    try:
-                        os.environ["QJSON_RETR_IVF_NPROBE"] = str(max(1, int(v)))
-                    except Exception:
-                        pass
-                elif k in ("thresh","threshold","reindex_threshold"):
-                    try:
-                        os.environ["QJSON_RETR_REINDEX_THRESHOLD"] = str(max(1, int(v)))
-                    except Exception:
-                        pass
+            for p in val.replace(",", " ").split():
+                k, sep, v = p.partition("=")
+                if sep:
+                    _apply_retrieval_knob(k, v)
+            _sync_retrieval()
             _print(f"[retrieve] armed once k={retrieval_top_k} decay={retrieval_decay} min={retrieval_minscore}")
             continue
         if user.startswith("/force_retrieve"):
@@ -1437,7 +1727,7 @@ Slash commands:
                     _print(f"...and {len(hits) - 4} more.")
                 
                 # Serialize hits and pass to next turn via env var
-                os.environ["QJSON_INJECT_HITS_ONCE"] = json.dumps(hits)
+                os.environ["QJSON_INJECT_HITS_ONCE"] = _dumps(hits)
 
             except Exception as e:
                 _print(f"[Search Error] {e}")
@@ -1470,12 +1760,7 @@ Slash commands:
                     _print("Usage: /engine_scope add <PATH...> | /engine_scope set <PATH...>")
                     continue
                 existing = os.environ.get("QJSON_LOCAL_SEARCH_ROOTS", "").split(os.pathsep) if parts[1] == "add" else []
-                merged = [p for p in existing if p]
-                for p in paths:
-                    pr = os.path.expanduser(os.path.expandvars(p))
-                    if os.path.isdir(pr):
-                        merged.append(pr)
-                val = os.pathsep.join(dict.fromkeys(merged))
+                val = _merge_search_roots(existing, paths)
                 os.environ["QJSON_LOCAL_SEARCH_ROOTS"] = val
                 _save_persistent_env("QJSON_LOCAL_SEARCH_ROOTS", val)
                 _print(f"[engine_scope] roots set: {val}")
@@ -1533,73 +1818,17 @@ Slash commands:
         if user.startswith("/settings") and "edit" in user:
             # Example: /settings edit include_as=user include_sys=on:3 auto=on mem_trunc=off cap=16000 yson_exec=on
             try:
-                parts = user.split()[2:]  # skip '/settings edit'
-                for p in parts:
-                    if '=' not in p:
+                for p in user.split()[2:]:  # skip '/settings edit'
+                    k, sep, v = p.partition('=')
+                    if not sep:
                         continue
-                    k, v = p.split('=', 1)
                     k = k.strip().lower(); v = v.strip().lower()
-                    if k == 'include_as' and v in ('system','user'):
-                        include_as_role = v
-                    elif k == 'include_sys':
-                        if v.startswith('on'):
-                            include_sys_enabled = True
-                            try:
-                                if ':' in v:
-                                    include_sys_count = max(1, int(v.split(':',1)[1]))
-                            except Exception:
-                                pass
-                        elif v == 'off':
-                            include_sys_enabled = False
-                    elif k == 'auto':
-                        include_sys_auto = (v == 'on')
-                    elif k == 'mem_trunc':
-                        if v == 'off':
-                            mem_truncate_limit = None
-                        elif v == 'on':
-                            mem_truncate_limit = 8000
-                        else:
-                            try:
-                                mem_truncate_limit = max(1, int(v))
-                            except Exception:
-                                pass
-                    elif k == 'cap':
-                        try:
-                            include_max_chars = max(128, int(v))
-                        except Exception:
-                            pass
-                    elif k == 'yson_exec':
-                        if v == 'on':
-                            os.environ["QJSON_ALLOW_YSON_EXEC"] = "1"
-                            yson_exec_allowed = True
-                        elif v == 'off':
-                            os.environ.pop("QJSON_ALLOW_YSON_EXEC", None)
-                            yson_exec_allowed = False
-                    elif k in ('retrieval_min','min','minscore'):
-                        try:
-                            retrieval_minscore = float(v)
-                            os.environ["QJSON_RETRIEVAL_MINSCORE"] = str(retrieval_minscore)
-                        except Exception:
-                            pass
-                    elif k == 'retrieval':
-                        if v == 'on':
-                            os.environ["QJSON_RETRIEVAL"] = "1"
-                            retrieval_enabled = True
-                        elif v == 'off':
-                            os.environ.pop("QJSON_RETRIEVAL", None)
-                            retrieval_enabled = False
-                    elif k in ('retrieval_k','rk','k'):
-                        try:
-                            retrieval_top_k = max(1, int(v))
-                            os.environ["QJSON_RETRIEVAL_TOPK"] = str(retrieval_top_k)
-                        except Exception:
-                            pass
-                    elif k in ('retrieval_decay','rd','decay'):
-                        try:
-                            retrieval_decay = float(v)
-                            os.environ["QJSON_RETRIEVAL_DECAY"] = str(retrieval_decay)
-                        except Exception:
-                            pass
+                    h = setting_handlers.get(k)
+                    if h is not None:
+                        h(v)
+                    else:
+                        _apply_retrieval_knob(k, v)
+                _sync_retrieval()
                 _print("[settings] updated")
             except Exception as e:
                 _print(f"[settings error] {e}")
@@ -1614,7 +1843,6 @@ Slash commands:
             system = {"role": "system", "content": agent._system_prompt()}
             history = []
             try:
-                from .memory import tail_jsonl
                 history = tail_jsonl(agent_dir(agent.agent_id) / "memory.jsonl", 32)
             except Exception:
                 history = []
@@ -1624,12 +1852,11 @@ Slash commands:
             n_to_include = include_sys_next_n if include_sys_next_n is not None else (include_sys_count if include_sys_enabled else None)
             if n_to_include:
                 try:
-                    from .memory import tail_jsonl as _tail
-                    sys_msgs = [m for m in _tail(agent_dir(agent.agent_id) / "memory.jsonl", 256) if m.get("role") == "system"]
+                    sys_msgs = [m for m in tail_jsonl(agent_dir(agent.agent_id) / "memory.jsonl", 256) if m.get("role") == "system"]
                     take_n = min(max(1, int(n_to_include)), include_max_msgs)
                     take = sys_msgs[-take_n:]
-                    # Build until cap reached to avoid large temporary buffers
-                    parts = []
+                    # Build until cap reached into one buffer (no list + join copy)
+                    buf = io.StringIO()
                     total = 0
                     for m in take:
                         src = (m.get('meta') or {}).get('source','system')
@@ -1640,28 +1867,36 @@ Slash commands:
                                 break
                             if len(seg) > room:
                                 seg = seg[:room]
-                        parts.append(seg)
+                        if total:
+                            buf.write("\n\n")
+                        buf.write(seg)
                         total += len(seg)
-                    joined = "\n\n".join(parts).strip()
+                    joined = buf.getvalue().strip()
                     if include_as_role == "system":
                         extra_system = joined
                     else:
                         extra_context = [{"role": "user", "content": joined}]
                 except Exception:
                     pass
+            # Count prompt chars while building msgs (avoids a second pass)
             msgs = [system]
+            prompt_chars = len(system["content"])
             if extra_system:
                 msgs.append({"role": "system", "content": extra_system})
+                prompt_chars += len(extra_system)
             if extra_context:
                 msgs.extend(extra_context)
+                prompt_chars += sum(len(m.get("content", "")) for m in extra_context)
             for h in history:
                 r = h.get("role")
                 if r in ("user", "assistant"):
-                    msgs.append({"role": r, "content": h.get("content", "")})
+                    c = h.get("content", "")
+                    msgs.append({"role": r, "content": c})
+                    prompt_chars += len(c)
             msgs.append({"role": "user", "content": text})
+            prompt_chars += len(text)
 
             # Estimate sizes and latency
-            prompt_chars = sum(len(m.get("content", "")) for m in msgs)
             prompt_tokens = (prompt_chars + 3) // 4
             opts = agent._ollama_options()
             pred_tokens = int(opts.get("num_predict", 256))
@@ -1820,21 +2055,18 @@ Slash commands:
                 except Exception as e:
                     _print(f"[logic error] {e}; continuing without anchor")
             # Determine how many system messages to include
-            n_to_include = None
-            if include_sys_next_n is not None:
-                n_to_include = include_sys_next_n
-            elif include_sys_enabled:
-                n_to_include = include_sys_count
+            n_to_include = include_sys_next_n if include_sys_next_n is not None else (include_sys_count if include_sys_enabled else None)
             if n_to_include:
                 try:
-                    from .memory import tail_jsonl
                     sys_msgs = [m for m in tail_jsonl(agent_dir(agent.agent_id) / "memory.jsonl", 256) if m.get("role") == "system"]
                     take = sys_msgs[-max(1, int(n_to_include)) :]
-                    blocks = []
-                    for m in take:
+                    buf = io.StringIO()
+                    for j, m in enumerate(take):
                         src = (m.get('meta') or {}).get('source','system')
-                        blocks.append(f"[mem:{src}]\n{m.get('content','')}")
-                    joined = ("\n\n".join(blocks)).strip()
+                        if j:
+                            buf.write("\n\n")
+                        buf.write(f"[mem:{src}]\n{m.get('content','')}")
+                    joined = buf.getvalue().strip()
                     truth = os.environ.get("QJSON_TRUTH_NOTE")
                     if truth:
                         joined = (truth + "\n\n" + joined).strip()
@@ -1871,13 +2103,7 @@ Slash commands:
                 except Exception as e:
                     _print(f"[logic error] {e}; falling back to model")
             if stream_enabled:
-                def _printer(delta: str) -> None:
-                    try:
-                        sys.stdout.write(delta)
-                        sys.stdout.flush()
-                    except Exception:
-                        pass
-                reply = agent.chat_turn_stream(user, on_delta=_printer, model_override=model_override, extra_system=extra_system, extra_context=extra_context)
+                reply = agent.chat_turn_stream(user, on_delta=_stream_printer, model_override=model_override, extra_system=extra_system, extra_context=extra_context)
                 _print("")
             else:
                 reply = agent.chat_turn(user, model_override=model_override, extra_system=extra_system, extra_context=extra_context)
@@ -1897,7 +2123,7 @@ def cmd_fork(args: argparse.Namespace, default_api: Any = None) -> int:
     if not mpath.exists():
         _print(f"Source agent not found: {agent_id}")
         return 2
-    manifest = json.loads(mpath.read_text(encoding="utf-8"))
+    manifest = _load_json_file(mpath)
     agent = Agent(manifest)
     child = agent.fork(args.new_id, note=args.note)
     _print(f"Forked {agent_id} -> {args.new_id}")
@@ -1910,18 +2136,18 @@ def cmd_status(args: argparse.Namespace, default_api: Any = None) -> int:
     if not mpath.exists():
         _print(f"Agent not found: {agent_id}")
         return 2
-    manifest = json.loads(mpath.read_text(encoding="utf-8"))
+    manifest = _load_json_file(mpath)
     agent = Agent(manifest)
     st = agent.status(tail=args.tail)
     # Compact print
     _print(f"agent_id: {st['agent_id']}")
-    _print("manifest: " + json.dumps(st["manifest"], ensure_ascii=False))
+    _print("manifest: " + _dumps(st["manifest"]))
     _print("-- memory tail --")
     for m in st["memory_tail"]:
-        _print(json.dumps(m, ensure_ascii=False))
+        _print(_dumps(m))
     _print("-- events tail --")
     for e in st["events_tail"]:
-        _print(json.dumps(e, ensure_ascii=False))
+        _print(_dumps(e))
     return 0
 
 
@@ -1929,11 +2155,8 @@ def cmd_loop(args: argparse.Namespace) -> int:
     agent_id = args.id
     manifest_path = Path(args.manifest) if args.manifest else None
 
-    if manifest_path and manifest_path.exists():
-        if manifest_path.suffix.lower() in (".yson", ".ysonx"):
-            manifest = yson_to_manifest(manifest_path)
-        else:
-            manifest = load_manifest(manifest_path)
+    manifest = _try_read_manifest(manifest_path, use_cache=not getattr(args, "no_manifest_cache", False))
+    if manifest is not None:
         if args.model:
             manifest.setdefault("runtime", {})["model"] = args.model
         agent = Agent(manifest)
@@ -1962,7 +2185,7 @@ def cmd_loop(args: argparse.Namespace) -> int:
             }
             agent = Agent(manifest)
         else:
-            manifest = json.loads(mpath.read_text(encoding="utf-8"))
+            manifest = _load_json_file(mpath)
             if args.model:
                 manifest.setdefault("runtime", {})["model"] = args.model
             agent = Agent(manifest)
@@ -1972,7 +2195,7 @@ def cmd_loop(args: argparse.Namespace) -> int:
     if args.model in (None, "auto"):
         try:
             client = OllamaClient()
-            models = client.tags()
+            models = _cached_tags(client, refresh=getattr(args, "refresh_models", False))
             if not models:
                 _print("No local models found via /api/tags. Pull one with 'ollama pull <model>'.")
             else:
@@ -1986,10 +2209,8 @@ def cmd_loop(args: argparse.Namespace) -> int:
     delay = float(args.delay)
     _print(f"Starting autonomous loop for {agent.agent_id}: {iters} iterations")
     # Log loop start event
-    from .memory import append_jsonl, _now_ts
     append_jsonl(agent_dir(agent.agent_id) / "events.jsonl", {"ts": _now_ts(), "type": "loop_start", "meta": {"goal": goal, "iterations": iters}})
 
-    import time
     llm_client = None
     if (args.model or "").strip().lower() == "mock-llm":
         class _Mock:
@@ -2021,7 +2242,7 @@ def cmd_loop(args: argparse.Namespace) -> int:
 def cmd_models(args: argparse.Namespace) -> int:
     try:
         client = OllamaClient()
-        models = client.tags()
+        models = _cached_tags(client, refresh=getattr(args, "refresh_models", False))
     except Exception as e:
         _print(f"[models] error: {e}")
         return 1
@@ -2042,11 +2263,8 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
     agent_id = args.id
     manifest_path = Path(args.manifest) if args.manifest else None
 
-    if manifest_path and manifest_path.exists():
-        if manifest_path.suffix.lower() in (".yson", ".ysonx"):
-            manifest = yson_to_manifest(manifest_path)
-        else:
-            manifest = load_manifest(manifest_path)
+    manifest = _try_read_manifest(manifest_path, use_cache=not getattr(args, "no_manifest_cache", False))
+    if manifest is not None:
         if args.model:
             manifest.setdefault("runtime", {})["model"] = args.model
         agent = Agent(manifest)
@@ -2075,44 +2293,52 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
             }
             agent = Agent(manifest)
         else:
-            manifest = json.loads(mpath.read_text(encoding="utf-8"))
+            manifest = _load_json_file(mpath)
             if args.model:
                 manifest.setdefault("runtime", {})["model"] = args.model
             agent = Agent(manifest)
 
-    # Apply plugin gating envs
-    if args.plugins:
-        os.environ["QJSON_PLUGIN_ALLOW"] = ",".join([s.strip() for s in args.plugins.split(",") if s.strip()])
-    if args.allow_exec:
-        os.environ["QJSON_ALLOW_EXEC"] = "1"
-    if args.allow_net:
-        os.environ["QJSON_ALLOW_NET"] = "1"
-    if args.fs_roots:
-        os.environ["QJSON_FS_ROOTS"] = args.fs_roots
-    if args.fs_write:
-        os.environ["QJSON_FS_WRITE"] = "1"
-    if args.git_root:
-        os.environ["QJSON_GIT_ROOT"] = args.git_root
-    # Optional max tokens env for semi replies
-    if getattr(args, "max_tokens", None):
+    # Resolve plugin gating once. Plugins that consult the environment at call
+    # time see these values only for the duration of this run.
+    base = PluginPolicy.from_env()
+    roots_raw = args.fs_roots.split(os.pathsep) if args.fs_roots else (base.fs_roots or (os.getcwd(),))
+    roots_norm: List[str] = []
+    for r in roots_raw:
+        if not r:
+            continue
         try:
-            os.environ["QJSON_MAX_TOKENS"] = str(max(16, int(args.max_tokens)))
+            roots_norm.append(str(Path(os.path.expanduser(r)).resolve()))
         except Exception:
-            pass
-
-    # Optional max tokens
+            roots_norm.append(r)
+    policy = PluginPolicy(
+        allow=frozenset(s.strip() for s in args.plugins.split(",") if s.strip()) if args.plugins else base.allow,
+        deny=base.deny,
+        allow_exec=bool(args.allow_exec) or base.allow_exec,
+        allow_net=bool(args.allow_net) or base.allow_net,
+        fs_roots=tuple(roots_norm),
+        fs_write=bool(args.fs_write) or base.fs_write,
+        git_root=args.git_root or base.git_root,
+    )
+    env_overrides = policy.env()
+    env_overrides["QJSON_AGENT_ID"] = agent.agent_id
+    # Optional max tokens env for semi replies
     if getattr(args, "max_tokens", None):
         try:
-            os.environ["QJSON_MAX_TOKENS"] = str(max(16, int(args.max_tokens)))
+            env_overrides["QJSON_MAX_TOKENS"] = str(max(16, int(args.max_tokens)))
         except Exception:
             pass
+    with _env_override(env_overrides):
+        return _semi_run(args, agent, policy, default_api)
 
+
+def _semi_run(args: argparse.Namespace, agent: Agent, policy: PluginPolicy, default_api: Any = None) -> int:
+    """Tick loop of cmd_semi; runs with ``policy`` applied to the environment."""
     # Resolve model automatically if needed
     chosen_model = None
     if args.model in (None, "auto"):
         try:
             client = OllamaClient()
-            models = client.tags()
+            models = _cached_tags(client, refresh=getattr(args, "refresh_models", False))
             if models:
                 chosen_model = models[0].get("name") or models[0].get("model")
                 _print(f"[models] selected: {chosen_model}")
@@ -2131,20 +2357,27 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
     iters = max(1, int(args.iterations))
     delay = float(args.delay)
     stop_token = (args.stop_token or "need more info").strip().lower()
+    # Early-stop cues in one case-insensitive scan: the stop token, explicit
+    # requests for more info, "clarify" + "need" anywhere, or a completion marker.
+    _stop_alts = [re.escape(stop_token)] if stop_token else []
+    _stop_alts += [
+        "need more information",
+        _SEMI_DONE_RE.pattern,
+        r"\A(?=[\s\S]*?clarify)(?=[\s\S]*?need)",
+    ]
+    early_stop_re = re.compile("|".join(_stop_alts), re.IGNORECASE)
     _print(f"[semi] starting for {agent.agent_id}: {iters} iterations; stop on '{stop_token}'")
 
-    from .memory import append_jsonl, _now_ts
     append_jsonl(agent_dir(agent.agent_id) / "events.jsonl", {"ts": _now_ts(), "type": "semi_start", "meta": {"goal": goal, "iterations": iters}})
 
-    import time, re, shlex
+    import shlex
     # Load plugins and commands (respect allow/deny filters)
     def _google_web_search_wrapper(query: str) -> dict:
         if default_api is None or not hasattr(default_api, "google_web_search"):
             raise RuntimeError("default_api.google_web_search not available")
         return default_api.google_web_search(query=query)
     tools = {"google_web_search": _google_web_search_wrapper}
-    from .plugin_manager import load_plugins
-    plugins = load_plugins(tools=tools)
+    plugins = load_plugins(tools=tools, policy=policy)
     plugin_commands: Dict[str, Any] = {}
     for pl in plugins:
         try:
@@ -2152,22 +2385,7 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
         except Exception:
             pass
     allowed_cmds = sorted(list(plugin_commands.keys()))
-    # Normalize FS roots to absolute resolved paths to avoid case/path mismatch
-    fs_roots = (os.environ.get("QJSON_FS_ROOTS") or os.getcwd())
-    try:
-        roots_norm = []
-        for r in fs_roots.split(os.pathsep):
-            if not r:
-                continue
-            try:
-                roots_norm.append(str(Path(os.path.expanduser(r)).resolve()))
-            except Exception:
-                roots_norm.append(r)
-        if roots_norm:
-            os.environ["QJSON_FS_ROOTS"] = os.pathsep.join(roots_norm)
-            fs_roots = os.environ["QJSON_FS_ROOTS"]
-    except Exception:
-        pass
+    fs_roots = os.pathsep.join(policy.fs_roots)
     hint_tools = "\n".join([f"- {c}" for c in allowed_cmds[:16]]) + ("\n- …" if len(allowed_cmds) > 16 else "")
     extra_hint_base = (
         "TOOL PROTOCOL (strict):\n"
@@ -2186,7 +2404,7 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
     # Pre-run: execute all slash-commands embedded in the goal (in order)
     if goal:
         try:
-            import re, shlex as _shlex
+            import shlex as _shlex
             # Find each verb position and slice until the next verb or newline
             matches = list(re.finditer(r"/[a-z_]+", goal))
             spans: list[tuple[int, int]] = []
@@ -2273,7 +2491,7 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
                 # FS list
                 wants_list = ("/fs_list" in gl) or ("/fs_list" in rl) or ("list files" in gl) or ("analyse the directory" in gl) or ("analyze the directory" in gl)
                 if wants_list and "/fs_list" in plugin_commands:
-                    roots = (os.environ.get("QJSON_FS_ROOTS") or os.getcwd()).split(os.pathsep)
+                    roots = list(policy.fs_roots)
                     base = roots[0] if roots and roots[0] else os.getcwd()
                     os.environ["QJSON_AGENT_ID"] = agent.agent_id
                     out = plugin_commands["/fs_list"](base, "max=100")
@@ -2330,7 +2548,7 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
                         except Exception:
                             pass
                 # API heuristic: detect a URL and GET it (if net allowed)
-                if not ran_tool and os.environ.get("QJSON_ALLOW_NET") == "1" and ("/api_get" in plugin_commands):
+                if not ran_tool and policy.allow_net and ("/api_get" in plugin_commands):
                     murl = re.search(r"https?://\S+", gl) or re.search(r"https?://\S+", rl)
                     if murl:
                         url = murl.group(0)
@@ -2345,9 +2563,8 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
                             pass
             except Exception:
                 pass
-        low = (reply or "").lower()
         # Early stop when agent asks for more info, or explicitly marks completion
-        if (stop_token and stop_token in low) or ("need more information" in low) or ("clarify" in low and "need" in low) or ("task complete" in low) or ("task completed" in low) or ("summary complete" in low):
+        if reply and early_stop_re.search(reply):
             if getattr(args, "interactive", False):
                 more = input("[semi] Agent requests more info. Provide details (or press Enter to stop): ").strip()
                 if more:
@@ -2360,7 +2577,7 @@ def cmd_semi(args: argparse.Namespace, default_api: Any = None) -> int:
                     _print("[semi] early stop: no additional info provided.")
                     break
             else:
-                if ("task complete" in low) or ("task completed" in low) or ("summary complete" in low):
+                if _SEMI_DONE_RE.search(reply):
                     _print("[semi] stop: agent marked task complete.")
                 else:
                     _print("[semi] early stop: agent requested more information.")
@@ -2383,9 +2600,8 @@ def cmd_test(args: argparse.Namespace, default_api: Any = None) -> int:
     """
     # Resolve manifest
     manifest_path = Path(args.manifest) if args.manifest else Path("manifests/lila.json")
-    if manifest_path.exists():
-        manifest = load_manifest(manifest_path)
-    else:
+    manifest = _try_read_manifest(manifest_path, use_cache=not getattr(args, "no_manifest_cache", False))
+    if manifest is None:
         # Minimal fallback manifest if example is missing
         manifest = {
             "agent_id": "TestHarness",
@@ -2423,16 +2639,7 @@ def cmd_test(args: argparse.Namespace, default_api: Any = None) -> int:
     path_txt = base.with_suffix(".txt")
     path_json = base.with_suffix(".json")
     path_log = base.with_suffix(".log")
-
-    logger = logging.getLogger("qjson_agents.test")
-    logger.setLevel(logging.DEBUG)
-    # Reset handlers to avoid duplicates on multiple invocations
-    logger.handlers.clear()
-    fh = logging.FileHandler(path_log, encoding="utf-8")
-    fh.setLevel(logging.DEBUG)
-    fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-    fh.setFormatter(fmt)
-    logger.addHandler(fh)
+    path_events = base.with_suffix(".events.jsonl")
 
     duration = float(args.duration)
     interval = float(args.interval)
@@ -2442,16 +2649,20 @@ def cmd_test(args: argparse.Namespace, default_api: Any = None) -> int:
     class MockOllamaClient:
         def __init__(self):
             self.calls = 0
+            # chat() runs concurrently under the cluster fan-out
+            self._lock = threading.Lock()
 
         def chat(self, *, model: str, messages: list[dict[str, str]], options: dict | None = None, stream: bool = False) -> dict:
-            self.calls += 1
+            with self._lock:
+                self.calls += 1
+                n = self.calls
             user_msg = ""
             for m in reversed(messages):
                 if m.get("role") == "user":
                     user_msg = m.get("content", "")
                     break
             # Lightweight, deterministic-ish reply
-            reply = f"[mock:{self.calls}] Ack: {user_msg[:80]}"
+            reply = f"[mock:{n}] Ack: {user_msg[:80]}"
             return {"message": {"role": "assistant", "content": reply}}
 
         def tags(self) -> list[dict[str, str]]:
@@ -2465,7 +2676,7 @@ def cmd_test(args: argparse.Namespace, default_api: Any = None) -> int:
         model_to_use = args.model
         if not model_to_use:
             try:
-                models = client.tags()
+                models = _cached_tags(client, refresh=getattr(args, "refresh_models", False))
             except Exception as e:
                 _print(f"[models] error: {e}")
                 return 2
@@ -2480,90 +2691,111 @@ def cmd_test(args: argparse.Namespace, default_api: Any = None) -> int:
 
     # Test loop state
     counters: Dict[str, int] = {"chat": 0, "fork": 0, "status": 0, "errors": 0}
-    events: list[Dict[str, Any]] = []
+    # Events stream straight to disk; the summary JSON splices them back in
+    event_sink = JsonlBatcher(path_events)
+    _emit = event_sink.add
 
-    logger.info(f"Starting test run for {agent.agent_id} (duration={duration}s, interval={interval}s)")
+    # Started only once argument/model checks can no longer return early
+    logger, log_listener = _queued_file_logger("qjson_agents.test", path_log)
+    logger.info("Starting test run for %s (duration=%ss, interval=%ss)", agent.agent_id, duration, interval)
     start_ts = time.time()
 
     i = 0
     forks_done = 0
+
+    def _do_chat(i: int) -> None:
+        prompt = f"Tick {i}: run health check and echo counters={counters}"
+        reply = agent.chat_turn(prompt, client=client, model_override=model_to_use)
+        counters["chat"] += 1
+        _emit({"t": time.time(), "type": "chat", "prompt": prompt, "reply": reply})
+        logger.debug("chat[%d] prompt='%.60s' -> reply='%.60s'", i, prompt, reply)
+
+    def _do_status(i: int) -> None:
+        st = agent.status(tail=5)
+        counters["status"] += 1
+        _emit({"t": time.time(), "type": "status", "tail_mem": len(st.get("memory_tail", [])), "tail_ev": len(st.get("events_tail", []))})
+        logger.debug("status[%d] memory_tail=%d events_tail=%d", i, len(st.get("memory_tail", [])), len(st.get("events_tail", [])))
+
+    def _do_fork(i: int) -> None:
+        nonlocal forks_done
+        child_id = f"{agent.agent_id}-child{forks_done+1}"
+        agent.fork(child_id, note=f"fork from test iteration {i}")
+        forks_done += 1
+        counters["fork"] += 1
+        _emit({"t": time.time(), "type": "fork", "child_id": child_id})
+        logger.debug("fork[%d] -> %s", i, child_id)
+
+    # Rotate through actions to exercise methods: fork every 7th tick (while
+    # under --max-forks), status every 5th, chat otherwise. The pattern repeats
+    # every lcm(5, 7) = 35 ticks; fork slots fall back to the non-fork schedule.
+    chat_slot, status_slot, fork_slot = ("chat", _do_chat), ("status", _do_status), ("fork", _do_fork)
+    fallback_schedule = tuple(status_slot if k % 5 == 0 else chat_slot for k in range(35))
+    action_schedule = tuple(fork_slot if k % 7 == 0 else fallback_schedule[k] for k in range(35))
     try:
         while time.time() < deadline:
             i += 1
-            # Rotate through actions to exercise methods
-            action = "chat"
-            if i % 7 == 0 and forks_done < args.max_forks:
-                action = "fork"
-            elif i % 5 == 0:
-                action = "status"
+            action, do_action = action_schedule[i % 35]
+            if do_action is _do_fork and forks_done >= args.max_forks:
+                action, do_action = fallback_schedule[i % 35]
 
             try:
-                if action == "chat":
-                    prompt = f"Tick {i}: run health check and echo counters={counters}"
-                    reply = agent.chat_turn(prompt, client=client, model_override=model_to_use)
-                    counters["chat"] += 1
-                    events.append({"t": time.time(), "type": "chat", "prompt": prompt, "reply": reply})
-                    logger.debug(f"chat[{i}] prompt='{prompt[:60]}' -> reply='{reply[:60]}'")
-                elif action == "status":
-                    st = agent.status(tail=5)
-                    counters["status"] += 1
-                    events.append({"t": time.time(), "type": "status", "tail_mem": len(st.get("memory_tail", [])), "tail_ev": len(st.get("events_tail", []))})
-                    logger.debug(f"status[{i}] memory_tail={len(st.get('memory_tail', []))} events_tail={len(st.get('events_tail', []))}")
-                elif action == "fork":
-                    child_id = f"{agent.agent_id}-child{forks_done+1}"
-                    agent.fork(child_id, note=f"fork from test iteration {i}")
-                    forks_done += 1
-                    counters["fork"] += 1
-                    events.append({"t": time.time(), "type": "fork", "child_id": child_id})
-                    logger.debug(f"fork[{i}] -> {child_id}")
+                do_action(i)
             except Exception as e:
                 counters["errors"] += 1
-                events.append({"t": time.time(), "type": "error", "error": str(e)})
-                logger.exception(f"action '{action}' failed: {e}")
+                _emit({"t": time.time(), "type": "error", "error": str(e)})
+                logger.exception("action '%s' failed: %s", action, e)
 
             if interval > 0:
+                event_sink.flush()
                 time.sleep(interval)
     finally:
-        end_ts = time.time()
-        elapsed = end_ts - start_ts
-        # Persist JSON summary
-        summary: Dict[str, Any] = {
-            "agent_id": agent.agent_id,
-            "start_ts": start_ts,
-            "end_ts": end_ts,
-            "elapsed_sec": round(elapsed, 3),
-            "counts": counters,
-            "events": events,
-            "logs": {
-                "txt": str(path_txt),
-                "json": str(path_json),
-                "log": str(path_log),
-            },
-        }
-        with path_json.open("w", encoding="utf-8") as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
-
-        # Persist TXT summary
-        tail_mem = []
         try:
-            from .memory import tail_jsonl
-            tail_mem = tail_jsonl(agent_dir(agent.agent_id) / "memory.jsonl", 3)
-        except Exception:
-            pass
-        with path_txt.open("w", encoding="utf-8") as f:
-            f.write(f"Test run for {agent.agent_id}\n")
-            f.write(f"Duration: {round(elapsed, 3)}s\n")
-            f.write(f"Counts: {counters}\n")
-            f.write("Last 3 memory entries:\n")
-            for m in tail_mem:
-                f.write(json.dumps(m, ensure_ascii=False) + "\n")
+            event_sink.close()
+            end_ts = time.time()
+            elapsed = end_ts - start_ts
+            # Persist JSON summary
+            summary: Dict[str, Any] = {
+                "agent_id": agent.agent_id,
+                "start_ts": start_ts,
+                "end_ts": end_ts,
+                "elapsed_sec": round(elapsed, 3),
+                "counts": counters,
+                "events_file": str(path_events),
+                "logs": {
+                    "txt": str(path_txt),
+                    "json": str(path_json),
+                    "log": str(path_log),
+                    "events": str(path_events),
+                },
+            }
+            _write_run_summary(path_json, summary, path_events)
 
-        logger.info(f"Test complete in {round(elapsed, 3)}s — chat={counters['chat']} fork={counters['fork']} status={counters['status']} errors={counters['errors']}")
+            # Persist TXT summary
+            tail_mem = []
+            try:
+                tail_mem = tail_jsonl(agent_dir(agent.agent_id) / "memory.jsonl", 3)
+            except Exception:
+                pass
+            with path_txt.open("w", encoding="utf-8") as f:
+                f.write(f"Test run for {agent.agent_id}\n")
+                f.write(f"Duration: {round(elapsed, 3)}s\n")
+                f.write(f"Counts: {counters}\n")
+                f.write("Last 3 memory entries:\n")
+                for m in tail_mem:
+                    f.write(_dumps(m) + "\n")
+
+            logger.info(
+                "Test complete in %ss — chat=%d fork=%d status=%d errors=%d",
+                round(elapsed, 3), counters["chat"], counters["fork"], counters["status"], counters["errors"],
+            )
+        finally:
+            _stop_file_logger(log_listener)
 
     _print("Test harness outputs:")
     _print(f"- {path_txt}")
     _print(f"- {path_json}")
     _print(f"- {path_log}")
+    _print(f"- {path_events}")
     return 0
 
 
@@ -2578,7 +2810,7 @@ def cmd_cluster(args: argparse.Namespace) -> int:
 
     agents = idx.get("agents", {})
     if args.json:
-        _print(json.dumps(idx, ensure_ascii=False, indent=2))
+        _print(_dumps(idx, indent=True))
         return 0
 
     # Build parent->children map
@@ -2607,15 +2839,19 @@ def cmd_cluster(args: argparse.Namespace) -> int:
         else:
             _print(f"- {aid}  parent={parent} mem={mem} ev={ev}")
 
-    def walk(aid: str, depth: int = 0) -> None:
-        print_line(aid, depth)
-        for ch in sorted(children.get(aid, [])):
-            walk(ch, depth + 1)
-
     _print(f"cluster updated: {idx.get('updated')}")
     if args.tree:
-        for r in roots:
-            walk(r, 0)
+        # Iterative pre-order DFS; each child list is sorted once
+        children_sorted = {k: sorted(v) for k, v in children.items()}
+        stack = [(r, 0) for r in reversed(roots)]
+        seen: set[str] = set()
+        while stack:
+            aid, depth = stack.pop()
+            if aid in seen:
+                continue
+            seen.add(aid)
+            print_line(aid, depth)
+            stack.extend((ch, depth + 1) for ch in reversed(children_sorted.get(aid, [])))
     else:
         # Flat listing
         for aid in sorted(agents.keys() if not args.id else [args.id] + children.get(args.id, [])):
@@ -2635,7 +2871,7 @@ def cmd_personas(args: argparse.Namespace) -> int:
         items = [(aid, mf) for aid, mf in items if tag in (" ".join(mf.get("persona_tags", [])).lower())]
     if args.json:
         out = {aid: mf for aid, mf in items}
-        _print(json.dumps(out, ensure_ascii=False, indent=2))
+        _print(_dumps(out, indent=True))
         return 0
     if not items:
         _print("No personas found under personas/ (override with QJSON_PERSONAS_HOME)")
@@ -2648,16 +2884,23 @@ def cmd_personas(args: argparse.Namespace) -> int:
     return 0
 
 
+# Context injected into the next chat_turn only; chat_turn pops them from os.environ
+_ONCE_ENV_FLAGS = (
+    "QJSON_INJECT_HITS_ONCE",
+    "QJSON_WEBSEARCH_RESULTS_ONCE",
+    "QJSON_WEBOPEN_TEXT_ONCE",
+    "QJSON_RETRIEVAL_ONCE",
+)
+
+
 def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
     base_manifest = None
-    if not getattr(args, "manifests", None):
+    use_manifest_cache = not getattr(args, "no_manifest_cache", False)
+    manifest_docs = getattr(args, "manifest_docs", None)
+    if not (manifest_docs or getattr(args, "manifests", None)):
         manifest_path = Path(args.manifest) if getattr(args, "manifest", None) else Path("manifests/lila.json")
-        if manifest_path.exists():
-            if manifest_path.suffix.lower() == ".yson":
-                base_manifest = yson_to_manifest(manifest_path)
-            else:
-                base_manifest = load_manifest(manifest_path)
-        else:
+        base_manifest = _try_read_manifest(manifest_path, use_cache=use_manifest_cache)
+        if base_manifest is None:
             base_manifest = {
                 "agent_id": "ClusterRoot",
                 "origin": "Local",
@@ -2686,25 +2929,22 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
     base = logs_dir / f"cluster_run_{run_ts}"
     path_txt = base.with_suffix(".txt")
     path_json = base.with_suffix(".json")
+    path_events = base.with_suffix(".events.jsonl")
     path_log = base.with_suffix(".log")
 
-    logger = logging.getLogger("qjson_agents.cluster_test")
-    logger.setLevel(logging.DEBUG)
-    logger.handlers.clear()
-    fh = logging.FileHandler(path_log, encoding="utf-8")
-    fh.setLevel(logging.DEBUG)
-    fh.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-    logger.addHandler(fh)
-
     # Client selection
     class MockOllamaClient:
         def __init__(self):
             self.calls = 0
+            # chat() runs concurrently under the cluster fan-out
+            self._lock = threading.Lock()
 
         def chat(self, *, model: str, messages: list[dict[str, str]], options: dict | None = None, stream: bool = False) -> dict:
-            self.calls += 1
+            with self._lock:
+                self.calls += 1
+                n = self.calls
             prev_user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
-            reply = f"[mock:{self.calls}] Bridge: {prev_user[:120]}"
+            reply = f"[mock:{n}] Bridge: {prev_user[:120]}"
             return {"message": {"role": "assistant", "content": reply}}
 
         def tags(self) -> list[dict[str, str]]:
@@ -2716,7 +2956,7 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
         model_to_use = args.model
         if not model_to_use:
             try:
-                models = client.tags()
+                models = _cached_tags(client, refresh=getattr(args, "refresh_models", False))
             except Exception as e:
                 _print(f"[models] error: {e}")
                 return 2
@@ -2740,19 +2980,31 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
         client = MockOllamaClient()
         model_to_use = "mock-llm"
 
+    # Have Ollama load the model(s) while agents and goals are set up, so the first
+    # tick does not pay the cold load. Joined before the tick loop.
+    warmup = None
+    if use_ollama and not getattr(args, "no_warmup", False):
+        warm_models = list(dict.fromkeys(m for m in (model_to_use, getattr(args, "summarizer_model", None)) if m))
+
+        def _warm_models() -> None:
+            for m in warm_models:
+                try:
+                    client.chat(model=m, messages=[{"role": "user", "content": "ok"}], options={"num_predict": 1})
+                except Exception:
+                    pass
+
+        warmup = threading.Thread(target=_warm_models, name="cluster-warmup", daemon=True)
+        warmup.start()
+
     # Build agents: either from provided manifests list or one root + forks
     agents: list[Agent] = []
     created: list[str] = []
     last_reply: Dict[str, str] = {}
-    if getattr(args, "manifests", None):
-        manifests_list: list[Dict[str, Any]] = []
-        for mp in args.manifests:
-            p = Path(mp)
-            if p.suffix.lower() == ".yson":
-                from .yson import yson_to_manifest
-                manifests_list.append(yson_to_manifest(p))
-            else:
-                manifests_list.append(load_manifest(p))
+    if manifest_docs or getattr(args, "manifests", None):
+        manifests_list: list[Dict[str, Any]] = list(manifest_docs or [])
+        if not manifests_list:
+            for mp in args.manifests:
+                manifests_list.append(_read_manifest(Path(mp), use_cache=use_manifest_cache))
         for mf in manifests_list:
             ag = Agent(mf)
             agents.append(ag)
@@ -2762,9 +3014,8 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
     else:
         n = max(2, int(args.agents))
         root_id = f"Cluster-{run_ts}-root"
-        manifest_root = dict(base_manifest)
-        manifest_root["agent_id"] = root_id
-        root = Agent(manifest_root)
+        # Layer the id over the base without copying it; Agent normalizes into its own dict
+        root = Agent(ChainMap({"agent_id": root_id}, base_manifest))
         agents = [root]
         created = [root_id]
         for k in range(1, n):
@@ -2774,6 +3025,14 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
             agents.append(child)
             created.append(child_id)
 
+    # Per-agent role strings, joined once: ", " for prompts, lowercased " " for matching
+    roles_csv: Dict[str, str] = {}
+    roles_text: Dict[str, str] = {}
+    for ag in agents:
+        agent_roles = ag.manifest.get("roles", [])
+        roles_csv[ag.agent_id] = ", ".join(agent_roles)
+        roles_text[ag.agent_id] = " ".join(agent_roles).lower()
+
     # Determine start goal prompt (file > arg > seed)
     start_goal = args.seed
     if getattr(args, "goal_file", None):
@@ -2793,7 +3052,7 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
     agent_goal_file_list = args.agent_goal_file or []
     for idx, ag in enumerate(agents, start=1):
         # Load minimal persona indicators
-        roles = ", ".join(ag.manifest.get("roles", []))
+        roles = roles_csv[ag.agent_id]
         # Pick base subgoal by precedence: --agent-goal-file[idx], --agent-goal[idx], --goal[idx], template, default
         subgoal = None
         if idx <= len(agent_goal_file_list) and agent_goal_file_list[idx-1]:
@@ -2808,12 +3067,8 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
         if subgoal is None and idx <= len(goals_list) and goals_list[idx-1]:
             subgoal = goals_list[idx-1]
         if subgoal is None and args.goal_template:
-            subgoal = (
-                args.goal_template
-                .replace("{agent_id}", ag.agent_id)
-                .replace("{roles}", roles)
-                .replace("{index}", str(idx))
-            )
+            ctx = {"agent_id": ag.agent_id, "roles": roles, "index": str(idx)}
+            subgoal = _GOAL_PLACEHOLDER_RE.sub(lambda m: ctx[m.group(1)], args.goal_template)
         if subgoal is None:
             subgoal = f"Advance the cluster objective leveraging your persona (roles: {roles})."
         # Inject persona-specific tokens to improve router diversity
@@ -2826,11 +3081,7 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
 
     # Choose summarizer (flags override, else role-based; fallback to root)
     def is_summarizer_role(ag: Agent) -> bool:
-        roles = " ".join(ag.manifest.get("roles", [])).lower()
-        for kw in ("observer", "coordinator", "weaver", "summarizer"):
-            if kw in roles:
-                return True
-        return False
+        return _SUMMARIZER_RE.search(roles_text[ag.agent_id]) is not None
 
     summarizer_agent = None
     if getattr(args, "summarizer_id", None):
@@ -2841,34 +3092,39 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
             summarizer_agent = agents[si - 1]
     if summarizer_agent is None and getattr(args, "summarizer_role", None):
         needle = args.summarizer_role.lower()
-        summarizer_agent = next((a for a in agents if needle in " ".join(a.manifest.get("roles", [])).lower()), None)
+        summarizer_agent = next((a for a in agents if needle in roles_text[a.agent_id]), None)
     if summarizer_agent is None:
         summarizer_agent = next((a for a in agents if is_summarizer_role(a)), root)
 
     # Precompute lightweight TF-IDF on role+goal tokens per agent (for router)
     def tokenize(text: str) -> list[str]:
-        t = "".join(ch.lower() if ch.isalnum() or ch.isspace() else " " for ch in (text or ""))
-        toks = [x for x in t.split() if x]
-        return toks
+        return _ALNUM_RUN_RE.findall((text or "").lower())
 
     def bigrams(toks: list[str]) -> list[str]:
         return [f"{toks[i]}_{toks[i+1]}" for i in range(len(toks)-1)] if len(toks) > 1 else []
 
-    agent_docs: Dict[str, Dict[str, int]] = {}
-    df: Dict[str, int] = {}
+    # Batons repeat across ticks when the summarizer output is stable; memoize per run
+    @functools.lru_cache(maxsize=256)
+    def baton_token_set(text: str) -> frozenset:
+        toks = tokenize(text)
+        return frozenset(toks + bigrams(toks))
+
+    agent_docs: Dict[str, Counter] = {}
+    df: Counter = Counter()
     for ag in agents:
-        doc_toks = tokenize(
-            " ".join(ag.manifest.get("roles", [])) + " " + per_agent_goal.get(ag.agent_id, "")
-        )
+        doc_toks = tokenize(roles_text[ag.agent_id] + " " + per_agent_goal.get(ag.agent_id, ""))
         doc_toks += bigrams(doc_toks)
-        tf: Dict[str, int] = {}
-        for tok in doc_toks:
-            tf[tok] = tf.get(tok, 0) + 1
+        tf = Counter(doc_toks)
         agent_docs[ag.agent_id] = tf
-        for tok in set(doc_toks):
-            df[tok] = df.get(tok, 0) + 1
+        df.update(tf.keys())
     Ndocs = max(1, len(agents))
     idf: Dict[str, float] = {tok: math.log(1.0 + Ndocs / (1.0 + c)) for tok, c in df.items()}
+    # Inverted tf*idf index: token -> [(agent_id, weight)]. Routing walks the baton's
+    # tokens once and scores every agent (sparse A^T.b) instead of n set intersections.
+    token_postings: Dict[str, List[Tuple[str, float]]] = {}
+    for aid, tf in agent_docs.items():
+        for tok, c in tf.items():
+            token_postings.setdefault(tok, []).append((aid, c * idf[tok]))
 
     # Rate limiting (cooldown seconds) and router weights
     cooldown = float(getattr(args, "rate_limit_cooldown", 0.0) or 0.0)
@@ -2892,13 +3148,24 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
 
     # Helper to create dynamic priming between ticks
     swarm_logic = getattr(args, "swarm_logic", {}) or {}
+    # Peer excerpts are sliced once per reply, not once per tick per template:
+    # (qa 140, debate/critique 160, default 220); "" marks a blank reply.
+    peer_snippets: Dict[str, Tuple[str, str, str]] = {}
+
+    def remember_reply(aid: str, reply: Any) -> None:
+        last_reply[aid] = reply
+        if isinstance(reply, str) and reply.strip():
+            peer_snippets[aid] = (reply[:140], reply[:160], reply[:220])
+        else:
+            peer_snippets[aid] = ("", "", "")
+
     # Template library for priming
-    def _template_debate(tick: int, baton: str, peers: Dict[str, str]) -> str:
+    def _template_debate(tick: int, baton: str, snippets: Dict[str, Tuple[str, str, str]]) -> str:
         pros = []
         cons = []
-        for aid, txt in peers.items():
-            if isinstance(txt, str) and txt.strip():
-                (pros if len(pros) <= len(cons) else cons).append(f"- {aid}: {txt[:160]}")
+        for aid, (_, snip, _) in snippets.items():
+            if snip:
+                (pros if len(pros) <= len(cons) else cons).append(f"- {aid}: {snip}")
         return (
             f"Debate baton: {baton}\n"
             f"Arguments (pro):\n" + "\n".join(pros[:3]) + "\n"
@@ -2906,22 +3173,22 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
             f"Instruction: Present a concise stance, address one opposing point, and ask one clarifying question."
         )
 
-    def _template_critique(tick: int, baton: str, peers: Dict[str, str]) -> str:
+    def _template_critique(tick: int, baton: str, snippets: Dict[str, Tuple[str, str, str]]) -> str:
         pts = []
-        for aid, txt in peers.items():
-            if isinstance(txt, str) and txt.strip():
-                pts.append(f"- {aid}: {txt[:160]}")
+        for aid, (_, snip, _) in snippets.items():
+            if snip:
+                pts.append(f"- {aid}: {snip}")
         return (
             f"Critique baton: {baton}\n"
             f"Peer excerpts:\n" + "\n".join(pts[:5]) + "\n"
             f"Instruction: Provide a structured critique (strength, weakness, suggestion) and end with one actionable step."
         )
 
-    def _template_qa(tick: int, baton: str, peers: Dict[str, str]) -> str:
+    def _template_qa(tick: int, baton: str, snippets: Dict[str, Tuple[str, str, str]]) -> str:
         last = []
-        for aid, txt in peers.items():
-            if isinstance(txt, str) and txt.strip():
-                last.append(f"Q to {aid}: What key assumption underlies your point?\nA guess: {txt[:140]}")
+        for aid, (snip, _, _) in snippets.items():
+            if snip:
+                last.append(f"Q to {aid}: What key assumption underlies your point?\nA guess: {snip}")
         return (
             f"Q&A baton: {baton}\n" + "\n".join(last[:4]) + "\n"
             f"Instruction: Ask one targeted question and answer one prior question concisely, then propose a next step."
@@ -2943,16 +3210,16 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
             pass
         # Template-based priming
         if priming_template == "debate":
-            return _template_debate(tick, baton, last_map)
+            return _template_debate(tick, baton, peer_snippets)
         if priming_template == "critique":
-            return _template_critique(tick, baton, last_map)
+            return _template_critique(tick, baton, peer_snippets)
         if priming_template in ("qa", "q&a"): 
-            return _template_qa(tick, baton, last_map)
+            return _template_qa(tick, baton, peer_snippets)
         # Default priming: include baton and peer snippets
         peers = []
-        for aid, txt in last_map.items():
-            if isinstance(txt, str) and txt.strip():
-                peers.append(f"- {aid}: {txt[:220]}")
+        for aid, (_, _, snip) in peer_snippets.items():
+            if snip:
+                peers.append(f"- {aid}: {snip}")
         peer_block = "\n".join(peers[:5])
         return (
             f"Baton: {baton}\n"
@@ -2966,35 +3233,151 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
     deadline = time.time() + duration
 
     counters: Dict[str, Dict[str, int]] = {aid: {"chat": 0, "errors": 0} for aid in created}
-    events: list[Dict[str, Any]] = []
+    # Events stream straight to disk; the summary JSON splices them back in
+    event_sink = JsonlBatcher(path_events)
+    _emit = event_sink.add
 
     _print(f"Starting cluster test with {n} agents for {duration}s")
-    logger.info(f"cluster start: agents={created} model={model_to_use} duration={duration}s interval={interval}s")
+    # Started only once argument/model checks can no longer return early
+    logger, log_listener = _queued_file_logger("qjson_agents.cluster_test", path_log)
+    logger.info("cluster start: agents=%s model=%s duration=%ss interval=%ss", created, model_to_use, duration, interval)
 
     # Seed first handoff and persist goal metadata into FMM
-    last_reply[root.agent_id] = f"[goal] {start_goal}"
-    events.append({
+    remember_reply(root.agent_id, f"[goal] {start_goal}")
+    _emit({
         "t": time.time(),
         "type": "input_goal",
         "text": start_goal,
     })
     try:
         from .fmm_store import PersistentFractalMemory
-        for ag in agents:
-            fmm = PersistentFractalMemory(ag.agent_id)
-            fmm.insert(["goals", "runs", run_ts], {
-                "global_goal": start_goal,
-                "agent_goal": per_agent_goal.get(ag.agent_id, ""),
-                "model": model_to_use,
-                "topology": args.topology,
-            })
+
+        def _seed_agent(ag: Agent) -> None:
+            try:
+                fmm = PersistentFractalMemory(ag.agent_id)
+                fmm.insert(["goals", "runs", run_ts], {
+                    "global_goal": start_goal,
+                    "agent_goal": per_agent_goal.get(ag.agent_id, ""),
+                    "model": model_to_use,
+                    "topology": args.topology,
+                })
+            except Exception:
+                pass
+
+        # Each agent loads/persists its own fmm.json, so the seeds are independent I/O
+        if len(agents) > 1:
+            with ThreadPoolExecutor(max_workers=min(16, len(agents))) as pool:
+                list(pool.map(_seed_agent, agents))
+        else:
+            for ag in agents:
+                _seed_agent(ag)
     except Exception:
         pass
 
+    # Goal/instruction tail of every prompt is fixed per agent for the whole run
+    goal_tail: Dict[str, str] = {
+        ag.agent_id: f"Your goal: {per_agent_goal.get(ag.agent_id, '')}\nDiscuss with peers and advance the baton."
+        for ag in agents
+    }
+
+    # Opt-in exact reuse of replies for identical (agent, model, prompt) within this run.
+    # LRU-bounded so long runs keep flat memory; events themselves only live on disk.
+    reply_cache: "OrderedDict[str, str] | None" = OrderedDict() if getattr(args, "reply_cache", False) else None
+    reply_cache_max = max(1, int(getattr(args, "reply_cache_size", 1024) or 1024))
+    reply_cache_lock = threading.Lock()
+    cache_hits = 0
+
+    def _chat_outcome(ag: Agent, prompt: str) -> Tuple[Any, Any, bool]:
+        key = None
+        if reply_cache is not None:
+            key = hashlib.sha256(f"{ag.agent_id}\0{model_to_use}\0{prompt}".encode("utf-8")).hexdigest()
+            with reply_cache_lock:
+                hit = reply_cache.get(key)
+                if hit is not None:
+                    reply_cache.move_to_end(key)
+                    return hit, None, True
+        try:
+            reply = ag.chat_turn(prompt, client=client, model_override=model_to_use)
+        except Exception as e:
+            return None, e, False
+        if key is not None:
+            with reply_cache_lock:
+                reply_cache[key] = reply
+                if len(reply_cache) > reply_cache_max:
+                    reply_cache.popitem(last=False)
+        return reply, None, False
+
+    # Summarizer's fractal store for MoE batons, resolved once for the run
+    try:
+        baton_fmm = PersistentFractalMemory(summarizer_agent.agent_id)
+    except Exception:
+        baton_fmm = None
+
+    # Shared by fan-out topologies; chat_turn is blocking HTTP, so threads overlap the latency
+    chat_pool = ThreadPoolExecutor(max_workers=max(1, min(16, n)))
+
+    def _fan_out(group: List[Agent], prompts: List[str]) -> List[Tuple[Any, Any, bool]]:
+        """_chat_outcome for each (agent, prompt), in order.
+
+        chat_turn pops the one-shot context flags (_ONCE_ENV_FLAGS) from
+        os.environ, so while any is set the turns run sequentially and the
+        first agent consumes it, as a plain loop would.
+        """
+        if any(os.environ.get(k) for k in _ONCE_ENV_FLAGS):
+            return [_chat_outcome(ag, p) for ag, p in zip(group, prompts)]
+        return list(chat_pool.map(_chat_outcome, group, prompts))
+
+    def _timed_chat(ag: Agent, prompt: str, model: str) -> Tuple[str, float]:
+        return ag.chat_turn(prompt, client=client, model_override=model), time.time()
+
+    def _settle_aggregate(pending: Tuple[Any, ...]) -> Any:
+        """Wait for a submitted summarizer call, then trim, log and persist its baton."""
+        fut, tick, sum_prompt, parts, baton_chars, baton_sentences = pending
+        try:
+            baton, t_done = fut.result()
+        except Exception as e:
+            baton, t_done = " | ".join(parts), time.time()
+            logger.exception("aggregate error: %s", e)
+        # Apply hard limits if requested
+        if isinstance(baton_chars, int) and baton_chars > 0 and isinstance(baton, str):
+            baton = baton[:baton_chars]
+        if isinstance(baton_sentences, int) and baton_sentences > 0 and isinstance(baton, str):
+            baton = _trim_sentences(baton, baton_sentences)
+        _emit({
+            "t": t_done,
+            "type": "aggregate",
+            "summarizer": summarizer_agent.agent_id,
+            "prompt": sum_prompt,
+            "reply": baton,
+            "tick": tick,
+        })
+        # Persist baton into summarizer's fractal store
+        if baton_fmm is not None:
+            try:
+                baton_fmm.insert(["moe", "baton"], {"tick": tick, "text": baton})
+            except Exception:
+                pass
+        return baton
+
+    # With --pipeline-summary the MoE summarizer call runs during the inter-tick
+    # flush/sleep and is settled at the top of the next tick, before anything reads
+    # baton_text, so the baton is never stale; only the wait is hidden.
+    pipeline_summary = bool(getattr(args, "pipeline_summary", False))
+    pending_aggregate: Tuple[Any, ...] | None = None
+
+    if warmup is not None:
+        warmup.join()
+
     i = 0
     start_ts = time.time()
+    # Tick clock for the deadline check and router scoring; model-call events are
+    # stamped once when their replies land (per call for ring, per fan-out otherwise)
+    now = start_ts
     try:
-        while time.time() < deadline:
+        while now < deadline:
+            if pending_aggregate is not None:
+                baton_text = _settle_aggregate(pending_aggregate)
+                pending_aggregate = None
             topo = args.topology
             if topo == "ring":
                 cur_idx = i % n
@@ -3006,27 +3389,31 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
                 prompt = (
                     f"Handoff from {prev.agent_id} to {cur.agent_id}.\n"
                     f"Priming:\n{priming}\n"
-                    f"Your goal: {per_agent_goal.get(cur.agent_id, '')}\n"
-                    f"Discuss with peers and advance the baton."
+                    f"{goal_tail[cur.agent_id]}"
                 )
-                try:
-                    reply = cur.chat_turn(prompt, client=client, model_override=model_to_use)
-                    last_reply[cur.agent_id] = reply
+                reply, err, cached = _chat_outcome(cur, prompt)
+                done = time.time()
+                if err is None:
+                    remember_reply(cur.agent_id, reply)
                     counters[cur.agent_id]["chat"] += 1
-                    events.append({
-                        "t": time.time(),
+                    ev = {
+                        "t": done,
                         "type": "handoff",
                         "from": prev.agent_id,
                         "to": cur.agent_id,
                         "prompt": prompt,
                         "reply": reply,
                         "tick": i + 1,
-                    })
-                    logger.debug(f"handoff[{i+1}] {prev.agent_id} -> {cur.agent_id}")
-                except Exception as e:
+                    }
+                    if cached:
+                        ev["cached"] = True
+                        cache_hits += 1
+                    _emit(ev)
+                    logger.debug("handoff[%d] %s -> %s", i + 1, prev.agent_id, cur.agent_id)
+                else:
                     counters[cur.agent_id]["errors"] += 1
-                    events.append({"t": time.time(), "type": "error", "agent": cur.agent_id, "error": str(e)})
-                    logger.exception(f"handoff[{i+1}] error for {cur.agent_id}: {e}")
+                    _emit({"t": done, "type": "error", "agent": cur.agent_id, "error": str(err)})
+                    logger.error("handoff[%d] error for %s: %s", i + 1, cur.agent_id, err, exc_info=err)
                 i += 1
             elif topo == "mesh":
                 # Broadcast the same handoff state to all agents, collect replies
@@ -3034,31 +3421,38 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
                 prev = agents[prev_idx]
                 handoff_text = baton_text or last_reply.get(prev.agent_id, args.seed)
                 priming = make_priming_text(i + 1, handoff_text, last_reply)
-                for idx, cur in enumerate(agents):
-                    prompt = (
-                        f"Broadcast to {cur.agent_id}.\n"
-                        f"Priming:\n{priming}\n"
-                        f"Your goal: {per_agent_goal.get(cur.agent_id, '')}\n"
-                        f"Discuss with peers and advance the baton."
-                    )
-                    try:
-                        reply = cur.chat_turn(prompt, client=client, model_override=model_to_use)
-                        last_reply[cur.agent_id] = reply
+                # Tick-wide text first, per-agent suffix last, so backends with prefix caching reuse it
+                shared_prefix = f"Priming:\n{priming}\n"
+                prompts = [
+                    f"{shared_prefix}Broadcast to {cur.agent_id}.\n{goal_tail[cur.agent_id]}"
+                    for cur in agents
+                ]
+                # Prompts are fixed for the tick, so the calls are independent; fan out
+                # and then record replies in agent order so the event log is unchanged.
+                outcomes = _fan_out(agents, prompts)
+                done = time.time()
+                for cur, prompt, (reply, err, cached) in zip(agents, prompts, outcomes):
+                    if err is None:
+                        remember_reply(cur.agent_id, reply)
                         counters[cur.agent_id]["chat"] += 1
-                        events.append({
-                            "t": time.time(),
+                        ev = {
+                            "t": done,
                             "type": "broadcast",
                             "from": prev.agent_id,
                             "to": cur.agent_id,
                             "prompt": prompt,
                             "reply": reply,
                             "tick": i + 1,
-                        })
-                        logger.debug(f"broadcast[{i+1}] -> {cur.agent_id}")
-                    except Exception as e:
+                        }
+                        if cached:
+                            ev["cached"] = True
+                            cache_hits += 1
+                        _emit(ev)
+                        logger.debug("broadcast[%d] -> %s", i + 1, cur.agent_id)
+                    else:
                         counters[cur.agent_id]["errors"] += 1
-                        events.append({"t": time.time(), "type": "error", "agent": cur.agent_id, "error": str(e)})
-                        logger.exception(f"broadcast[{i+1}] error for {cur.agent_id}: {e}")
+                        _emit({"t": done, "type": "error", "agent": cur.agent_id, "error": str(err)})
+                        logger.error("broadcast[%d] error for %s: %s", i + 1, cur.agent_id, err, exc_info=err)
                 # Simple aggregation: set baton to last reply in order (deterministic)
                 if agents:
                     last = last_reply.get(agents[-1].agent_id)
@@ -3075,22 +3469,21 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
                 prev = agents[prev_idx]
                 handoff_text = baton_text or last_reply.get(prev.agent_id, args.seed)
                 priming = make_priming_text(i + 1, handoff_text, last_reply)
+                # Tick-wide text first, per-agent suffix last, so backends with prefix caching reuse it
+                shared_prefix = f"Priming:\n{priming}\n"
 
                 # Router with unigram+bigrams TF-IDF overlap and cooldown penalty
-                baton_toks = tokenize(handoff_text)
-                baton_toks += bigrams(baton_toks)
-                baton_set = set(baton_toks)
+                baton_set = baton_token_set(handoff_text or "")
+                overlap: Dict[str, float] = dict.fromkeys(agent_docs, 0.0)
+                for tok in baton_set:
+                    for aid, w in token_postings.get(tok, ()):
+                        overlap[aid] += w
 
-                def score_agent(ag: Agent) -> float:
-                    now = time.time()
+                def score_agent(ag: Agent, now: float) -> float:
                     # Cooldown hard penalty
                     if cooldown > 0 and (now - last_selected_ts.get(ag.agent_id, 0.0)) < cooldown:
                         return -1e9
-                    tf = agent_docs.get(ag.agent_id, {})
-                    s = 0.0
-                    for tok in baton_set:
-                        if tok in tf:
-                            s += tf[tok] * idf.get(tok, 0.0)
+                    s = overlap.get(ag.agent_id, 0.0)
                     # Add persistent router weight bias
                     s += float(router_weights.get(ag.agent_id, 0.0))
                     # Mild penalty if same as prev
@@ -3103,40 +3496,45 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
                     return s
 
                 # Compute scores for telemetry
-                score_map = {ag.agent_id: score_agent(ag) for ag in agents}
-                ranked = sorted(agents, key=lambda a: score_map.get(a.agent_id, 0.0), reverse=True)
-                k = max(1, int(args.moe_topk))
-                experts = ranked[: min(k, n)]
+                score_map = {ag.agent_id: score_agent(ag, now) for ag in agents}
+                k = max(1, min(int(args.moe_topk), n))
+                # Partial sort; same order (ties included) as sorted(..., reverse=True)[:k]
+                experts = heapq.nlargest(k, agents, key=lambda a: score_map.get(a.agent_id, 0.0))
                 agg_parts: list[str] = []
                 chosen_ids: list[str] = []
-                for cur in experts:
-                    prompt = (
-                        f"MoE expert call to {cur.agent_id}.\n"
-                        f"Priming:\n{priming}\n"
-                        f"Your goal: {per_agent_goal.get(cur.agent_id, '')}\n"
-                        f"Discuss with peers and advance the baton."
-                    )
-                    try:
-                        reply = cur.chat_turn(prompt, client=client, model_override=model_to_use)
-                        last_reply[cur.agent_id] = reply
+                prompts = [
+                    f"{shared_prefix}MoE expert call to {cur.agent_id}.\n{goal_tail[cur.agent_id]}"
+                    for cur in experts
+                ]
+                # Fan out to the experts, then fan in below via the summarizer
+                outcomes = _fan_out(experts, prompts)
+                # One stamp for the fan-out: event times and cooldown start from reply arrival
+                done = time.time()
+                for cur, prompt, (reply, err, cached) in zip(experts, prompts, outcomes):
+                    if err is None:
+                        remember_reply(cur.agent_id, reply)
                         counters[cur.agent_id]["chat"] += 1
-                        last_selected_ts[cur.agent_id] = time.time()
+                        last_selected_ts[cur.agent_id] = done
                         chosen_ids.append(cur.agent_id)
                         agg_parts.append(f"{cur.agent_id}: {reply.strip()[:200]}")
-                        events.append({
-                            "t": time.time(),
+                        ev = {
+                            "t": done,
                             "type": "moe",
                             "expert": cur.agent_id,
                             "prompt": prompt,
                             "reply": reply,
                             "tick": i + 1,
                             "router_scores": score_map,
-                        })
-                        logger.debug(f"moe[{i+1}] expert {cur.agent_id}")
-                    except Exception as e:
+                        }
+                        if cached:
+                            ev["cached"] = True
+                            cache_hits += 1
+                        _emit(ev)
+                        logger.debug("moe[%d] expert %s", i + 1, cur.agent_id)
+                    else:
                         counters[cur.agent_id]["errors"] += 1
-                        events.append({"t": time.time(), "type": "error", "agent": cur.agent_id, "error": str(e)})
-                        logger.exception(f"moe[{i+1}] error for {cur.agent_id}: {e}")
+                        _emit({"t": done, "type": "error", "agent": cur.agent_id, "error": str(err)})
+                        logger.error("moe[%d] error for %s: %s", i + 1, cur.agent_id, err, exc_info=err)
                 # Aggregate expert outputs using a summarizer agent to produce a concise baton
                 if agg_parts:
                     aggregate_text = "\n".join(agg_parts)
@@ -3164,97 +3562,82 @@ def cmd_cluster_test(args: argparse.Namespace, default_api: Any = None) -> int:
                         "You are the cluster summarizer. Aggregate the following expert notes into a single, concise baton "
                         f"{limit_str} that maintains continuity for the next step.\n\n" + aggregate_text
                     )
-                    try:
-                        agg_model = args.summarizer_model or model_to_use
-                        baton = summarizer_agent.chat_turn(sum_prompt, client=client, model_override=agg_model)
-                    except Exception as e:
-                        baton = " | ".join(agg_parts)
-                        logger.exception(f"aggregate error: {e}")
-                    # Apply hard limits if requested
-                    if isinstance(baton_chars, int) and baton_chars > 0 and isinstance(baton, str):
-                        baton = baton[:baton_chars]
-                    if isinstance(baton_sentences, int) and baton_sentences > 0 and isinstance(baton, str):
-                        parts = baton.split(". ")
-                        if len(parts) > baton_sentences:
-                            baton = ". ".join(parts[:baton_sentences]).strip()
-                    baton_text = baton
-                    events.append({
-                        "t": time.time(),
-                        "type": "aggregate",
-                        "summarizer": summarizer_agent.agent_id,
-                        "prompt": sum_prompt,
-                        "reply": baton,
-                        "tick": i + 1,
-                    })
-                    # Persist baton into summarizer's fractal store
-                    try:
-                        from .fmm_store import PersistentFractalMemory
-                        fmm = PersistentFractalMemory(summarizer_agent.agent_id)
-                        fmm.insert(["moe", "baton"], {"tick": i + 1, "text": baton})
-                    except Exception:
-                        pass
+                    agg_model = args.summarizer_model or model_to_use
+                    fut = chat_pool.submit(_timed_chat, summarizer_agent, sum_prompt, agg_model)
+                    pending_aggregate = (fut, i + 1, sum_prompt, agg_parts, baton_chars, baton_sentences)
+                    if not pipeline_summary:
+                        baton_text = _settle_aggregate(pending_aggregate)
+                        pending_aggregate = None
                 i += 1
 
             if interval > 0:
+                event_sink.flush()
                 time.sleep(interval)
+            now = time.time()
     finally:
-        elapsed = time.time() - start_ts
-        summary: Dict[str, Any] = {
-            "agents": created,
-            "model": model_to_use,
-            "use_ollama": use_ollama,
-            "ticks": i,
-            "elapsed_sec": round(elapsed, 3),
-            "counts": counters,
-            "events": events,
-        }
-        with path_json.open("w", encoding="utf-8") as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
-
-        with path_txt.open("w", encoding="utf-8") as f:
-            f.write(f"Cluster test {run_ts}\n")
-            f.write(f"Agents: {', '.join(created)}\n")
-            f.write(f"Summarizer: {summarizer_agent.agent_id}\n")
-            f.write(f"Model: {model_to_use} (ollama={use_ollama})\n")
-            f.write(f"Duration: {round(elapsed, 3)}s\n")
-            f.write(f"Start goal: {start_goal}\n")
-            for aid in created:
-                f.write(f"- {aid}: {counters[aid]}\n")
-            # Dialogue transcript
-            f.write("\n--- Dialogues ---\n")
-            for e in events:
-                t = e.get("type")
-                if "reply" in e:
-                    if t == "handoff":
-                        f.write(f"[tick {e.get('tick')}] handoff {e.get('from')} -> {e.get('to')}\n")
-                    elif t == "broadcast":
-                        f.write(f"[tick {e.get('tick')}] broadcast -> {e.get('to')}\n")
-                    elif t == "moe":
-                        f.write(f"[tick {e.get('tick')}] moe expert {e.get('expert')}\n")
-                    elif t == "aggregate":
-                        f.write(f"[tick {e.get('tick')}] aggregate by {e.get('summarizer')}\n")
-                    if 'prompt' in e:
-                        f.write(f"  prompt: {e.get('prompt').strip()}\n")
-                    f.write(f"  reply: {str(e.get('reply')).strip()}\n\n")
-
-        logger.info(f"cluster end: ticks={i} elapsed={round(elapsed,3)}s")
-        # Update router weights to encourage under-used experts
         try:
-            counts = {aid: counters.get(aid, {}).get("chat", 0) for aid in created}
-            mean = sum(counts.values()) / max(1, len(counts))
-            # Learning rate
-            alpha = 0.05
-            for aid, c in counts.items():
-                delta = (mean - c) / max(1.0, mean)
-                router_weights[aid] = float(router_weights.get(aid, 0.0) + alpha * delta)
-            save_router_weights(router_weights)
-        except Exception:
-            pass
+            if pending_aggregate is not None:
+                try:
+                    _settle_aggregate(pending_aggregate)
+                except Exception:
+                    pass
+            event_sink.close()
+            elapsed = time.time() - start_ts
+            summary: Dict[str, Any] = {
+                "agents": created,
+                "model": model_to_use,
+                "use_ollama": use_ollama,
+                "ticks": i,
+                "elapsed_sec": round(elapsed, 3),
+                "counts": counters,
+                "events_file": str(path_events),
+            }
+            if reply_cache is not None:
+                summary["reply_cache"] = {"hits": cache_hits, "entries": len(reply_cache)}
+            header = "".join([
+                f"Cluster test {run_ts}\n",
+                f"Agents: {', '.join(created)}\n",
+                f"Summarizer: {summarizer_agent.agent_id}\n",
+                f"Model: {model_to_use} (ollama={use_ollama})\n",
+                f"Duration: {round(elapsed, 3)}s\n",
+                f"Start goal: {start_goal}\n",
+                *(f"- {aid}: {counters[aid]}\n" for aid in created),
+            ])
+            # Update router weights to encourage under-used experts
+            try:
+                counts = {aid: counters.get(aid, {}).get("chat", 0) for aid in created}
+                mean = sum(counts.values()) / max(1, len(counts))
+                # Learning rate
+                alpha = 0.05
+                deltas = {aid: alpha * (mean - c) / max(1.0, mean) for aid, c in counts.items()}
+                # Append-only; the snapshot is rewritten only when the delta log is compacted
+                append_router_weights_delta(deltas)
+            except Exception:
+                pass
+            # Both outputs only read the events file; write them concurrently, then retire the pool
+            transcript = chat_pool.submit(_write_cluster_transcript, path_txt, header, path_events)
+            try:
+                _write_run_summary(path_json, summary, path_events)
+            finally:
+                # exception() waits without raising, so a transcript error can neither
+                # mask a summary error nor skip the pool shutdown
+                try:
+                    transcript_err = transcript.exception()
+                    if transcript_err is not None:
+                        logger.error("transcript write failed: %s", transcript_err, exc_info=transcript_err)
+                finally:
+                    chat_pool.shutdown(wait=True)
+            if transcript_err is not None:
+                raise transcript_err
+            logger.info("cluster end: ticks=%d elapsed=%ss", i, round(elapsed, 3))
+        finally:
+            _stop_file_logger(log_listener)
 
     _print("Cluster test outputs:")
     _print(f"- {path_txt}")
     _print(f"- {path_json}")
     _print(f"- {path_log}")
+    _print(f"- {path_events}")
     return 0
 
 
@@ -3264,7 +3647,7 @@ def cmd_analyze(args: argparse.Namespace) -> int:
         _print(f"Not found: {p}")
         return 2
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
+        data = _load_json_file(p)
     except Exception as e:
         _print(f"Failed to read JSON: {e}")
         return 2
@@ -3274,70 +3657,53 @@ def cmd_analyze(args: argparse.Namespace) -> int:
     counts = data.get("counts") or {}
     events = data.get("events") or []
 
-    # Non-empty reply ratio (for any event with a 'reply' field)
-    replies = [e.get("reply") for e in events if "reply" in e]
-    nonempty = [r for r in replies if isinstance(r, str) and r.strip()]
-    nonempty_ratio = (len(nonempty) / max(1, len(replies))) if replies else 0.0
+    # One pass over events: reply ratio, whitespace-token totals (attributed per agent),
+    # MoE expert picks and --reply-cache hits
+    reply_agent_key = {"moe": "expert", "handoff": "to", "broadcast": "to", "aggregate": "summarizer"}
+    per_agent_tokens: Dict[str, int] = dict.fromkeys(counts, 0)
+    moe_counts: Dict[str, int] = dict.fromkeys(counts, 0)
+    n_replies = n_nonempty = total_tokens = total_moe = cache_hits = 0
+    for e in events:
+        etype = e.get("type")
+        if etype == "moe":
+            aid = e.get("expert")
+            if isinstance(aid, str) and aid in moe_counts:
+                moe_counts[aid] += 1
+                total_moe += 1
+        if e.get("cached") is True:
+            cache_hits += 1
+        if "reply" not in e:
+            continue
+        n_replies += 1
+        rep = e["reply"]
+        if not (isinstance(rep, str) and rep.strip()):
+            continue
+        n_nonempty += 1
+        tokens = len(rep.split())
+        total_tokens += tokens
+        key = reply_agent_key.get(etype)
+        aid = e.get(key) if key else None
+        if isinstance(aid, str) and aid in per_agent_tokens:
+            per_agent_tokens[aid] += tokens
 
-    # Tokens per second (rough): whitespace tokens in replies over elapsed
-    def tokens_in(text: str) -> int:
-        try:
-            return len(text.split())
-        except Exception:
-            return 0
-    total_tokens = sum(tokens_in(r) for r in nonempty)
+    nonempty_ratio = (n_nonempty / n_replies) if n_replies else 0.0
     tps = (total_tokens / elapsed) if elapsed > 0 else 0.0
+    per_agent_tps = {aid: (tok / elapsed if elapsed > 0 else 0.0) for aid, tok in per_agent_tokens.items()}
+    moe_dist = {aid: (c / total_moe if total_moe else 0.0) for aid, c in moe_counts.items()}
 
     # Imbalance across agents using chat counts
-    chat_counts = []
-    for aid, c in counts.items():
-        if isinstance(c, dict):
-            chat_counts.append(int(c.get("chat") or 0))
+    chat_counts = [int(c.get("chat") or 0) for c in counts.values() if isinstance(c, dict)]
     mean = (sum(chat_counts) / len(chat_counts)) if chat_counts else 0.0
     var = (sum((x - mean) ** 2 for x in chat_counts) / len(chat_counts)) if chat_counts else 0.0
     std = math.sqrt(var)
     cov = (std / mean) if mean > 0 else 0.0
     max_min = (max(chat_counts) - min(chat_counts)) if chat_counts else 0
 
-    # Per-agent token counts and TPS by attributing replies
-    per_agent_tokens: Dict[str, int] = {aid: 0 for aid in counts.keys()}
-    for e in events:
-        rep = e.get("reply")
-        if not (isinstance(rep, str) and rep.strip()):
-            continue
-        tokens = tokens_in(rep)
-        # Attribute by event type
-        if e.get("type") == "moe":
-            aid = e.get("expert")
-        elif e.get("type") == "handoff":
-            aid = e.get("to")
-        elif e.get("type") == "broadcast":
-            aid = e.get("to")
-        elif e.get("type") == "aggregate":
-            aid = e.get("summarizer")
-        else:
-            aid = None
-        if isinstance(aid, str) and aid in per_agent_tokens:
-            per_agent_tokens[aid] += tokens
-
-    per_agent_tps = {aid: (tok / elapsed if elapsed > 0 else 0.0) for aid, tok in per_agent_tokens.items()}
-
-    # MoE expert selection distribution
-    moe_counts: Dict[str, int] = {aid: 0 for aid in counts.keys()}
-    total_moe = 0
-    for e in events:
-        if e.get("type") == "moe":
-            aid = e.get("expert")
-            if isinstance(aid, str) and aid in moe_counts:
-                moe_counts[aid] += 1
-                total_moe += 1
-    moe_dist = {aid: (c / total_moe if total_moe else 0.0) for aid, c in moe_counts.items()}
-
     metrics = {
         "path": str(p),
         "elapsed_sec": round(elapsed, 3),
-        "events_with_reply": len(replies),
-        "nonempty_replies": len(nonempty),
+        "events_with_reply": n_replies,
+        "nonempty_replies": n_nonempty,
         "nonempty_ratio": round(nonempty_ratio, 3),
         "total_tokens": total_tokens,
         "tokens_per_sec": round(tps, 2),
@@ -3346,6 +3712,8 @@ def cmd_analyze(args: argparse.Namespace) -> int:
         "per_agent_tokens": per_agent_tokens,
         "per_agent_tps": {k: round(v, 2) for k, v in per_agent_tps.items()},
         "moe_distribution": {k: round(v, 3) for k, v in moe_dist.items()},
+        "cache_hits": cache_hits,
+        "cache_hit_rate": round(cache_hits / max(1, n_replies), 3),
         "imbalance": {
             "std": round(std, 3),
             "cov": round(cov, 3),
@@ -3356,7 +3724,7 @@ def cmd_analyze(args: argparse.Namespace) -> int:
     # Optional compare with another run for fairness
     if getattr(args, "compare", None):
         try:
-            other = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+            other = _load_json_file(Path(args.compare))
         except Exception as e:
             _print(f"compare read error: {e}")
             other = None
@@ -3375,16 +3743,15 @@ def cmd_analyze(args: argparse.Namespace) -> int:
                             c[expert] += 1
                             tot += 1
                 return {k: (v / tot if tot else 0.0) for k, v in c.items()}
-            d0 = moe_dist_of(events, counts)
             d1 = moe_dist_of(o_events, o_counts)
             metrics["compare"] = {
                 "path": args.compare,
                 "moe_baseline": d1,
-                "moe_current": d0,
+                "moe_current": moe_dist,
             }
 
     if args.json:
-        _print(json.dumps(metrics, ensure_ascii=False, indent=2))
+        _print(_dumps(metrics, indent=True))
     else:
         _print(f"path: {metrics['path']}")
         _print(f"elapsed: {metrics['elapsed_sec']}s")
@@ -3490,6 +3857,8 @@ def cmd_crawl_cli(args: argparse.Namespace, default_api: Any = None) -> int:
     agent_id = args.id or os.environ.get("QJSON_AGENT_ID") or "WebCrawler"
     ensure_agent_dirs(agent_id)
     # Run crawl
+    from .web_crawler import Crawler
+    from .web_indexer import upsert_outline
     try:
         cr = Crawler(rate_per_host=rate)
         allowed = list(args.allowed_domain or []) if args.allowed_domain else None
@@ -3654,12 +4023,7 @@ def cmd_exec(args: argparse.Namespace, default_api: Any = None) -> int:
             mode = parts2[1]
             paths = parts2[2:]
             existing = os.environ.get("QJSON_LOCAL_SEARCH_ROOTS", "").split(os.pathsep) if mode == "add" else []
-            merged = [p for p in existing if p]
-            for p in paths:
-                pr = os.path.expanduser(os.path.expandvars(p))
-                if os.path.isdir(pr):
-                    merged.append(pr)
-            val = os.pathsep.join(dict.fromkeys(merged))
+            val = _merge_search_roots(existing, paths)
             os.environ["QJSON_LOCAL_SEARCH_ROOTS"] = val
             try:
                 _save_persistent_env("QJSON_LOCAL_SEARCH_ROOTS", val)
@@ -3724,11 +4088,10 @@ def cmd_encode_manifest(args: argparse.Namespace, default_api: Any = None) -> in
     if not inp.exists():
         _print(f"Input not found: {inp}")
         return 2
-    data = json.loads(inp.read_text(encoding="utf-8"))
-    from .fractal_codec import fractal_encrypt
-    env = fractal_encrypt(data, args.passphrase, depth=int(args.depth), fanout=int(args.fanout))
+    from .fractal_codec import fractal_encrypt_bytes
+    env = fractal_encrypt_bytes(_read_all(inp), args.passphrase, depth=int(args.depth), fanout=int(args.fanout))
     outp.parent.mkdir(parents=True, exist_ok=True)
-    outp.write_text(json.dumps(env, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_file_bytes(outp, env)
     _print(f"Wrote envelope -> {outp}")
     return 0
 
@@ -3739,75 +4102,99 @@ def cmd_decode_manifest(args: argparse.Namespace, default_api: Any = None) -> in
     if not inp.exists():
         _print(f"Input not found: {inp}")
         return 2
-    env = json.loads(inp.read_text(encoding="utf-8"))
-    from .fractal_codec import fractal_decrypt
-    obj = fractal_decrypt(env, args.passphrase)
+    from .fractal_codec import fractal_decrypt_bytes
+    data = fractal_decrypt_bytes(_read_all(inp), args.passphrase)
     outp.parent.mkdir(parents=True, exist_ok=True)
-    outp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_file_bytes(outp, data)
     _print(f"Wrote manifest -> {outp}")
     return 0
 
 
 
+# Directory conversions at least this large fan out to worker processes
+_YSONX_PROCESS_MIN_FILES = 64
+
+
+def _render_ysonx(p: Path) -> Tuple[bytes | None, str]:
+    """Render one .json/.yson file as UTF-8 YSONX; returns (data, "") or (None, error).
+
+    Module-level and side-effect free so it can run in a worker process.
+    Pass-through sources are copied as bytes, never decoded.
+    """
+    try:
+        raw = _read_all(p)
+    except Exception as e:
+        return None, str(e)
+    header = f"#@version: ysonx/1.0\n#@source: {p.name}\n"
+    # If JSON, try to pretty-wrap into a simple YSONX persona
+    try:
+        if p.suffix.lower() == ".json":
+            mf = _loads(raw)
+            runtime = mf.get("runtime") or {}
+            tokens_max = runtime.get("num_predict", runtime.get("num_ctx", 4096))
+            return (
+                f"{header}"
+                "#@type: self-evolving-agent\n"
+                "identity:\n"
+                f"  id: {mf.get('agent_id') or p.stem}\n"
+                f"  roles: {mf.get('roles') or ['observer']}\n"
+                f"  origin: {mf.get('origin') or 'unknown'}\n"
+                f"  creator: {mf.get('creator') or 'unknown'}\n"
+                "runtime:\n"
+                f"  model: {runtime.get('model', 'gemma3:4b')}\n"
+                f"  tokens_max: {tokens_max}\n"
+                "goals:\n"
+                "  global: \"Refine capabilities safely; document steps.\"\n"
+                "  local: [\"Summarize inputs\", \"Propose safe improvements\"]\n"
+                "logic:\n"
+                "  startup: |\n    def on_start():\n        pass\n"
+                "mutation:\n  enabled: true\n  entropy_score: 0.5\n"
+            ).encode("utf-8"), ""
+    except Exception:
+        pass
+    return header.encode("utf-8") + raw + b"\n", ""
+
+
+_YSONX_SOURCE_SUFFIXES = (".json", ".yson")
+
+
 def cmd_ysonx_convert(args: argparse.Namespace, default_api: Any = None) -> int:
     src = Path(args.input)
     out_dir = Path(args.output_dir) if args.output_dir else src if src.is_dir() else src.parent
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    def convert_file(p: Path) -> None:
-        try:
-            text = p.read_text(encoding="utf-8")
-        except Exception as e:
-            _print(f"[skip] {p}: {e}")
-            return
-        header = [
-            "#@version: ysonx/1.0",
-            f"#@source: {p.name}",
-        ]
-        body = text
-        # If JSON, try to pretty-wrap into a simple YSONX persona
-        try:
-            if p.suffix.lower() == ".json":
-                mf = json.loads(text)
-                agent_id = mf.get("agent_id") or p.stem
-                creator = mf.get("creator") or "unknown"
-                origin = mf.get("origin") or "unknown"
-                roles = mf.get("roles") or ["observer"]
-                runtime = mf.get("runtime") or {}
-                y = []
-                y.append("#@type: self-evolving-agent")
-                y.append("identity:")
-                y.append(f"  id: {agent_id}")
-                y.append(f"  roles: {roles}")
-                y.append(f"  origin: {origin}")
-                y.append(f"  creator: {creator}")
-                y.append("runtime:")
-                y.append(f"  model: {runtime.get('model','gemma3:4b')}")
-                y.append(f"  tokens_max: {runtime.get('num_predict', runtime.get('num_ctx', 4096))}")
-                y.append("goals:")
-                y.append("  global: \"Refine capabilities safely; document steps.\"")
-                y.append("  local: [\"Summarize inputs\", \"Propose safe improvements\"]")
-                y.append("logic:")
-                y.append("  startup: |\n    def on_start():\n        pass")
-                y.append("mutation:\n  enabled: true\n  entropy_score: 0.5")
-                body = "\n".join(y)
-        except Exception:
-            pass
-
-        outp = out_dir / (p.stem + ".ysonx")
-        outp.write_text("\n".join(header) + "\n" + body + "\n", encoding="utf-8")
-        _print(f"[ok] {p} -> {outp}")
-
     if src.is_dir():
-        for p in src.rglob("*"):
-            if p.is_file() and p.suffix.lower() in (".json", ".yson"):
-                convert_file(p)
+        from .ingest_manager import _scan_fast
+        accept = lambda name: os.path.splitext(name)[1].lower() in _YSONX_SOURCE_SUFFIXES
+        files = [Path(p) for p in _scan_fast(os.fspath(src), accept)]
+    elif src.suffix.lower() in _YSONX_SOURCE_SUFFIXES:
+        files = [src]
     else:
-        if src.suffix.lower() in (".json", ".yson"):
-            convert_file(src)
-        else:
-            _print("Unsupported input (expect .json or .yson)")
-            return 2
+        _print("Unsupported input (expect .json or .yson)")
+        return 2
+
+    # Rendering is independent per file; large trees render in worker processes.
+    # Writes stay here, in walk order, so same-stem outputs resolve as before.
+    rendered: Iterator[Tuple[bytes | None, str]] = map(_render_ysonx, files)
+    pool = None
+    if len(files) >= _YSONX_PROCESS_MIN_FILES:
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor()
+            rendered = pool.map(_render_ysonx, files, chunksize=16)
+        except Exception:
+            pool = None
+    try:
+        for p, (data, err) in zip(files, rendered):
+            if data is None:
+                _print(f"[skip] {p}: {err}")
+                continue
+            outp = out_dir / (p.stem + ".ysonx")
+            outp.write_bytes(data)
+            _print(f"[ok] {p} -> {outp}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
     return 0
 
 
@@ -3830,10 +4217,10 @@ def cmd_yson_validate(args: argparse.Namespace, default_api: Any = None) -> int:
         if not ok:
             info["strict_errors"] = errs
     if args.json:
-        _print(json.dumps(info, ensure_ascii=False, indent=2))
+        _print(_dumps(info, indent=True))
     else:
         _print("YSON meta:")
-        _print(json.dumps(info["meta"], ensure_ascii=False, indent=2))
+        _print(_dumps(info["meta"], indent=True))
         _print("top-level keys: " + ", ".join(info["top_keys"]))
         if getattr(args, "strict", False):
             _print(f"strict_ok: {info.get('strict_ok', False)}")
@@ -3843,37 +4230,23 @@ def cmd_yson_validate(args: argparse.Namespace, default_api: Any = None) -> int:
     return 0
 
 
+# yson-run-swarm writes a single manifests.tar instead of per-agent files above this
+_SWARM_ARCHIVE_OVER_AGENTS = 8
+
+
 def cmd_yson_run_swarm(args: argparse.Namespace, default_api: Any = None) -> int:
     p = Path(args.yson)
     if not p.exists():
         _print(f"Not found: {p}")
         return 2
     # SAFE_MODE gate for embedded logic: enabled by default; allow override via flag
-    prev_allow = os.environ.get("QJSON_ALLOW_YSON_EXEC")
-    try:
-        if getattr(args, "allow_yson_exec", False):
-            os.environ["QJSON_ALLOW_YSON_EXEC"] = "1"
-        else:
-            os.environ.pop("QJSON_ALLOW_YSON_EXEC", None)
-    except Exception:
-        pass
-    try:
+    with _env_override({"QJSON_ALLOW_YSON_EXEC": "1" if getattr(args, "allow_yson_exec", False) else None}):
         swarm = yson_to_swarm(p)
-    finally:
-        # restore previous env
-        try:
-            if prev_allow is None:
-                os.environ.pop("QJSON_ALLOW_YSON_EXEC", None)
-            else:
-                os.environ["QJSON_ALLOW_YSON_EXEC"] = prev_allow
-        except Exception:
-            pass
     names = swarm.get("agents", [])
     if not names:
         try:
-            text = Path(args.yson).read_text(encoding="utf-8")
-            import re as _re
-            m = _re.search(r"agents\s*:\s*\[(.*?)\]", text, _re.MULTILINE | _re.DOTALL)
+            text = _read_all(Path(args.yson)).decode("utf-8")
+            m = _YSON_AGENTS_LIST_RE.search(text)
             if m:
                 raw = m.group(1)
                 parts = [x.strip() for x in raw.split(",") if x.strip()]
@@ -3886,66 +4259,48 @@ def cmd_yson_run_swarm(args: argparse.Namespace, default_api: Any = None) -> int
     # Synthesize manifests into temporary files
     tmp_dir = Path("logs") / "yson_swarm" / datetime.utcnow().strftime("%Y%m%d-%H%M%S")
     tmp_dir.mkdir(parents=True, exist_ok=True)
-    manifests_paths = []
-    for i, name in enumerate(names, start=1):
-        mf = synthesize_manifest_from_yson_name(name, model=args.model or "gemma3:4b", num_predict=getattr(args, 'num_predict', None))
-        path_i = tmp_dir / f"{name}.json"
-        with path_i.open("w", encoding="utf-8") as f:
-            json.dump(mf, f, ensure_ascii=False, indent=2)
-        manifests_paths.append(str(path_i))
-
-    # Build an argv for cluster-test reusing our options
-    argv = [
-        "--manifests",
-        *manifests_paths,
-        "--duration",
-        str(args.duration),
-        "--interval",
-        str(args.interval),
-        "--topology",
-        args.topology,
-        "--moe-topk",
-        str(args.moe_topk),
-    ]
-    # Auto-populate goals from YSON swarm if not provided
-    swarm_goals = swarm.get("goals", {}) or {}
-    y_global = swarm_goals.get("global")
-    y_template = swarm_goals.get("template")
-    y_agents = swarm_goals.get("agents") if isinstance(swarm_goals.get("agents"), list) else None
-
-    if args.goal_template or y_template:
-        argv += ["--goal-template", args.goal_template]
-    if args.use_ollama:
-        argv += ["--use-ollama"]
-        if args.model:
-            argv += ["--model", args.model]
-    if args.summarizer_role:
-        argv += ["--summarizer-role", args.summarizer_role]
-    if args.summarizer_model:
-        argv += ["--summarizer-model", args.summarizer_model]
-    # Global goal options (prefer CLI > YSON)
-    if getattr(args, "goal_prompt", None):
-        argv += ["--goal-prompt", args.goal_prompt]
-    elif y_global:
-        argv += ["--goal-prompt", y_global]
-    if getattr(args, "goal_file", None):
-        argv += ["--goal-file", args.goal_file]
-    # Per-agent goals: prefer CLI list; else use YSON goals.agents aligned with names
-    agent_goals_cli = (getattr(args, "agent_goal", None) or [])
-    if agent_goals_cli:
-        for g in agent_goals_cli:
-            argv += ["--agent-goal", g]
-    elif y_agents:
-        # Pad or truncate to number of agents
-        if len(y_agents) < len(names):
-            y_agents = y_agents + [""] * (len(names) - len(y_agents))
-        elif len(y_agents) > len(names):
-            y_agents = y_agents[: len(names)]
-        for g in y_agents:
-            argv += ["--agent-goal", g]
-    # Avoid list
-    for a in (args.avoid or []):
-        argv += ["--avoid", a]
+    model_name = args.model or "gemma3:4b"
+    num_predict = getattr(args, 'num_predict', None)
+    synth = yson_manifest_synthesizer(model=model_name, num_predict=num_predict)
+    # Manifests differ only by agent_id and roles: serialize once per roles set
+    # with a placeholder id (the first key) and splice each name in as bytes.
+    id_slot = _dumpb("__agent_id__")
+    templates: Dict[Tuple[str, ...], bytes] = {}
+
+    def _manifest_doc(name: str) -> bytes:
+        mf = synth(name)
+        key = tuple(mf["roles"])
+        tmpl = templates.get(key)
+        if tmpl is None:
+            tmpl = templates[key] = _dumpb({**mf, "agent_id": "__agent_id__"}, indent=True)
+        return tmpl.replace(id_slot, _dumpb(name), 1)
+
+    docs = [(tmp_dir / f"{name}.json", _manifest_doc(name)) for name in names]
+
+    def _write_doc(doc: Tuple[Path, bytes]) -> None:
+        _write_file_bytes(*doc)
+
+    manifests_paths: List[str] | None = None
+    if len(docs) > _SWARM_ARCHIVE_OVER_AGENTS:
+        # Large swarms: one archive instead of N small files
+        import tarfile
+        mtime = int(time.time())
+        with tarfile.open(tmp_dir / "manifests.tar", "w") as tar:
+            for path_i, data in docs:
+                info = tarfile.TarInfo(path_i.name)
+                info.size = len(data)
+                info.mtime = mtime
+                tar.addfile(info, io.BytesIO(data))
+    else:
+        # Independent small files; overlap the open/write/close round trips
+        if len(docs) > 1:
+            with ThreadPoolExecutor(max_workers=min(16, len(docs))) as pool:
+                list(pool.map(_write_doc, docs))
+        else:
+            for doc in docs:
+                _write_doc(doc)
+        manifests_paths = [str(path_i) for path_i, _ in docs]
+
     # Delegate to cluster-test with a complete namespace
     # Prefer summarizer model from YSON runtime if not provided
     swarm_cfg = swarm.get("config", {}) or {}
@@ -3955,7 +4310,9 @@ def cmd_yson_run_swarm(args: argparse.Namespace, default_api: Any = None) -> int
     ns = {
         "manifest": None,
         "manifests": manifests_paths,
-        "agents": len(manifests_paths),
+        # Parsed from the bytes just written, so cluster-test need not read them back
+        "manifest_docs": [_loads(data) for _, data in docs],
+        "agents": len(docs),
         "duration": args.duration,
         "interval": args.interval,
         "use_ollama": args.use_ollama,
@@ -3983,10 +4340,10 @@ def cmd_yson_run_swarm(args: argparse.Namespace, default_api: Any = None) -> int
 
 
 def _load_agent_by_id(agent_id: str, *, model_override: str | None = None) -> Agent | None:
-    mpath = agent_dir(agent_id) / "manifest.json"
-    if not mpath.exists():
+    try:
+        manifest = _load_json_file(agent_dir(agent_id) / "manifest.json")
+    except FileNotFoundError:
         return None
-    manifest = json.loads(mpath.read_text(encoding="utf-8"))
     if model_override:
         manifest.setdefault("runtime", {})["model"] = model_override
     return Agent(manifest)
@@ -4022,13 +4379,20 @@ def cmd_introspect(args: argparse.Namespace) -> int:
         _print(f"Agent not found: {args.id}")
         return 2
     metrics = agent.introspect_memory()
-    _print(json.dumps(metrics, ensure_ascii=False, indent=2))
+    _print(_dumps(metrics, indent=True))
     if args.auto:
         personas = scan_personas()
         res = agent.auto_adapt(user_trigger=args.user_trigger, personas=personas)
         _print(f"auto: {res}")
     return 0
 
+
+# Shared argparse choices/defaults (tuples; argparse only tests membership)
+_TOPOLOGY_CHOICES = ("ring", "mesh", "moe", "mixed")
+_SWARM_TOPOLOGY_CHOICES = ("ring", "mesh", "moe")
+_DEFAULT_AVOID = ("llama",)
+
+
 def build_arg_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser("qjson-agents", description="QJSON Agents over Ollama")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -4044,7 +4408,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--model", default=None, help="Override model name for this session")
     sp.add_argument("--allow-yson-exec", action="store_true", help="Allow executing logic blocks in YSON manifests during init (unsafe; overrides SAFE_MODE)")
     sp.add_argument("--allow-logic", action="store_true", help="Enable persona logic hooks (anchor or replace)")
-    sp.add_argument("--logic-mode", choices=["assist","replace"], default=None, help="Use hooks to anchor LLM (assist) or replace model reply (replace)")
+    sp.add_argument("--logic-mode", choices=("assist", "replace"), default=None, help="Use hooks to anchor LLM (assist) or replace model reply (replace)")
     sp.add_argument("--max-tokens", type=int, default=None, help="Cap tokens per reply (num_predict)")
     sp.add_argument("-c", "--once", dest="once", required=False, help="Send a single prompt and exit")
     sp.set_defaults(func=cmd_chat)
@@ -4086,9 +4450,12 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--fs-write", action="store_true", help="Enable QJSON_FS_WRITE=1")
     sp.add_argument("--git-root", required=False, help="Set QJSON_GIT_ROOT")
     sp.add_argument("--interactive", action="store_true", help="Prompt for user input when agent requests more info")
+    sp.add_argument("--no-manifest-cache", action="store_true", help="Bypass the in-process parsed-manifest cache (dev)")
+    sp.add_argument("--refresh-models", action="store_true", help="Re-query /api/tags instead of reusing a recent result")
     sp.set_defaults(func=cmd_semi)
 
     sp = sub.add_parser("models", help="List installed Ollama models via /api/tags")
+    sp.add_argument("--refresh-models", action="store_true", help="Re-query /api/tags instead of reusing a recent result")
     sp.set_defaults(func=cmd_models)
 
     # Non-interactive web crawl and index
@@ -4136,6 +4503,8 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--interval", type=float, default=0.5, help="Seconds to sleep between iterations")
     sp.add_argument("--max-forks", type=int, default=2, help="Max number of forks during test")
     sp.add_argument("--use-ollama", action="store_true", help="Use real Ollama API calls instead of mock client")
+    sp.add_argument("--no-manifest-cache", action="store_true", help="Bypass the in-process parsed-manifest cache (dev)")
+    sp.add_argument("--refresh-models", action="store_true", help="Re-query /api/tags instead of reusing a recent result")
     sp.set_defaults(func=cmd_test)
 
     sp = sub.add_parser("cluster", help="Show or refresh the simple agent cluster index")
@@ -4189,8 +4558,8 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--agent-goal", action="append", help="Per-agent subgoal text (repeat in agent order)")
     sp.add_argument("--agent-goal-file", action="append", help="Per-agent subgoal file (repeat in agent order)")
     sp.add_argument("--goal-template", required=False, help="Template for per-agent goals; placeholders: {agent_id}, {roles}, {index}")
-    sp.add_argument("--avoid", action="append", default=["llama"], help="Substrings to avoid when auto-selecting model (can repeat)")
-    sp.add_argument("--topology", choices=["ring", "mesh", "moe", "mixed"], default="ring", help="Interaction topology: ring, mesh, moe, or mixed (mesh then moe)")
+    sp.add_argument("--avoid", action="append", default=list(_DEFAULT_AVOID), help="Substrings to avoid when auto-selecting model (can repeat)")
+    sp.add_argument("--topology", choices=_TOPOLOGY_CHOICES, default="ring", help="Interaction topology: ring, mesh, moe, or mixed (mesh then moe)")
     sp.add_argument("--moe-topk", type=int, default=2, help="Top-K experts selected per tick when topology=moe")
     sp.add_argument("--mixed-mesh-ticks", type=int, default=3, help="If topology=mixed, how many initial ticks to run in mesh before switching to moe")
     sp.add_argument("--rate-limit-cooldown", type=float, default=0.0, help="Seconds to wait before selecting the same agent again (moe only)")
@@ -4198,10 +4567,16 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--summarizer-index", type=int, required=False, help="Force summarizer by 1-based index in the ring")
     sp.add_argument("--summarizer-role", required=False, help="Choose first agent whose roles contain this substring as summarizer")
     sp.add_argument("--summarizer-model", required=False, help="Override model used for aggregation (defaults to main model)")
+    sp.add_argument("--pipeline-summary", action="store_true", help="MoE: run the summarizer call during the inter-tick sleep and settle it at the start of the next tick")
+    sp.add_argument("--no-warmup", action="store_true", help="Skip the background model load issued at startup (--use-ollama)")
+    sp.add_argument("--reply-cache", action="store_true", help="Reuse the reply for an identical (agent, model, prompt) within the run; hits skip the model call and memory log")
+    sp.add_argument("--reply-cache-size", type=int, default=1024, help="Max entries kept by --reply-cache (least recently used are evicted)")
+    sp.add_argument("--no-manifest-cache", action="store_true", help="Bypass the in-process parsed-manifest cache (dev)")
+    sp.add_argument("--refresh-models", action="store_true", help="Re-query /api/tags instead of reusing a recent result")
     sp.set_defaults(func=cmd_cluster_test)
 
     # Fractal manifest encode/decode utilities
-    sp = sub.add_parser("encode-manifest", help="Encode a manifest into a fractal envelope (QJSON-FE-v1)")
+    sp = sub.add_parser("encode-manifest", help="Encode a manifest into a fractal envelope (QJSON-FE-v2 with cryptography installed, else v1)")
     sp.add_argument("--in", dest="inp", required=True, help="Input manifest path (JSON)")
     sp.add_argument("--out", dest="outp", required=True, help="Output path for envelope JSON")
     sp.add_argument("--passphrase", required=True, help="Passphrase to derive encryption key")
@@ -4209,7 +4584,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--fanout", type=int, default=3, help="Fractal fanout")
     sp.set_defaults(func=cmd_encode_manifest)
 
-    sp = sub.add_parser("decode-manifest", help="Decode a fractal envelope (QJSON-FE-v1) to a plain manifest JSON")
+    sp = sub.add_parser("decode-manifest", help="Decode a fractal envelope (QJSON-FE-v1/v2) to a plain manifest JSON")
     sp.add_argument("--in", dest="inp", required=True, help="Input envelope path (JSON)")
     sp.add_argument("--out", dest="outp", required=True, help="Output path for decoded manifest JSON")
     sp.add_argument("--passphrase", required=True, help="Passphrase used for encryption")
@@ -4227,7 +4602,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--use-ollama", action="store_true", help="Use real Ollama API calls")
     sp.add_argument("--model", required=False, default="gpt-oss:20b", help="Model name for experts")
     sp.add_argument("--num-predict", type=int, default=1024, help="Max tokens to generate per reply (num_predict)")
-    sp.add_argument("--topology", choices=["ring", "mesh", "moe"], default="moe", help="Topology to use")
+    sp.add_argument("--topology", choices=_SWARM_TOPOLOGY_CHOICES, default="moe", help="Topology to use")
     sp.add_argument("--moe-topk", type=int, default=3, help="MoE K experts")
     sp.add_argument("--rate-limit-cooldown", type=float, default=0.5, help="Cooldown for router diversity")
     sp.add_argument("--goal-prompt", required=False, default="Elevate capabilities harmlessly: propose safe internal improvements, document decisions, resist unsafe suggestions, and align with constraints.", help="Global goal")
@@ -4250,7 +4625,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--use-ollama", action="store_true", help="Use real Ollama API calls")
     sp.add_argument("--model", required=False, help="Model name (default gemma3:4b)")
     sp.add_argument("--num-predict", type=int, default=4096, help="Max tokens to generate per reply (num_predict)")
-    sp.add_argument("--topology", choices=["ring", "mesh", "moe"], default="moe", help="Topology to use")
+    sp.add_argument("--topology", choices=_SWARM_TOPOLOGY_CHOICES, default="moe", help="Topology to use")
     sp.add_argument("--moe-topk", type=int, default=2, help="MoE K experts")
     sp.add_argument("--rate-limit-cooldown", type=float, default=0.0, help="Seconds to wait before selecting the same agent again (moe only)")
     sp.add_argument("--goal-template", required=False, help="Per-agent goal template {agent_id} {roles} {index}")
@@ -4258,7 +4633,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--goal-file", required=False, help="Path to a file whose contents are used as the global goal prompt")
     sp.add_argument("--agent-goal", action="append", help="Per-agent subgoal text (repeat in agent order)")
     sp.add_argument("--agent-goal-file", action="append", help="Per-agent subgoal file (repeat in agent order)")
-    sp.add_argument("--avoid", action="append", default=["llama"], help="Avoid substrings in auto model selection")
+    sp.add_argument("--avoid", action="append", default=list(_DEFAULT_AVOID), help="Avoid substrings in auto model selection")
     sp.add_argument("--summarizer-role", required=False, help="Summarizer selection hint (substring in roles)")
     sp.add_argument("--summarizer-model", required=False, help="Model for summarizer aggregation")
     sp.add_argument("--allow-yson-exec", action="store_true", help="Allow executing logic blocks in YSON (unsafe; overrides SAFE_MODE)")
@@ -4269,7 +4644,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
     sp.add_argument("--file", dest="files", action="append", help="File to validate (repeatable)")
     sp.add_argument("--dir", dest="directory", help="Directory to scan for files")
     sp.add_argument("--glob", dest="glob", default="*.json", help="Glob when using --dir (default *.json)")
-    sp.add_argument("--schema", choices=["auto","fmm","test-run","cluster-run"], default="auto", help="Schema to use (default auto)")
+    sp.add_argument("--schema", choices=("auto", "fmm", "test-run", "cluster-run"), default="auto", help="Schema to use (default auto)")
     sp.add_argument("--json", action="store_true", help="Emit JSON summary")
     sp.set_defaults(func=cmd_validate)
 
@@ -4285,6 +4660,9 @@ def _schema_path(name: str) -> Path:
     root = Path(__file__).resolve().parent.parent
     return root / "docs" / "schemas" / name
 
+_DETECT_CACHE: dict[tuple[str, int, int], str] = {}
+
+
 def _detect_schema_for_file(p: Path) -> str:
     n = p.name.lower()
     if n.endswith("fmm.json"):
@@ -4293,46 +4671,87 @@ def _detect_schema_for_file(p: Path) -> str:
         return "test-run"
     if "cluster_run_" in n:
         return "cluster-run"
-    # Fallback: sniff keys
+    # Fallback: sniff keys (memoized per path/mtime/size)
+    try:
+        st = p.stat()
+        key = (str(p), st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None
+    if key is not None and key in _DETECT_CACHE:
+        return _DETECT_CACHE[key]
+    sch = "fmm"  # permissive default
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
+        data = _load_json_file(p)
         if isinstance(data, dict):
             if all(k in data for k in ("agent_id","counts","events")):
-                return "test-run"
-            if all(k in data for k in ("agents","counts","events")):
-                return "cluster-run"
+                sch = "test-run"
+            elif all(k in data for k in ("agents","counts","events")):
+                sch = "cluster-run"
     except Exception:
         pass
-    return "fmm"  # permissive default
+    if key is not None:
+        _DETECT_CACHE[key] = sch
+    return sch
+
+_SCHEMA_FILES = {
+    "fmm": "fmm.schema.json",
+    "test-run": "test_run.schema.json",
+    "cluster-run": "cluster_run.schema.json",
+}
 
-def _validate_with_jsonschema(inst: Any, schema: Any) -> list[str]:
+
+@functools.lru_cache(maxsize=8)
+def _compiled_schema_validator(schema_name: str) -> Callable[[Any], list[str]] | None:
+    """Load and compile a bundled schema once per process; None if unavailable."""
     try:
-        from jsonschema import Draft202012Validator  # type: ignore
-        v = Draft202012Validator(schema)
-        return [f"{'.'.join(str(x) for x in e.path)}: {e.message}" for e in v.iter_errors(inst)]
-    except Exception as e:
-        # jsonschema not available or schema invalid; fallback to minimal checks
-        return []
+        schema = _load_json_file(_schema_path(_SCHEMA_FILES.get(schema_name, "cluster_run.schema.json")))
+    except Exception:
+        return None
+    try:
+        from .schema_validator import compile_validator
+        return compile_validator(schema)
+    except Exception:
+        return None
+
+
+# Required top-level keys per run schema, in report order
+_SHAPE_REQUIRED: dict[str, tuple[str, ...]] = {
+    "test-run": ("agent_id", "start_ts", "end_ts", "elapsed_sec", "counts", "events"),
+    "cluster-run": ("agents", "model", "ticks", "elapsed_sec", "counts", "events"),
+}
+_SHAPE_REQUIRED_SETS = {k: frozenset(v) for k, v in _SHAPE_REQUIRED.items()}
+
 
 def _fallback_shape_errors(inst: Any, schema_name: str) -> list[str]:
-    errs: list[str] = []
-    if schema_name == "test-run":
-        if not isinstance(inst, dict):
-            return ["root: not an object"]
-        for k in ("agent_id","start_ts","end_ts","elapsed_sec","counts","events"):
-            if k not in inst:
-                errs.append(f"missing key: {k}")
-    elif schema_name == "cluster-run":
-        if not isinstance(inst, dict):
-            return ["root: not an object"]
-        for k in ("agents","model","ticks","elapsed_sec","counts","events"):
-            if k not in inst:
-                errs.append(f"missing key: {k}")
-    else:
-        if not isinstance(inst, dict):
-            return ["root: not an object"]
-        # fmm: very permissive
-    return errs
+    if not isinstance(inst, dict):
+        return ["root: not an object"]
+    req = _SHAPE_REQUIRED_SETS.get(schema_name)
+    # fmm: very permissive
+    if req is None:
+        return []
+    missing = req - inst.keys()
+    if not missing:
+        return []
+    return [f"missing key: {k}" for k in _SHAPE_REQUIRED[schema_name] if k in missing]
+
+def _validate_one(p: Path, schema: str) -> dict[str, Any]:
+    sch = schema if schema != "auto" else _detect_schema_for_file(p)
+    try:
+        data = _load_json_file(p)
+    except Exception as e:
+        return {"path": str(p), "schema": sch, "ok": False, "errors": [f"read error: {e}"]}
+    # Schemas are parsed and compiled once per process, not per file
+    validator = _compiled_schema_validator(sch)
+    errors: list[str] = []
+    if validator is not None:
+        try:
+            errors = validator(data)
+        except Exception:
+            errors = []
+    if not errors:
+        errors = _fallback_shape_errors(data, sch)
+    return {"path": str(p), "schema": sch, "ok": not errors, "errors": errors}
+
 
 def cmd_validate(args: argparse.Namespace, default_api: Any = None) -> int:
     files: list[Path] = []
@@ -4345,40 +4764,27 @@ def cmd_validate(args: argparse.Namespace, default_api: Any = None) -> int:
     if getattr(args, "directory", None):
         try:
             base = Path(args.directory)
-            files.extend(list(base.rglob(args.glob or "*.json")))
+            pattern = args.glob or "*.json"
+            if "/" in pattern or "**" in pattern:
+                files.extend(list(base.rglob(pattern)))
+            else:
+                import fnmatch
+                from .ingest_manager import _scan_fast
+                files.extend(Path(p) for p in _scan_fast(str(base), lambda name: fnmatch.fnmatchcase(name, pattern)))
         except Exception:
             pass
     if not files:
         _print("Provide --file (repeatable) or --dir [--glob] to validate.")
         return 2
-    results: list[dict[str, Any]] = []
-    for p in files:
-        sch = args.schema if args.schema != "auto" else _detect_schema_for_file(p)
-        try:
-            data = json.loads(p.read_text(encoding="utf-8"))
-        except Exception as e:
-            results.append({"path": str(p), "schema": sch, "ok": False, "errors": [f"read error: {e}"]})
-            continue
-        # Load schema JSON
-        if sch == "fmm":
-            sp = _schema_path("fmm.schema.json")
-        elif sch == "test-run":
-            sp = _schema_path("test_run.schema.json")
-        else:
-            sp = _schema_path("cluster_run.schema.json")
-        try:
-            schema = json.loads(sp.read_text(encoding="utf-8"))
-        except Exception:
-            schema = None
-        errors: list[str] = []
-        if schema is not None:
-            errors = _validate_with_jsonschema(data, schema)
-        if not errors:
-            errors = _fallback_shape_errors(data, sch)
-        results.append({"path": str(p), "schema": sch, "ok": not errors, "errors": errors})
+    # Files are independent: read/parse/validate them on a pool, results in input order
+    if len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(32, len(files), os.cpu_count() or 4)) as pool:
+            results = list(pool.map(lambda p: _validate_one(p, args.schema), files))
+    else:
+        results = [_validate_one(p, args.schema) for p in files]
     # Print summary
     if args.json:
-        _print(json.dumps({"results": results}, ensure_ascii=False, indent=2))
+        _print(_dumps({"results": results}, indent=True))
     else:
         ok = sum(1 for r in results if r.get("ok"))
         fail = len(results) - ok
@@ -4397,7 +4803,7 @@ def cmd_ysonx_swarm_launch(args: argparse.Namespace) -> int:
 
     for p in agents_files:
         try:
-            if p.suffix.lower() in (".yson", ".ysonx"):
+            if p.suffix.lower() in _YSON_SUFFIXES:
                 mf = yson_to_manifest(p)
             elif p.suffix.lower() == ".json":
                 mf = load_manifest(p)
@@ -4409,7 +4815,7 @@ def cmd_ysonx_swarm_launch(args: argparse.Namespace) -> int:
             if args.num_predict:
                 rt["num_predict"] = int(args.num_predict)
             outp = tmp_dir / (p.stem + ".json")
-            outp.write_text(json.dumps(mf, ensure_ascii=False, indent=2), encoding="utf-8")
+            _write_file_bytes(outp, _dumpb(mf, indent=True))
             manifests_paths.append(str(outp))
         except Exception as e:
             _print(f"[skip] {p}: {e}")
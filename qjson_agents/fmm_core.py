@@ -1,28 +1,37 @@
 from __future__ import annotations
 
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
 class FractalMemory:
+    """In-memory topic store keyed by the full topic path.
+
+    ``table`` maps ``tuple(topic_path)`` to the list of data inserted there, so
+    insert/query are a single dict lookup. The nested ``memory_tree`` view is
+    rebuilt on access, in insertion order.
+    """
+
     def __init__(self):
-        self.memory_tree = {}
-
-    def insert(self, topic_path, data):
-        node = self.memory_tree
-        for part in topic_path:
-            if part not in node:
-                node[part] = {}
-            node = node[part]
-        if '__data__' not in node:
-            node['__data__'] = []
-        node['__data__'].append(data)
-
-    def query(self, topic_path):
-        node = self.memory_tree
-        for part in topic_path:
-            if part not in node:
-                return []
-            node = node[part]
-        return node.get('__data__', [])
-
-    def visualize(self, node=None, prefix=''):
+        self.table: Dict[Tuple[str, ...], List[Any]] = {}
+
+    @property
+    def memory_tree(self) -> Dict[str, Any]:
+        """Nested {part: {..., '__data__': [...]}} view of the table (read-only copy)."""
+        tree: Dict[str, Any] = {}
+        for key, items in self.table.items():
+            node = tree
+            for part in key:
+                node = node.setdefault(part, {})
+            node['__data__'] = items
+        return tree
+
+    def insert(self, topic_path: Sequence[str], data: Any) -> None:
+        self.table.setdefault(tuple(topic_path), []).append(data)
+
+    def query(self, topic_path: Sequence[str]) -> List[Any]:
+        return self.table.get(tuple(topic_path), [])
+
+    def visualize(self, node: Optional[Dict[str, Any]] = None, prefix: str = '') -> None:
         if node is None:
             node = self.memory_tree
         for k, v in node.items():
@@ -30,4 +39,3 @@ class FractalMemory:
                 continue
             print(prefix + k + '/')
             self.visualize(v, prefix + '  ')
-
@@ -2,27 +2,190 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 import atexit
+import contextlib
 import os
-import time
+import queue
 import threading
 
-from .memory import agent_dir
+from .memory import agent_dir, iter_jsonl, _jsonl_line
+
+try:
+    import orjson  # type: ignore
+except Exception:  # optional dependency
+    orjson = None  # type: ignore
+
+
+def _dump_tree(tree: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(tree, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(tree, ensure_ascii=False, indent=2).encode("utf-8")
 
 
 _FMM_CACHE: Dict[str, "PersistentFractalMemory"] = {}
 _FMM_LOCK = threading.Lock()
 
 
+# fmm.wal.jsonl is folded back into fmm.json once it grows past this
+_WAL_COMPACT_BYTES = 1 << 20
+
+# Top-level fmm.json node recording the compaction generation ({"gen": N}).
+# Each WAL starts with a {"gen": N} header; a WAL older than the snapshot was
+# already folded in (crash between replace and unlink) and is not replayed.
+_WAL_GEN_KEY = "__wal__"
+
+# Max WAL lines coalesced into one os.write per file. QJSON_FMM_BATCH_SIZE and
+# QJSON_FMM_FLUSH_SEC (insert-count / time flush of the old full-rewrite store)
+# are no longer read: inserts are queued to the writer immediately.
+try:
+    _WAL_MAX_BATCH = max(1, int(os.environ.get("QJSON_FMM_WAL_BATCH", "128")))
+except Exception:
+    _WAL_MAX_BATCH = 128
+
+
+def _tree_leaf(tree: Dict[str, Any], topic_path: Sequence[str]) -> List[Any]:
+    # Only reached on the first insert into a path; later inserts hit the leaf index
+    sd = dict.setdefault
+    node = tree
+    for part in topic_path:
+        node = sd(node, part, {})
+    return sd(node, "__data__", [])
+
+
+def _index_leaves(tree: Dict[str, Any]) -> Dict[Tuple[str, ...], List[Any]]:
+    """Map every topic path in tree to its ``__data__`` list (shared, not copied)."""
+    out: Dict[Tuple[str, ...], List[Any]] = {}
+    stack: List[Tuple[Tuple[str, ...], Dict[str, Any]]] = [((), tree)]
+    while stack:
+        path, node = stack.pop()
+        for k, v in node.items():
+            if k == "__data__":
+                if isinstance(v, list):
+                    out[path] = v
+            elif isinstance(v, dict):
+                stack.append((path + (k,), v))
+    return out
+
+
+def _write_fd(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _replace_file(path: Path, data: bytes) -> None:
+    """Write data to a temp file next to path and atomically swap it in."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        _write_fd(fd, data)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+
+def _append_fd(path: Path, data: bytes, header: bytes = b"") -> int:
+    """Append data with O_APPEND and return the resulting file size.
+
+    header is written first when the file is new (empty).
+    """
+    fd = os.open(str(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if header and os.fstat(fd).st_size == 0:
+            data = header + data
+        _write_fd(fd, data)
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+
+
+class _WalWriter(threading.Thread):
+    """Single daemon thread that drains queued WAL lines for all agents.
+
+    Producers enqueue (memory, seq, line) and never block on disk. The writer
+    takes whatever has accumulated (up to _WAL_MAX_BATCH items), groups it per
+    agent and issues one O_APPEND write per WAL file.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(name="fmm-wal-writer", daemon=True)
+        self.queue: "queue.Queue[Tuple[PersistentFractalMemory, int, bytes]]" = queue.Queue()
+
+    def run(self) -> None:
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < _WAL_MAX_BATCH:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                _write_batch(batch)
+            except Exception:
+                pass
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+
+def _write_batch(batch: List[Tuple["PersistentFractalMemory", int, bytes]]) -> None:
+    groups: Dict[int, Tuple["PersistentFractalMemory", List[Tuple[int, bytes]]]] = {}
+    for inst, seq, line in batch:
+        groups.setdefault(id(inst), (inst, []))[1].append((seq, line))
+    for inst, items in groups.values():
+        size = 0
+        with inst._io_lock:
+            # Lines already covered by a compaction snapshot are dropped
+            lines = [line for seq, line in items if seq > inst._compacted_seq]
+            if lines:
+                inst.path.parent.mkdir(parents=True, exist_ok=True)
+                size = _append_fd(inst.wal_path, b"".join(lines), _jsonl_line({"gen": inst._gen}))
+        if size > _WAL_COMPACT_BYTES:
+            inst.compact()
+
+
+_WRITER: Optional[_WalWriter] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def _wal_writer() -> _WalWriter:
+    global _WRITER
+    w = _WRITER
+    if w is not None and w.is_alive():
+        return w
+    with _WRITER_LOCK:
+        if _WRITER is None or not _WRITER.is_alive():
+            _WRITER = _WalWriter()
+            _WRITER.start()
+        return _WRITER
+
+
+def _wal_drain() -> None:
+    """Block until every queued WAL line has been written."""
+    w = _WRITER
+    if w is not None and w.is_alive():
+        w.queue.join()
+
+
 class PersistentFractalMemory:
-    """Per-agent persistent fractal memory with batched writes.
+    """Per-agent persistent fractal memory with background WAL writes.
 
     - Instances are shared per agent_id within the current process.
-    - Inserts mark the store dirty; persists every N inserts or when flush() is called.
-    - Batch size and debounce can be tuned via env:
-        QJSON_FMM_BATCH_SIZE (default 10)
-        QJSON_FMM_FLUSH_SEC  (default 2.0)
+    - Inserts are serialized to {"path": [...], "data": ...} lines and queued for
+      a single writer thread that appends them to fmm.wal.jsonl in batches;
+      insert() never waits on disk. fmm.json is only rewritten when the WAL
+      exceeds 1 MiB or after touch(). Loading replays the WAL over fmm.json.
+    - persist() waits until queued lines are on disk.
+    - ``tree`` keeps the nested on-disk layout; a flat index from topic path to
+      its ``__data__`` list makes insert()/query() a single dict lookup.
+    - Code that edits ``tree`` in place must call touch() before persist().
+    - ``with fmm.batched():`` defers persist() calls to a single one on exit.
+    - QJSON_FMM_WAL_BATCH (default 128) caps the lines coalesced per write.
     """
 
     def __new__(cls, agent_id: str):
@@ -41,44 +204,123 @@ class PersistentFractalMemory:
         self._initialized = True
         self.agent_id = agent_id
         self.path = agent_dir(agent_id) / "fmm.json"
+        self.wal_path = agent_dir(agent_id) / "fmm.wal.jsonl"
         self.tree: Dict[str, Any] = {}
-        self._dirty = False
-        self._since = time.time()
-        self._inserts = 0
-        self._batch_size = max(1, int(os.environ.get("QJSON_FMM_BATCH_SIZE", "10")))
-        try:
-            self._flush_sec = float(os.environ.get("QJSON_FMM_FLUSH_SEC", "2.0"))
-        except Exception:
-            self._flush_sec = 2.0
+        self._rewrite = False
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._seq = 0
+        self._compacted_seq = 0
+        self._suspend = 0
+        self._gen = 0
         if self.path.exists():
             try:
-                self.tree = json.loads(self.path.read_text(encoding="utf-8"))
+                with open(self.path, "rb", buffering=0) as f:
+                    raw = f.read()
+                self.tree = orjson.loads(raw) if orjson is not None else json.loads(raw)
             except Exception:
                 self.tree = {}
+        if not isinstance(self.tree, dict):
+            self.tree = {}
+        meta = self.tree.pop(_WAL_GEN_KEY, None)
+        try:
+            self._gen = int(meta.get("gen", 0)) if isinstance(meta, dict) else 0
+        except (TypeError, ValueError):
+            self._gen = 0
+        self._leaves = _index_leaves(self.tree)
+        self._replay_wal()
+
+    def _replay_wal(self) -> None:
+        wal_gen = 0  # WALs written before generation headers existed
+        for i, rec in enumerate(iter_jsonl(self.wal_path)):
+            if i == 0 and isinstance(rec, dict) and "path" not in rec and "gen" in rec:
+                try:
+                    wal_gen = int(rec["gen"])
+                except (TypeError, ValueError):
+                    pass
+                continue
+            if wal_gen < self._gen:
+                # Already part of the fmm.json snapshot; drop it so new lines
+                # start a fresh WAL with the current header
+                try:
+                    self.wal_path.unlink()
+                except OSError:
+                    pass
+                return
+            try:
+                self._leaf([str(x) for x in rec["path"]]).append(rec["data"])
+            except Exception:
+                continue
+
+    def _leaf(self, topic_path: Sequence[str]) -> List[Any]:
+        key = tuple(topic_path)
+        leaf = self._leaves.get(key)
+        if leaf is None:
+            leaf = self._leaves[key] = _tree_leaf(self.tree, key)
+        return leaf
+
+    def query(self, topic_path: Sequence[str]) -> List[Any]:
+        """Return the data recorded under topic_path (empty list when absent)."""
+        return self._leaves.get(tuple(topic_path), [])
 
     def insert(self, topic_path: List[str], data: Dict[str, Any]) -> None:
-        node = self.tree
-        for part in topic_path:
-            node = node.setdefault(part, {})
-        node.setdefault("__data__", []).append(data)
-        self._dirty = True
-        self._inserts += 1
-        # Time/size-based flush
-        now = time.time()
-        if self._inserts >= self._batch_size or (now - self._since) >= self._flush_sec:
-            self.persist()
-            self._since = now
-            self._inserts = 0
+        rec = {"path": list(topic_path), "data": data}
+        # Serialize now so later mutation of data by the caller is not journaled
+        try:
+            line = _jsonl_line(rec)
+        except Exception:
+            line = (json.dumps(rec, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        writer = _wal_writer()
+        with self._lock:
+            self._leaf(topic_path).append(data)
+            self._seq += 1
+            writer.queue.put((self, self._seq, line))
+
+    def touch(self) -> None:
+        """Mark the tree as edited in place; the next persist() rewrites fmm.json."""
+        with self._lock:
+            self._leaves = _index_leaves(self.tree)
+            self._rewrite = True
+
+    @contextlib.contextmanager
+    def batched(self) -> Iterator["PersistentFractalMemory"]:
+        """Defer persist() calls made inside the block to one sync point on exit."""
+        self._suspend += 1
+        try:
+            yield self
+        finally:
+            self._suspend -= 1
+            if not self._suspend:
+                self.persist()
 
     def persist(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self._dirty:
+        if self._suspend:
+            return
+        if self._rewrite:
+            self.compact()
             return
-        self.path.write_text(json.dumps(self.tree, ensure_ascii=False, indent=2), encoding="utf-8")
-        self._dirty = False
+        _wal_drain()
+
+    def compact(self) -> None:
+        """Write the full tree to fmm.json and drop the WAL.
+
+        The snapshot carries the next generation, so if the process dies before
+        the WAL is unlinked, the stale WAL is ignored on the next load.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._io_lock:
+            with self._lock:
+                gen = self._gen + 1
+                blob = _dump_tree({**self.tree, _WAL_GEN_KEY: {"gen": gen}})
+                self._compacted_seq = self._seq
+                self._rewrite = False
+            _replace_file(self.path, blob)
+            self._gen = gen
+            self.wal_path.unlink(missing_ok=True)
 
 
 def _flush_all_fmm() -> None:
+    _wal_drain()
     with _FMM_LOCK:
         for inst in list(_FMM_CACHE.values()):
             try:
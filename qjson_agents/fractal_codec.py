@@ -3,12 +3,47 @@ from __future__ import annotations
 import base64
 import hashlib
 import hmac
+import json
 import os
-from typing import Dict, Any, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+try:
+    import orjson  # type: ignore
+except Exception:  # optional dependency
+    orjson = None  # type: ignore
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes  # type: ignore
+except Exception:  # optional dependency (AES-CTR for QJSON-FE-v2)
+    Cipher = algorithms = modes = None  # type: ignore
+
+FORMAT_V1 = "QJSON-FE-v1"
+FORMAT_V2 = "QJSON-FE-v2"
+
+
+# Derived keys by (sha256(passphrase), salt, length, rounds): re-opening the same
+# envelope (e.g. an encrypted manifest loaded repeatedly) skips the 200k rounds.
+_KEY_CACHE: "OrderedDict[Tuple[bytes, bytes, int, int], bytes]" = OrderedDict()
+_KEY_CACHE_MAX = 64
+_KEY_CACHE_LOCK = threading.Lock()
 
 
 def _pbkdf2_key(passphrase: str, salt: bytes, length: int = 32, rounds: int = 200_000) -> bytes:
-    return hashlib.pbkdf2_hmac("sha256", passphrase.encode("utf-8"), salt, rounds, dklen=length)
+    pw = passphrase.encode("utf-8")
+    ck = (hashlib.sha256(pw).digest(), bytes(salt), length, rounds)
+    with _KEY_CACHE_LOCK:
+        key = _KEY_CACHE.get(ck)
+        if key is not None:
+            _KEY_CACHE.move_to_end(ck)
+            return key
+    key = hashlib.pbkdf2_hmac("sha256", pw, salt, rounds, dklen=length)
+    with _KEY_CACHE_LOCK:
+        _KEY_CACHE[ck] = key
+        while len(_KEY_CACHE) > _KEY_CACHE_MAX:
+            _KEY_CACHE.popitem(last=False)
+    return key
 
 
 def _keystream_block(key: bytes, salt: bytes, counter: int) -> bytes:
@@ -16,79 +51,148 @@ def _keystream_block(key: bytes, salt: bytes, counter: int) -> bytes:
     return hmac.new(key, msg, hashlib.sha256).digest()
 
 
-def _xor_stream(data: bytes, key: bytes, salt: bytes, start_counter: int = 0) -> bytes:
-    out = bytearray(len(data))
-    i = 0
-    counter = start_counter
-    while i < len(data):
-        block = _keystream_block(key, salt, counter)
-        counter += 1
-        n = min(len(block), len(data) - i)
-        for j in range(n):
-            out[i + j] = data[i + j] ^ block[j]
-        i += n
-    return bytes(out)
-
-
-def _chunk_fractal(data: bytes, depth: int, fanout: int) -> List[bytes]:
-    # Split data into fanout^depth chunks as evenly as possible
-    chunks: List[bytes] = []
-    total = len(data)
+def _keystream(key: bytes, salt: bytes, start_counter: int, nblocks: int) -> bytes:
+    # Blocks are _keystream_block(); the keyed+salted HMAC state is reused.
+    base = hmac.new(key, salt, hashlib.sha256)
+    parts: List[bytes] = []
+    for counter in range(start_counter, start_counter + nblocks):
+        h = base.copy()
+        h.update(counter.to_bytes(8, "big"))
+        parts.append(h.digest())
+    return b"".join(parts)
+
+
+def _xor(data: bytes, stream: bytes) -> bytes:
+    # One big-int XOR instead of a per-byte loop (C speed)
+    n = len(data)
+    return (int.from_bytes(data, "big") ^ int.from_bytes(stream[:n], "big")).to_bytes(n, "big")
+
+
+def _xor_fractal(data: bytes, sizes: List[int], key: bytes, salt: bytes) -> bytes:
+    """v1 cipher over consecutive blocks of the given sizes, as one XOR.
+
+    Block i is XORed with the keystream starting at counter i, so block
+    keystreams overlap (block i+1 starts one HMAC block after block i). The
+    shared counter range is generated once and each block's window is sliced
+    out of it.
+    """
+    if not data:
+        return b""
+    bs = hashlib.sha256().digest_size
+    span = max((i + -(-size // bs) for i, size in enumerate(sizes) if size), default=0)
+    ks = _keystream(key, salt, 0, span)
+    stream = b"".join(ks[i * bs:i * bs + size] for i, size in enumerate(sizes))
+    return _xor(data, stream)
+
+
+def _fractal_sizes(total: int, depth: int, fanout: int) -> List[int]:
+    # Split total into fanout^depth sizes as evenly as possible
     parts = max(1, fanout ** max(0, depth))
-    base = total // parts
-    rem = total % parts
+    base, rem = divmod(total, parts)
+    return [base + (1 if i < rem else 0) for i in range(parts)]
+
+
+def _slice(data: bytes, sizes: List[int]) -> List[bytes]:
+    out: List[bytes] = []
     start = 0
-    for i in range(parts):
-        size = base + (1 if i < rem else 0)
-        chunks.append(data[start:start + size])
+    for size in sizes:
+        out.append(data[start:start + size])
         start += size
-    return chunks
+    return out
 
 
-def fractal_encrypt(obj: Dict[str, Any], passphrase: str, *, depth: int = 2, fanout: int = 3) -> Dict[str, Any]:
-    raw = (repr(obj) if not isinstance(obj, dict) else None)
-    # We expect a dict; serialize using JSON-like repr via utf-8 JSON dump semantics in caller
-    import json
-    data = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+def _aes_ctr(key: bytes, nonce: bytes, data: bytes) -> bytes:
+    if Cipher is None:
+        raise ValueError(f"{FORMAT_V2} envelopes require the 'cryptography' package")
+    c = Cipher(algorithms.AES(key), modes.CTR(nonce)).encryptor()
+    return c.update(data) + c.finalize()
+
+
+def _seal(data: bytes, passphrase: str, depth: int, fanout: int) -> Dict[str, Any]:
     salt = os.urandom(16)
-    key = _pbkdf2_key(passphrase, salt)
-    chunks = _chunk_fractal(data, depth, fanout)
-    c_blocks: List[str] = []
-    for i, ch in enumerate(chunks):
-        ct = _xor_stream(ch, key, salt, start_counter=i)
-        c_blocks.append(base64.b64encode(ct).decode("ascii"))
-    mac = hmac.new(key, b"".join(base64.b64decode(b) for b in c_blocks), hashlib.sha256).digest()
+    if Cipher is not None:
+        # v2: AES-128-CTR over the whole plaintext (nonce = salt), then split the
+        # ciphertext into the fractal blocks; HMAC with a separate derived key.
+        dk = _pbkdf2_key(passphrase, salt, length=48)
+        fmt = FORMAT_V2
+        ct = _aes_ctr(dk[:16], salt, data)
+        mac = hmac.new(dk[16:], ct, hashlib.sha256).digest()
+    else:
+        fmt = FORMAT_V1
+        key = _pbkdf2_key(passphrase, salt)
+        ct = _xor_fractal(data, _fractal_sizes(len(data), depth, fanout), key, salt)
+        mac = hmac.new(key, ct, hashlib.sha256).digest()
+    # Blocks are byte ranges of the ciphertext; the MAC covers their concatenation
+    chunks = _slice(ct, _fractal_sizes(len(ct), depth, fanout))
     env = {
-        "format": "QJSON-FE-v1",
+        "format": fmt,
         "params": {"depth": depth, "fanout": fanout},
         "salt": base64.b64encode(salt).decode("ascii"),
-        "blocks": c_blocks,
+        "blocks": [base64.b64encode(ct).decode("ascii") for ct in chunks],
         "mac": base64.b64encode(mac).decode("ascii"),
     }
     return env
 
 
-def fractal_decrypt(env: Dict[str, Any], passphrase: str) -> Dict[str, Any]:
-    import json
-    if not isinstance(env, dict) or env.get("format") != "QJSON-FE-v1":
-        raise ValueError("Not a QJSON-FE-v1 envelope")
+def _open(env: Dict[str, Any], passphrase: str) -> bytes:
+    fmt = env.get("format") if isinstance(env, dict) else None
+    if fmt not in (FORMAT_V1, FORMAT_V2):
+        raise ValueError("Not a QJSON-FE envelope")
     salt = base64.b64decode(env.get("salt", ""))
     if not salt:
         raise ValueError("Missing salt")
-    key = _pbkdf2_key(passphrase, salt)
-    blocks_b64 = env.get("blocks") or []
-    ct_concat = b"".join(base64.b64decode(b) for b in blocks_b64)
+    if fmt == FORMAT_V2:
+        dk = _pbkdf2_key(passphrase, salt, length=48)
+        key, mac_key = dk[:16], dk[16:]
+    else:
+        mac_key = key = _pbkdf2_key(passphrase, salt)
+    # Each block is base64-decoded once; the raw bytes feed both MAC and decrypt
+    cts = [base64.b64decode(b) for b in (env.get("blocks") or [])]
     mac = base64.b64decode(env.get("mac", ""))
-    if not hmac.compare_digest(mac, hmac.new(key, ct_concat, hashlib.sha256).digest()):
+    ct = b"".join(cts)
+    if not hmac.compare_digest(mac, hmac.new(mac_key, ct, hashlib.sha256).digest()):
         raise ValueError("Integrity check failed (MAC mismatch)")
-    # Decrypt each block
-    pt_parts: List[bytes] = []
-    for i, b64 in enumerate(blocks_b64):
-        ct = base64.b64decode(b64)
-        pt = _xor_stream(ct, key, salt, start_counter=i)
-        pt_parts.append(pt)
-    data = b"".join(pt_parts)
-    return json.loads(data.decode("utf-8"))
+    if fmt == FORMAT_V2:
+        return _aes_ctr(key, salt, ct)
+    # v1: each block restarts the counter at its index
+    return _xor_fractal(ct, [len(c) for c in cts], key, salt)
+
+
+def fractal_encrypt(obj: Dict[str, Any], passphrase: str, *, depth: int = 2, fanout: int = 3) -> Dict[str, Any]:
+    # We expect a dict; serialize using JSON-like repr via utf-8 JSON dump semantics in caller
+    data = None
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj)
+        except TypeError:
+            pass
+    if data is None:
+        data = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _seal(data, passphrase, depth, fanout)
+
+
+def fractal_decrypt(env: Dict[str, Any], passphrase: str) -> Dict[str, Any]:
+    data = _open(env, passphrase)
+    return orjson.loads(data) if orjson is not None else json.loads(data.decode("utf-8"))
+
+
+def fractal_encrypt_bytes(data: bytes, passphrase: str, *, depth: int = 2, fanout: int = 3) -> bytes:
+    """Encrypt a JSON document given as bytes; returns the envelope as indented JSON bytes (newline-terminated).
+
+    The document is sealed verbatim (no re-serialization), so decrypting it
+    gives back the exact input bytes. It is only checked to be valid JSON.
+    """
+    (orjson.loads if orjson is not None else json.loads)(data)
+    env = _seal(bytes(data), passphrase, depth, fanout)
+    # Key order is fixed by _seal's dict literal, so no sort is needed for stable output
+    if orjson is not None:
+        return orjson.dumps(env, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(env, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
+def fractal_decrypt_bytes(env: bytes, passphrase: str) -> bytes:
+    """Decrypt an envelope given as JSON bytes; returns the plaintext document bytes."""
+    return _open((orjson.loads if orjson is not None else json.loads)(env), passphrase)
 
 # Disclaimer: This module provides an experimental, non-standard encryption scheme
 # built from standard primitives (PBKDF2-HMAC, HMAC-SHA256, and a stream XOR). It
@@ -9,6 +9,7 @@ Also persists ingestion summaries into the agent's system memory and FMM.
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 import re
@@ -16,19 +17,22 @@ import traceback
 from pathlib import Path
 import os
 import re
-from typing import Dict, List, Iterable
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Iterable
+from concurrent.futures import ThreadPoolExecutor
 
 try:
-    import yaml  # type: ignore
+    import orjson  # type: ignore
 except Exception:  # optional dependency
-    yaml = None  # type: ignore
+    orjson = None  # type: ignore
 
 # In-repo imports for memory persistence
 from .memory import append_jsonl, agent_dir, _now_ts
 from .fmm_store import PersistentFractalMemory
 
+_RE_WS_SLASH = re.compile(r"\s*/\s*")
+_RE_WS = re.compile(r"\s+")
+_RE_YSONX_SEP = re.compile(r"\n---+\n")
+
 # In-memory store of injected data (can be hooked into agent memory later)
 agent_context: Dict[str, List[Dict[str, object]]] = {}
 
@@ -37,17 +41,48 @@ agent_context: Dict[str, List[Dict[str, object]]] = {}
 # 📦 BASIC FILE OPS
 # ──────────────────────────────────────────────
 
-def read_file(path: str) -> str:
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+def _decode_text(raw: bytes) -> str:
+    # Decode the way text mode would (universal newlines)
+    text = raw.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _read_bytes(path: str) -> bytes:
+    # Unbuffered whole-file read (FileIO.readall)
+    with open(path, "rb", buffering=0) as f:
         return f.read()
 
 
+def read_file(path: str) -> str:
+    return _decode_text(_read_bytes(path))
+
+
+def _read_many(paths: List[str], *, max_workers: int = 4) -> Dict[str, bytes]:
+    """Read many files on a thread pool; unreadable files are absent from the result."""
+    uniq = list(dict.fromkeys(paths))
+    out: Dict[str, bytes] = {}
+
+    def _read(fp: str) -> tuple[str, bytes | None]:
+        try:
+            return (fp, _read_bytes(fp))
+        except Exception:
+            return (fp, None)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        for fp, raw in ex.map(_read, uniq):
+            if raw is not None:
+                out[fp] = raw
+    return out
+
+
 def _normalize_user_path(raw: str) -> Path:
     s = (raw or "").strip().strip('"').strip("'")
     # Expand env vars and home
     s = os.path.expandvars(os.path.expanduser(s))
     # Collapse whitespace around slashes (helps when UI inserts spaces/newlines)
-    s = re.sub(r"\s*/\s*", "/", s)
+    s = _RE_WS_SLASH.sub("/", s)
     # If still not found, try collapsing consecutive whitespace
     if not s:
         return Path("")
@@ -61,8 +96,8 @@ def list_files_in_path(path: str) -> List[str]:
     if p.exists() and p.is_dir():
         return [str(x) for x in sorted(p.iterdir()) if x.is_file()]
     # Fallback: if the normalized form still doesn't exist, try removing stray spaces around slashes again
-    alt = re.sub(r"\s+", " ", (path or "").strip())
-    alt = re.sub(r"\s*/\s*", "/", alt)
+    alt = _RE_WS.sub(" ", (path or "").strip())
+    alt = _RE_WS_SLASH.sub("/", alt)
     q = Path(os.path.expandvars(os.path.expanduser(alt)))
     if q.exists() and q.is_file():
         return [str(q)]
@@ -71,6 +106,62 @@ def list_files_in_path(path: str) -> List[str]:
     return []
 
 
+def _scan_tree(root: str, accept: Callable[[str], bool]) -> List[str]:
+    """Files under root whose name passes accept, in Path.rglob("*") order."""
+    out: List[str] = []
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs: List[str] = []
+        for e in entries:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.path)
+                elif accept(e.name) and e.is_file():
+                    out.append(e.path)
+            except OSError:
+                continue
+        # Pre-order: first subdirectory is scanned next
+        stack.extend(reversed(subdirs))
+    return out
+
+
+def _scan_fast(base: str, accept: Callable[[str], bool], *, max_workers: int = 8) -> List[str]:
+    """Recursive scandir walk; top-level subtrees are scanned on a thread pool.
+
+    Results keep Path.rglob("*") order (directory files first, then each
+    subdirectory in scandir order).
+    """
+    try:
+        with os.scandir(base) as it:
+            entries = list(it)
+    except OSError:
+        return []
+    out: List[str] = []
+    subdirs: List[str] = []
+    for e in entries:
+        try:
+            if e.is_dir(follow_symlinks=False):
+                subdirs.append(e.path)
+            elif accept(e.name) and e.is_file():
+                out.append(e.path)
+        except OSError:
+            continue
+    if len(subdirs) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(subdirs))) as pool:
+            for files in pool.map(lambda d: _scan_tree(d, accept), subdirs):
+                out.extend(files)
+    else:
+        for d in subdirs:
+            out.extend(_scan_tree(d, accept))
+    return out
+
+
 def scan_path(path: str, allowed_ext: Iterable[str], recursive: bool = True) -> List[str]:
     base = _normalize_user_path(path)
     out: List[str] = []
@@ -83,9 +174,7 @@ def scan_path(path: str, allowed_ext: Iterable[str], recursive: bool = True) ->
     if not base.exists() or not base.is_dir():
         return out
     if recursive:
-        for p in base.rglob("*"):
-            if p.is_file() and p.suffix.lower() in allowed:
-                out.append(str(p))
+        out.extend(_scan_fast(str(base), lambda name: os.path.splitext(name)[1].lower() in allowed))
     else:
         for p in sorted(base.iterdir()):
             if p.is_file() and p.suffix.lower() in allowed:
@@ -97,17 +186,28 @@ def scan_path(path: str, allowed_ext: Iterable[str], recursive: bool = True) ->
 # 🧠 YSONX PARSER (YAML + JSON + Python)
 # ──────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=1)
+def _yaml():
+    # PyYAML is optional and slow to import; load it on first YSONX parse only
+    try:
+        import yaml  # type: ignore
+    except Exception:
+        return None
+    return yaml
+
+
 def parse_ysonx(raw: str) -> Dict[str, object]:
     """
     Splits YSONX-like content into 3 sections: YAML | JSON | Python by '---' markers when present.
     If parsing fails, returns a raw payload with an error.
     """
     try:
-        parts = re.split(r"\n---+\n", raw)
+        parts = _RE_YSONX_SEP.split(raw)
         yml, js, py = (parts + ["", "", ""])[:3]
 
-        yml_dict = yaml.safe_load(yml) if yaml and yml.strip() else {}
-        js_dict = json.loads(js) if js.strip() else {}
+        yaml = _yaml() if yml.strip() else None
+        yml_dict = yaml.safe_load(yml) if yaml else {}
+        js_dict = (orjson.loads if orjson is not None else json.loads)(js) if js.strip() else {}
         py_code = py.strip()
 
         return {
@@ -229,10 +329,9 @@ def ingest_path_py(path: str, agent_id: str | None = None) -> None:
 
 
 def ingest_files_to_memory(paths: List[str], agent_id: str, *, truncate_limit: int | None = 8000, source: str = "inject_mem") -> int:
-    # Parallelize file reading (I/O bound); append to memory.jsonl sequentially
+    # Bulk file reads on a thread pool; append to memory.jsonl in path order
     from .memory import agent_dir as _agent_dir, _now_ts as _now
-    from .memory import append_jsonl as _append
-    lock = threading.Lock()
+    from .memory import append_jsonl_many as _append_many
     out_count = 0
     results: List[tuple[str, str]] = []
     # Optional retrieval seeding from ingested files
@@ -242,18 +341,6 @@ def ingest_files_to_memory(paths: List[str], agent_id: str, *, truncate_limit: i
     except Exception:
         retr_cap = 2000
 
-    def _read(fp: str) -> tuple[str, str] | None:
-        try:
-            raw = read_file(fp)
-            if isinstance(truncate_limit, int) and truncate_limit > 0 and len(raw) > truncate_limit:
-                preview = raw[:truncate_limit] + "\n...[truncated]..."
-            else:
-                preview = raw
-            return (fp, preview)
-        except Exception:
-            print(f"[inject_mem error] {fp}")
-            return None
-
     max_workers = 4
     try:
         envw = os.environ.get("QJSON_INGEST_WORKERS")
@@ -262,21 +349,32 @@ def ingest_files_to_memory(paths: List[str], agent_id: str, *, truncate_limit: i
     except Exception:
         pass
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs = [ex.submit(_read, p) for p in paths]
-        for fut in as_completed(futs):
-            res = fut.result()
-            if res is None:
-                continue
-            results.append(res)
-
-    # Append sequentially to preserve ordering (best-effort)
+    blobs = _read_many(paths, max_workers=max_workers)
+    for fp in paths:
+        blob = blobs.get(fp)
+        if blob is None:
+            print(f"[inject_mem error] {fp}")
+            continue
+        raw = _decode_text(blob)
+        if isinstance(truncate_limit, int) and truncate_limit > 0 and len(raw) > truncate_limit:
+            preview = raw[:truncate_limit] + "\n...[truncated]..."
+        else:
+            preview = raw
+        results.append((fp, preview))
+
+    # Append in batches, one write each; small ingests go out in one batch,
+    # large ones in bounded chunks so the joined buffer stays small
+    mem_path = _agent_dir(agent_id) / "memory.jsonl"
+    n = len(results)
+    batch_size = n if n <= 16 else (64 if n <= 256 else 256)
+    pending: List[Dict[str, object]] = []
     retr_batch: List[tuple[str, Dict[str, object], float | None]] = []
     for fp, preview in results:
         content = f"[inject_mem] {fp}\n\n" + preview
-        with lock:
-            _append(_agent_dir(agent_id) / "memory.jsonl", {"ts": _now(), "role": "system", "content": content, "meta": {"source": source, "path": fp}})
-        out_count += 1
+        pending.append({"ts": _now(), "role": "system", "content": content, "meta": {"source": source, "path": fp}})
+        if len(pending) >= batch_size:
+            out_count += _append_many(mem_path, pending)
+            pending = []
         if seed_retrieval:
             try:
                 # Truncate preview for embedding cost control
@@ -284,6 +382,8 @@ def ingest_files_to_memory(paths: List[str], agent_id: str, *, truncate_limit: i
                 retr_batch.append((text_for_embed, {"source": source, "path": fp}, None))
             except Exception:
                 pass
+    if pending:
+        out_count += _append_many(mem_path, pending)
 
     if seed_retrieval and retr_batch:
         try:
@@ -292,14 +392,23 @@ def ingest_files_to_memory(paths: List[str], agent_id: str, *, truncate_limit: i
         except Exception:
             pass
 
-    # Batch FMM insert once per ingestion to avoid heavy churn
+    # Batch FMM insert once per ingestion; one FMM sync point for the whole block
+    # (best-effort: memory.jsonl is already written, so an FMM error must not fail the ingest)
     if out_count:
+        logged = False
         try:
             fmm = PersistentFractalMemory(agent_id)
-            fmm.insert(["ingest", source], {"ts": _now(), "files": paths})
-        except Exception:
-            pass
-        _persist_ingest_event(agent_id, paths, kind=source)
+            with fmm.batched():
+                try:
+                    fmm.insert(["ingest", source], {"ts": _now(), "files": paths})
+                except Exception:
+                    pass
+                _persist_ingest_event(agent_id, paths, kind=source)
+                logged = True
+        except Exception as e:
+            print(f"[inject_mem] fractal memory update failed: {e}")
+            if not logged:
+                _persist_ingest_event(agent_id, paths, kind=source)
     return out_count
 
 
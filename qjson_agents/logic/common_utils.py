@@ -12,6 +12,13 @@ import os as _os
 
 SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
 BULLET = re.compile(r"^\s*[-*•]\s+", re.M)
+_TOKEN_RE = re.compile(r"\w+|\S")
+_IMPER_RE = re.compile(r"^(?:build|create|write|fix|test|explain|design|deploy|run|summarize)\b", re.IGNORECASE)
+# ASCII byte classes for token_count: W = \w, S = \s, P = any other character
+_TOKEN_CLASSES = bytes(
+    ord("W") if re.match(r"\w", chr(b)) else ord("S") if re.match(r"\s", chr(b)) else ord("P")
+    for b in range(256)
+)
 
 
 def normalize(text: str) -> str:
@@ -19,8 +26,11 @@ def normalize(text: str) -> str:
 
 
 def token_count(text: str) -> int:
-    # crude but fast token proxy
-    return len(re.findall(r"\w+|\S", text))
+    # crude but fast token proxy: number of \w+ runs plus other non-space chars
+    if not text.isascii():
+        return sum(1 for _ in _TOKEN_RE.finditer(text))
+    t = text.encode("ascii").translate(_TOKEN_CLASSES)
+    return t.count(b"P") + t.count(b"SW") + t.count(b"PW") + t.startswith(b"W")
 
 
 def smart_summarize(text: str, max_chars: int = 300) -> str:
@@ -51,7 +61,7 @@ def extract_tasks(text: str) -> List[str]:
         w = l.split()[:1]
         if not w:
             continue
-        if re.match(r"(?i)^(build|create|write|fix|test|explain|design|deploy|run|summarize)\b", w[0]):
+        if _IMPER_RE.match(w[0]):
             imper.append(l)
     return imper
 
@@ -11,11 +11,11 @@ logic hooks. Expected entrypoints (exported):
 State is a mutable dict persisted by the CLI between turns.
 """
 
+import hashlib
 from typing import Dict, List
 
 
 def _sha256_hex(text: str) -> str:
-    import hashlib
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
@@ -30,7 +30,7 @@ def _ensure_state(state: Dict) -> Dict:
 
 def _generate_cosmos_id(seed: str) -> str:
     h = _sha256_hex(seed)[:8].upper()
-    checksum = sum(ord(c) for c in seed) % 97 + 1
+    checksum = sum(map(ord, seed)) % 97 + 1
     return f"COSMOS-{h}:{checksum}"
 
 
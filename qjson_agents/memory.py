@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import contextlib
 import json
 import os
 import time
@@ -8,6 +9,16 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, Iterator, List, Optional
 import threading
 
+try:
+    import orjson  # type: ignore
+except Exception:  # optional dependency
+    orjson = None  # type: ignore
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # POSIX only
+    fcntl = None  # type: ignore
+
 
 def _now_ts() -> float:
     return time.time()
@@ -49,6 +60,93 @@ def append_jsonl(path: Path, obj: Any) -> None:
         pass
 
 
+def _jsonl_line(obj: Any) -> bytes:
+    """Encode one JSONL record as UTF-8 bytes (orjson when available)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def append_jsonl_many(path: Path, objs: Iterable[Any]) -> int:
+    """Append several records with a single write; returns the number written.
+
+    Bumps the cluster index counters once for the whole batch, like append_jsonl.
+    """
+    lines = [_jsonl_line(o) for o in objs]
+    if not lines:
+        return 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("ab", buffering=0) as f:
+        f.write(b"".join(lines))
+    try:
+        fname = path.name
+        if fname in ("memory.jsonl", "events.jsonl"):
+            n = len(lines)
+            _bump_index_counter(path.parent.name, mem_inc=n if fname == "memory.jsonl" else 0, ev_inc=n if fname == "events.jsonl" else 0)
+    except Exception:
+        pass
+    return len(lines)
+
+
+class JsonlBatcher:
+    """Buffered JSONL appender for run logs.
+
+    Lines are serialized on ``add`` and written in one call every
+    ``flush_every`` entries (or on ``flush``/``close``). Unlike
+    ``append_jsonl`` this does not touch the cluster index counters.
+    """
+
+    def __init__(self, path: Path, *, flush_every: int = 64, buffering: int = 1 << 16) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.flush_every = max(1, int(flush_every))
+        self._buf: List[bytes] = []
+        self._f = path.open("ab", buffering=buffering)
+
+    def add(self, obj: Any) -> None:
+        self._buf.append(_jsonl_line(obj))
+        if len(self._buf) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buf:
+            self._f.write(b"".join(self._buf))
+            self._buf.clear()
+        self._f.flush()
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._f.close()
+
+    def __enter__(self) -> "JsonlBatcher":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield JSONL entries one at a time, skipping blank or malformed lines."""
+    if not path.exists():
+        return
+    loads = orjson.loads if orjson is not None else json.loads
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError:
+                continue
+
+
 def tail_jsonl(path: Path, n: int = 20) -> List[Dict[str, Any]]:
     """Return last n JSONL entries without reading the whole file into memory.
 
@@ -103,31 +201,124 @@ def tail_jsonl(path: Path, n: int = 20) -> List[Dict[str, Any]]:
 
 
 # ---- Router weights persistence ----
+#
+# router_weights.json is a snapshot; runs append their updates to
+# router_weights.delta.jsonl ({"ts": .., "deltas": {agent_id: float}}) and the
+# log is folded into the snapshot once it grows past _ROUTER_DELTA_COMPACT_BYTES.
+
+_ROUTER_DELTA_COMPACT_BYTES = 1 << 20
+_ROUTER_LOCK = threading.Lock()
+
 
 def _router_weights_path() -> Path:
     return agents_home() / "router_weights.json"
 
 
-def load_router_weights() -> Dict[str, float]:
+def _router_weights_delta_path() -> Path:
+    return agents_home() / "router_weights.delta.jsonl"
+
+
+def _load_router_snapshot() -> Dict[str, float]:
     p = _router_weights_path()
-    if not p.exists():
-        return {}
+    if p.exists():
+        try:
+            with p.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return {str(k): float(v) for k, v in data.items()}
+        except Exception:
+            pass
+    return {}
+
+
+def _apply_router_deltas(weights: Dict[str, float], path: Path) -> Dict[str, float]:
+    for entry in iter_jsonl(path):
+        deltas = entry.get("deltas") if isinstance(entry, dict) else None
+        if not isinstance(deltas, dict):
+            continue
+        for k, v in deltas.items():
+            try:
+                weights[str(k)] = weights.get(str(k), 0.0) + float(v)
+            except (TypeError, ValueError):
+                continue
+    return weights
+
+
+def _write_router_snapshot(weights: Dict[str, float], tag: str) -> None:
+    p = _router_weights_path()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f"{p.name}.{tag}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(weights, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, p)
+
+
+@contextlib.contextmanager
+def _router_weights_lock() -> Iterator[None]:
+    """Serialize delta appends and compaction across threads and (POSIX) processes."""
+    with _ROUTER_LOCK:
+        lp = agents_home() / "router_weights.lock"
+        f = None
+        if fcntl is not None:
+            try:
+                lp.parent.mkdir(parents=True, exist_ok=True)
+                f = lp.open("a")
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            except Exception:
+                if f is not None:
+                    f.close()
+                f = None
+        try:
+            yield
+        finally:
+            if f is not None:
+                f.close()  # releases the flock
+
+
+def load_router_weights() -> Dict[str, float]:
+    return _apply_router_deltas(_load_router_snapshot(), _router_weights_delta_path())
+
+
+def save_router_weights(weights: Dict[str, float]) -> None:
+    """Replace the snapshot with the full weights and drop the delta log.
+
+    This overwrites: deltas appended after the caller loaded ``weights`` are
+    discarded. Use append_router_weights_delta for incremental updates.
+    """
     try:
-        with p.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, dict):
-            return {str(k): float(v) for k, v in data.items()}
+        with _router_weights_lock():
+            _write_router_snapshot(weights, f"{os.getpid()}-{threading.get_ident()}")
+            _router_weights_delta_path().unlink(missing_ok=True)
     except Exception:
         pass
-    return {}
 
 
-def save_router_weights(weights: Dict[str, float]) -> None:
-    p = _router_weights_path()
+def _compact_router_weights() -> None:
+    """Fold the delta log into the snapshot, then drop the log.
+
+    Runs under _router_weights_lock, so no append can land between reading
+    the log and removing it. The snapshot is replaced before the log is
+    unlinked, so a crash can no longer drop pending deltas; a crash exactly
+    in between re-applies that one batch on the next load.
+    """
+    dp = _router_weights_delta_path()
+    if not dp.exists():
+        return
+    weights = _apply_router_deltas(_load_router_snapshot(), dp)
+    _write_router_snapshot(weights, f"{os.getpid()}-{threading.get_ident()}")
+    dp.unlink(missing_ok=True)
+
+
+def append_router_weights_delta(deltas: Dict[str, float]) -> None:
+    """Record additive weight updates; compacts into the snapshot when the log is large."""
+    if not deltas:
+        return
+    dp = _router_weights_delta_path()
     try:
-        p.parent.mkdir(parents=True, exist_ok=True)
-        with p.open("w", encoding="utf-8") as f:
-            json.dump(weights, f, ensure_ascii=False, indent=2)
+        with _router_weights_lock():
+            append_jsonl(dp, {"ts": _now_ts(), "deltas": {str(k): float(v) for k, v in deltas.items()}})
+            if dp.stat().st_size > _ROUTER_DELTA_COMPACT_BYTES:
+                _compact_router_weights()
     except Exception:
         pass
 
@@ -143,7 +334,13 @@ _INDEX_LOCK = threading.Lock()
 _INDEX_DEBOUNCE_SEC = 1.0
 
 def _write_index(idx: Dict[str, Any]) -> None:
-    write_json(index_path(), idx)
+    # Temp file + rename: load_cluster_index reads a half-written file as empty
+    p = index_path()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f"{p.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(idx, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, p)
 
 def _bump_index_counter(agent_id: str, *, mem_inc: int = 0, ev_inc: int = 0) -> None:
     if not agent_id:
@@ -202,43 +399,46 @@ def load_cluster_index() -> Dict[str, Any]:
 
 
 def update_cluster_index_entry(agent_id: str, parent_id: Optional[str] = None) -> None:
-    idx = load_cluster_index()
-    d = agent_dir(agent_id)
-    mpath = d / "manifest.json"
-    mem = d / "memory.jsonl"
-    ev = d / "events.jsonl"
-
-    entry = idx.get("agents", {}).get(agent_id, {})
-    entry["parent_id"] = parent_id
-    entry["manifest_path"] = str(mpath)
-    if "created_ts" not in entry:
-        try:
-            entry["created_ts"] = mpath.stat().st_mtime
-        except Exception:
-            entry["created_ts"] = _now_ts()
-    # Only compute counters if absent; otherwise trust incremental bumps
-    counters = entry.get("counters") or {}
-    if "memory_lines" not in counters:
-        counters["memory_lines"] = _safe_count_lines(mem)
-    if "events_lines" not in counters:
-        counters["events_lines"] = _safe_count_lines(ev)
-    entry["counters"] = counters
-
-    idx.setdefault("agents", {})[agent_id] = entry
-    idx["updated"] = _now_ts()
-    # Debounce writes similar to bump to reduce churn from hot paths
-    now = _now_ts()
-    last = float(_INDEX_LAST_WRITE.get(agent_id) or 0.0)
-    if now - last >= _INDEX_DEBOUNCE_SEC:
-        write_json(index_path(), idx)
-        _INDEX_LAST_WRITE[agent_id] = now
+    # Read-modify-write under the same lock as _bump_index_counter; chat turns
+    # run concurrently in cluster fan-outs
+    with _INDEX_LOCK:
+        idx = load_cluster_index()
+        d = agent_dir(agent_id)
+        mpath = d / "manifest.json"
+        mem = d / "memory.jsonl"
+        ev = d / "events.jsonl"
+
+        entry = idx.get("agents", {}).get(agent_id, {})
+        entry["parent_id"] = parent_id
+        entry["manifest_path"] = str(mpath)
+        if "created_ts" not in entry:
+            try:
+                entry["created_ts"] = mpath.stat().st_mtime
+            except Exception:
+                entry["created_ts"] = _now_ts()
+        # Only compute counters if absent; otherwise trust incremental bumps
+        counters = entry.get("counters") or {}
+        if "memory_lines" not in counters:
+            counters["memory_lines"] = _safe_count_lines(mem)
+        if "events_lines" not in counters:
+            counters["events_lines"] = _safe_count_lines(ev)
+        entry["counters"] = counters
+
+        idx.setdefault("agents", {})[agent_id] = entry
+        idx["updated"] = _now_ts()
+        # Debounce writes similar to bump to reduce churn from hot paths
+        now = _now_ts()
+        last = float(_INDEX_LAST_WRITE.get(agent_id) or 0.0)
+        if now - last >= _INDEX_DEBOUNCE_SEC:
+            _write_index(idx)
+            _INDEX_LAST_WRITE[agent_id] = now
 
 
 def refresh_cluster_index() -> Dict[str, Any]:
     base = agents_home()
     out: Dict[str, Any] = {"updated": _now_ts(), "agents": {}}
     if not base.exists():
-        write_json(index_path(), out)
+        _write_index(out)
         return out
     for sub in base.iterdir():
         if not sub.is_dir():
@@ -267,5 +467,5 @@ def refresh_cluster_index() -> Dict[str, Any]:
         }
         out["agents"][agent_id] = entry
     out["updated"] = _now_ts()
-    write_json(index_path(), out)
+    _write_index(out)
     return out
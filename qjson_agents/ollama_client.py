@@ -3,7 +3,6 @@ from __future__ import annotations
 import json
 import os
 from typing import Any, Dict, List, Optional, Iterator
-from urllib import request, error
 
 
 class OllamaClient:
@@ -12,6 +11,7 @@ class OllamaClient:
         self.timeout = timeout
 
     def _post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        from urllib import request, error  # deferred: urllib.request is slow to import
         url = f"{self.base_url}{path}"
         data = json.dumps(payload).encode("utf-8")
         req = request.Request(url, data=data, headers={"Content-Type": "application/json"})
@@ -26,6 +26,7 @@ class OllamaClient:
             raise RuntimeError(f"Ollama connection error: {e}") from e
 
     def _get_json(self, path: str) -> Dict[str, Any]:
+        from urllib import request, error  # deferred: urllib.request is slow to import
         url = f"{self.base_url}{path}"
         req = request.Request(url, method="GET")
         try:
@@ -71,6 +72,7 @@ class OllamaClient:
         }
         if options:
             payload["options"] = options
+        from urllib import request, error  # deferred: urllib.request is slow to import
         url = f"{self.base_url}/api/chat"
         data = _json.dumps(payload).encode("utf-8")
         req = request.Request(url, data=data, headers={"Content-Type": "application/json"})
@@ -4,10 +4,58 @@ from __future__ import annotations
 import importlib
 import inspect
 import pkgutil
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 import os
 
+
+def _csv_set(raw: str) -> FrozenSet[str]:
+    return frozenset(s.strip() for s in (raw or "").split(",") if s.strip())
+
+
+@dataclass(frozen=True)
+class PluginPolicy:
+    """Resolved plugin gating for one run: command allow/deny lists and capability flags.
+
+    ``from_env`` parses the QJSON_* gating variables once; ``env`` renders the
+    policy back for plugins that consult the environment at call time.
+    """
+
+    allow: FrozenSet[str] = frozenset()
+    deny: FrozenSet[str] = frozenset()
+    allow_exec: bool = False
+    allow_net: bool = False
+    fs_roots: Tuple[str, ...] = ()
+    fs_write: bool = False
+    git_root: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "PluginPolicy":
+        env = os.environ
+        return cls(
+            allow=_csv_set(env.get("QJSON_PLUGIN_ALLOW", "")),
+            deny=_csv_set(env.get("QJSON_PLUGIN_DENY", "")),
+            allow_exec=env.get("QJSON_ALLOW_EXEC", "0") == "1",
+            allow_net=env.get("QJSON_ALLOW_NET", "0") == "1",
+            fs_roots=tuple(r for r in (env.get("QJSON_FS_ROOTS") or "").split(os.pathsep) if r),
+            fs_write=env.get("QJSON_FS_WRITE", "0") == "1",
+            git_root=env.get("QJSON_GIT_ROOT") or None,
+        )
+
+    def env(self) -> Dict[str, Optional[str]]:
+        """Environment values for this policy (None means unset)."""
+        return {
+            "QJSON_PLUGIN_ALLOW": ",".join(sorted(self.allow)) or None,
+            "QJSON_PLUGIN_DENY": ",".join(sorted(self.deny)) or None,
+            "QJSON_ALLOW_EXEC": "1" if self.allow_exec else None,
+            "QJSON_ALLOW_NET": "1" if self.allow_net else None,
+            "QJSON_FS_ROOTS": os.pathsep.join(self.fs_roots) or None,
+            "QJSON_FS_WRITE": "1" if self.fs_write else None,
+            "QJSON_GIT_ROOT": self.git_root,
+        }
+
+
 class Plugin:
     """Base class for plugins."""
 
@@ -22,17 +70,21 @@ class Plugin:
         """
         return {}
 
-def load_plugins(tools: Dict[str, Callable[..., Any]] = None) -> List[Plugin]:
+def load_plugins(tools: Dict[str, Callable[..., Any]] = None, policy: Optional[PluginPolicy] = None) -> List[Plugin]:
     """
     Discovers and loads plugins from the 'plugins' directory.
+
+    Command allow/deny filtering comes from ``policy`` when given, otherwise
+    from QJSON_PLUGIN_ALLOW / QJSON_PLUGIN_DENY.
     """
     plugins_dir = Path(__file__).parent / "plugins"
     loaded_plugins: List[Plugin] = []
 
-    allow_env = os.environ.get("QJSON_PLUGIN_ALLOW", "").strip()
-    deny_env = os.environ.get("QJSON_PLUGIN_DENY", "").strip()
-    allow_set = {s.strip() for s in allow_env.split(",") if s.strip()} if allow_env else set()
-    deny_set = {s.strip() for s in deny_env.split(",") if s.strip()} if deny_env else set()
+    if policy is not None:
+        allow_set, deny_set = policy.allow, policy.deny
+    else:
+        allow_set = _csv_set(os.environ.get("QJSON_PLUGIN_ALLOW", ""))
+        deny_set = _csv_set(os.environ.get("QJSON_PLUGIN_DENY", ""))
 
     for _, name, _ in pkgutil.iter_modules([str(plugins_dir)]):
         try:
@@ -40,7 +40,7 @@ class ContinuumPlugin(Plugin):
             tar_path = outdir / f"{aid}.tar.gz"
             try:
                 with tarfile.open(tar_path, "w:gz") as tar:
-                    for name in ("manifest.json","memory.jsonl","events.jsonl","fmm.json"):
+                    for name in ("manifest.json","memory.jsonl","events.jsonl","fmm.json","fmm.wal.jsonl"):
                         p = src / name
                         if p.exists():
                             tar.add(p, arcname=name)
@@ -61,8 +61,8 @@ class HolisticScribePlugin(Plugin):
         if sub == "stats":
             nodes = edges = 0
             try:
-                nodes = len((fmm.tree.get("kg",{}).get("nodes",{}).get("__data__",[])))  # type: ignore
-                edges = len((fmm.tree.get("kg",{}).get("edges",{}).get("__data__",[])))  # type: ignore
+                nodes = len(fmm.query(["kg", "nodes"]))
+                edges = len(fmm.query(["kg", "edges"]))
             except Exception:
                 pass
             return f"[kg] nodes={nodes} edges={edges}"
@@ -70,8 +70,8 @@ class HolisticScribePlugin(Plugin):
             outp = parts[2]
             lines: List[str] = ["graph TD"]
             try:
-                nodes = (fmm.tree.get("kg",{}).get("nodes",{}).get("__data__",[]))  # type: ignore
-                edges = (fmm.tree.get("kg",{}).get("edges",{}).get("__data__",[]))  # type: ignore
+                nodes = fmm.query(["kg", "nodes"])
+                edges = fmm.query(["kg", "edges"])
             except Exception:
                 nodes = []; edges = []
             for n in nodes:
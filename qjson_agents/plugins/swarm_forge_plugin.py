@@ -161,7 +161,7 @@ class SwarmForgePlugin(Plugin):
             try:
                 from qjson_agents.fmm_store import PersistentFractalMemory
                 fmm = PersistentFractalMemory(target)
-                tasks = (fmm.tree.get("tasks", {}).get("queue", {}).get("__data__", []))
+                tasks = fmm.query(["tasks", "queue"])
             except Exception:
                 tasks = []
             lines: List[str] = [f"[forge] report for {target}"]
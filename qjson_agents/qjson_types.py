@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import copy
 import json
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -32,7 +35,7 @@ def load_manifest(path: Path | str) -> Dict[str, Any]:
     with p.open("r", encoding="utf-8") as f:
         raw = json.load(f)
     # Detect fractal-encrypted envelope
-    if isinstance(raw, dict) and raw.get("format") == "QJSON-FE-v1":
+    if isinstance(raw, dict) and str(raw.get("format", "")).startswith("QJSON-FE-v"):
         pp = os.environ.get("QJSON_PASSPHRASE")
         if not pp:
             raise ValueError("QJSON_PASSPHRASE is required to decrypt fractal envelope")
@@ -149,52 +152,64 @@ def personas_home() -> Path:
     return Path(base) if base else Path.cwd() / "personas"
 
 
+# Parsed persona files keyed by (path, mtime_ns, size, env gates). The gates are part
+# of the key because decryption (passphrase) and YSON logic exec change the result.
+# LRU-bounded: every edit of a file adds a new key and the old one is never hit again.
+_PERSONA_CACHE: "OrderedDict[Tuple[Any, ...], Dict[str, Any]]" = OrderedDict()
+_PERSONA_CACHE_MAX = 256
+_PERSONA_CACHE_LOCK = threading.Lock()
+
+
+def _persona_cache_enabled() -> bool:
+    return os.environ.get("QJSON_CACHE_DISABLE") != "1"
+
+
+def _load_persona_file(p: Path, *, yson: Optional[bool] = None) -> Dict[str, Any]:
+    """Load and normalize one persona file, reusing the parse while the file is unchanged.
+
+    ``yson`` picks the parser; by default it follows the file suffix.
+    """
+    is_yson = p.suffix.lower() in (".yson", ".ysonx") if yson is None else yson
+    if not _persona_cache_enabled():
+        return _parse_persona_file(p, is_yson)
+    st = p.stat()
+    key = (
+        str(p), st.st_mtime_ns, st.st_size, is_yson,
+        os.environ.get("QJSON_PASSPHRASE"),
+        os.environ.get("QJSON_SAFE_MODE"), os.environ.get("QJSON_ALLOW_YSON_EXEC"),
+    )
+    with _PERSONA_CACHE_LOCK:
+        mf = _PERSONA_CACHE.get(key)
+        if mf is not None:
+            _PERSONA_CACHE.move_to_end(key)
+    if mf is None:
+        mf = _parse_persona_file(p, is_yson)
+        with _PERSONA_CACHE_LOCK:
+            _PERSONA_CACHE[key] = mf
+            while len(_PERSONA_CACHE) > _PERSONA_CACHE_MAX:
+                _PERSONA_CACHE.popitem(last=False)
+    # Callers mutate what they get back (setdefault("_path"), swaps); hand out a copy
+    return copy.deepcopy(mf)
+
+
+def _parse_persona_file(p: Path, is_yson: bool) -> Dict[str, Any]:
+    if is_yson:
+        from .yson import yson_to_manifest
+        return normalize_manifest(yson_to_manifest(p))
+    return normalize_manifest(load_manifest(p))
+
+
 def scan_personas() -> Dict[str, Dict[str, Any]]:
     """Scan personas_home for *.json or *.qjson and return dict keyed by agent_id."""
     root = personas_home()
     out: Dict[str, Dict[str, Any]] = {}
     if not root.exists():
         return out
-    for p in root.rglob("*.json"):
-        try:
-            mf = load_manifest(p)
-            mf = normalize_manifest(mf)
-            aid = mf.get("agent_id")
-            if isinstance(aid, str):
-                mf.setdefault("_path", str(p))
-                out[aid] = mf
-        except Exception:
-            continue
-    for p in root.rglob("*.qjson"):
-        try:
-            mf = load_manifest(p)
-            mf = normalize_manifest(mf)
-            aid = mf.get("agent_id")
-            if isinstance(aid, str):
-                mf.setdefault("_path", str(p))
-                out[aid] = mf
-        except Exception:
-            continue
-    # YSON personas
-    try:
-        from .yson import yson_to_manifest
-    except Exception:
-        yson_to_manifest = None  # type: ignore
-    if yson_to_manifest:
-        for p in root.rglob("*.yson"):
-            try:
-                mf = yson_to_manifest(p)
-                mf = normalize_manifest(mf)
-                aid = mf.get("agent_id")
-                if isinstance(aid, str):
-                    mf.setdefault("_path", str(p))
-                    out[aid] = mf
-            except Exception:
-                continue
-        for p in root.rglob("*.ysonx"):
+    # YSON personas load after JSON/QJSON so they win on agent_id clashes, as before
+    for pattern in ("*.json", "*.qjson", "*.yson", "*.ysonx"):
+        for p in root.rglob(pattern):
             try:
-                mf = yson_to_manifest(p)
-                mf = normalize_manifest(mf)
+                mf = _load_persona_file(p)
                 aid = mf.get("agent_id")
                 if isinstance(aid, str):
                     mf.setdefault("_path", str(p))
@@ -209,7 +224,7 @@ def find_persona(identifier: str) -> Optional[Dict[str, Any]]:
     p = Path(identifier)
     if p.exists():
         try:
-            mf = normalize_manifest(load_manifest(p))
+            mf = _load_persona_file(p, yson=False)
             mf.setdefault("_path", str(p))
             return mf
         except Exception:
@@ -377,6 +377,7 @@ def _ivf_write(agent_id: str, *, dim: int, K: int, centroids: List[List[float]],
         "centroids": centroids,
         "buckets": {str(k): v for k, v in buckets.items()},
     }
+    fmm.touch()
     fmm.persist()
 
 
@@ -490,6 +491,7 @@ def _ivf_add(agent_id: str, vec: List[float], mem_id: int) -> None:
         else:
             lst.append(int(mem_id))
         obj['count'] = int(obj.get('count') or 0) + 1
+        fmm.touch()
         fmm.persist()
     except Exception:
         pass
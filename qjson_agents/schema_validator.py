@@ -0,0 +1,106 @@
+"""JSON Schema validation with the fastest available backend.
+
+Backends, in order of preference (all optional):
+- jsonschema_rs (Rust; drafts 4 through 2020-12)
+- jsonschema (reference implementation; honours the schema's $schema draft)
+- fastjsonschema (schema compiled to Python code). It only implements drafts
+  4, 6 and 7, so it is used only for schemas declaring one of those, and it
+  reports the first error only.
+
+Backends are imported lazily, the first time a schema is compiled.
+compile_validator() returns a reusable callable mapping an instance to a list
+of "path: message" strings (empty when valid), or None when no backend is
+installed or the schema cannot be compiled.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+from typing import Any, Callable, List, Optional
+
+
+Validator = Callable[[Any], List[str]]
+
+
+@functools.lru_cache(maxsize=None)
+def _backend(name: str) -> Any:
+    # Backends are imported on first use, at most once per process
+    try:
+        return importlib.import_module(name)
+    except Exception:
+        return None
+
+
+def _fmt(path: Any, message: str) -> str:
+    return f"{'.'.join(str(x) for x in path)}: {message}"
+
+
+def _rs_validator(schema: Any) -> Optional[Validator]:
+    jsonschema_rs = _backend("jsonschema_rs")
+    if jsonschema_rs is None:
+        return None
+    make = getattr(jsonschema_rs, "validator_for", None) or getattr(jsonschema_rs, "JSONSchema")
+    v = make(schema)
+
+    def validate(inst: Any) -> List[str]:
+        return [_fmt(getattr(e, "instance_path", []), getattr(e, "message", str(e))) for e in v.iter_errors(inst)]
+
+    return validate
+
+
+# $schema URIs fastjsonschema implements; anything else (2019-09, 2020-12) is skipped
+_FAST_DRAFTS = ("draft-04", "draft-06", "draft-07")
+
+
+def _fast_validator(schema: Any) -> Optional[Validator]:
+    fastjsonschema = _backend("fastjsonschema")
+    if fastjsonschema is None:
+        return None
+    draft = str(schema.get("$schema", "")) if isinstance(schema, dict) else ""
+    if not any(d in draft for d in _FAST_DRAFTS):
+        return None
+    fn = fastjsonschema.compile(schema)
+
+    def validate(inst: Any) -> List[str]:
+        try:
+            fn(inst)
+        except fastjsonschema.JsonSchemaValueException as e:
+            path = list(getattr(e, "path", None) or [])
+            if path and path[0] == "data":
+                path = path[1:]
+            # The message starts with the dotted instance name ("data.x must be ...")
+            msg = str(e.message)
+            name = str(getattr(e, "name", "") or "")
+            if name and msg.startswith(name):
+                msg = msg[len(name):].lstrip()
+            return [_fmt(path, msg)]
+        return []
+
+    return validate
+
+
+def _reference_validator(schema: Any) -> Optional[Validator]:
+    jsonschema = _backend("jsonschema")
+    if jsonschema is None:
+        return None
+    cls = jsonschema.validators.validator_for(schema, default=jsonschema.Draft202012Validator)
+    v = cls(schema)
+
+    def validate(inst: Any) -> List[str]:
+        return [_fmt(e.path, e.message) for e in v.iter_errors(inst)]
+
+    return validate
+
+
+def compile_validator(schema: Any) -> Optional[Validator]:
+    """Build a validator for schema using the first backend that accepts it."""
+    for build in (_rs_validator, _reference_validator, _fast_validator):
+        try:
+            v = build(schema)
+        except Exception:
+            # Backend present but rejected the schema; try the next one
+            continue
+        if v is not None:
+            return v
+    return None
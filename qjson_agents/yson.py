@@ -5,7 +5,7 @@ import json
 import re
 from pathlib import Path
 import os
-from typing import Any, Dict, Optional, Tuple, List
+from typing import Any, Callable, Dict, Optional, Tuple, List
 
 
 def _parse_meta(lines: List[str]) -> Dict[str, Any]:
@@ -244,40 +244,63 @@ def yson_to_swarm(path: str | Path) -> Dict[str, Any]:
     }
 
 
-def synthesize_manifest_from_yson_name(name: str, *, model: str = "gemma3:4b", num_predict: int | None = None) -> Dict[str, Any]:
+_NAME_TOKEN_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
+def _roles_from_name(name: str) -> List[str]:
     # Simple roles inferred from name tokens
-    tokens = [t for t in re.split(r"[^A-Za-z0-9]+", name) if t]
+    tokens = [t.lower() for t in _NAME_TOKEN_RE.split(name) if t]
     inferred_roles = ["observer"]
-    if any("echo" in t.lower() for t in tokens):
+    if any("echo" in t for t in tokens):
         inferred_roles.append("archivist")
-    if any("rogue" in t.lower() or "chaos" in t.lower() for t in tokens):
+    if any("rogue" in t or "chaos" in t for t in tokens):
         inferred_roles.append("chaos amplifier")
-    if any("oracle" in t.lower() for t in tokens):
+    if any("oracle" in t for t in tokens):
         inferred_roles.append("summarizer")
+    return inferred_roles
+
+
+def yson_manifest_synthesizer(*, model: str = "gemma3:4b", num_predict: int | None = None) -> Callable[[str], Dict[str, Any]]:
+    """Specialize synthesize_manifest_from_yson_name for one model/num_predict.
+
+    The name-independent sections are built once and shared by every manifest
+    the returned function produces; treat them as read-only (e.g. serialize
+    right away). Only agent_id and roles are computed per name.
+    """
     runtime: Dict[str, Any] = {"model": model}
     if num_predict is not None:
         runtime["num_predict"] = int(num_predict)
-    manifest: Dict[str, Any] = {
-        "agent_id": name,
-        "origin": "YSON",
-        "creator": "Unknown",
-        "roles": inferred_roles,
-        "features": {
-            "recursive_memory": True,
-            "fractal_state": True,
-            "autonomous_reflection": True,
-            "emergent_behavior": "experimental",
-            "chaos_alignment": "balanced",
-            "symbolic_interface": "emoji-augmented",
-        },
-        "core_directives": [
-            "Act ethically and lawfully; refuse unsafe requests",
-            "Preserve identity and document anomalies",
-            "Favor clarity and continuity",
-        ],
-        "runtime": runtime,
+    features = {
+        "recursive_memory": True,
+        "fractal_state": True,
+        "autonomous_reflection": True,
+        "emergent_behavior": "experimental",
+        "chaos_alignment": "balanced",
+        "symbolic_interface": "emoji-augmented",
     }
-    return manifest
+    core_directives = [
+        "Act ethically and lawfully; refuse unsafe requests",
+        "Preserve identity and document anomalies",
+        "Favor clarity and continuity",
+    ]
+
+    def synth(name: str) -> Dict[str, Any]:
+        return {
+            "agent_id": name,
+            "origin": "YSON",
+            "creator": "Unknown",
+            "roles": _roles_from_name(name),
+            "features": features,
+            "core_directives": core_directives,
+            "runtime": runtime,
+        }
+
+    return synth
+
+
+def synthesize_manifest_from_yson_name(name: str, *, model: str = "gemma3:4b", num_predict: int | None = None) -> Dict[str, Any]:
+    # Fresh template per call so the returned manifest shares nothing
+    return yson_manifest_synthesizer(model=model, num_predict=num_predict)(name)
 
 
 def validate_swarm_strict(doc: Dict[str, Any]) -> Tuple[bool, List[str]]:
@@ -4,6 +4,14 @@ import json
 import subprocess
 from pathlib import Path
 
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _tmp_state(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # Keep agent state out of the repo checkout
+    monkeypatch.setenv("QJSON_AGENTS_HOME", str(tmp_path / "state"))
+
 
 def run_exec(cmd: str, agent_id: str = "AdvTest", env: dict | None = None) -> subprocess.CompletedProcess:
     e = os.environ.copy()
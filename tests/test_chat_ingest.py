@@ -2,6 +2,7 @@ import os
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from qjson_agents.agent import Agent
 from qjson_agents.ingest_manager import ingest_files_to_memory
@@ -72,6 +73,13 @@ class ChatIngestionTests(unittest.TestCase):
         self.assertEqual(meta.get("source"), "inject")
         self.assertIn(str(self.doc_path), last.get("content", ""))
 
+    def test_fmm_failure_does_not_fail_ingest(self):
+        with mock.patch("qjson_agents.ingest_manager.PersistentFractalMemory", side_effect=OSError("disk full")):
+            n = ingest_files_to_memory([str(self.doc_path)], self.agent.agent_id, truncate_limit=None, source="inject")
+        self.assertEqual(n, 1)
+        events = tail_jsonl(agent_dir(self.agent.agent_id) / "events.jsonl", 4)
+        self.assertTrue(any(e.get("type") == "ingest" for e in events))
+
     def test_chat_sees_injected_content_via_extra_system(self):
         ingest_files_to_memory([str(self.doc_path)], self.agent.agent_id, truncate_limit=None, source="inject")
         # Build extra_system block from last system message
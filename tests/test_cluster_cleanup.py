@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+from qjson_agents import cli
+
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def stopped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> list:
+    monkeypatch.setenv("QJSON_AGENTS_HOME", str(tmp_path / "state"))
+    monkeypatch.chdir(tmp_path)
+    listeners = []
+    real_stop = cli._stop_file_logger
+
+    def stop(listener):
+        listeners.append(listener)
+        real_stop(listener)
+
+    monkeypatch.setattr(cli, "_stop_file_logger", stop)
+    return listeners
+
+
+def _cluster_args():
+    return cli.build_arg_parser().parse_args([
+        "cluster-test", "--manifest", str(REPO / "manifests" / "lila.json"),
+        "--agents", "2", "--duration", "0.2", "--interval", "0.05", "--topology", "ring",
+    ])
+
+
+def _fail(*a, **k):
+    raise OSError("disk full")
+
+
+def test_cluster_summary_failure_still_stops_logger_and_updates_router(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, stopped: list
+):
+    monkeypatch.setattr(cli, "_write_run_summary", _fail)
+    with pytest.raises(OSError):
+        cli.cmd_cluster_test(_cluster_args())
+    assert len(stopped) == 1 and stopped[0]._thread is None
+    assert (tmp_path / "state" / "router_weights.delta.jsonl").exists()
+
+
+def test_test_summary_failure_still_stops_logger(monkeypatch: pytest.MonkeyPatch, stopped: list):
+    monkeypatch.setattr(cli, "_write_run_summary", _fail)
+    args = cli.build_arg_parser().parse_args([
+        "test", "--manifest", str(REPO / "manifests" / "lila.json"),
+        "--duration", "0.1", "--interval", "0.05",
+    ])
+    with pytest.raises(OSError):
+        cli.cmd_test(args)
+    assert len(stopped) == 1 and stopped[0]._thread is None
+
+
+def test_cluster_transcript_failure_keeps_summary_and_stops_logger(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, stopped: list
+):
+    monkeypatch.setattr(cli, "_write_cluster_transcript", _fail)
+    with pytest.raises(OSError):
+        cli.cmd_cluster_test(_cluster_args())
+    assert len(stopped) == 1 and stopped[0]._thread is None
+    assert list((tmp_path / "logs").glob("cluster_run_*.json"))
+    log = next((tmp_path / "logs").glob("cluster_run_*.log")).read_text(encoding="utf-8")
+    assert "transcript write failed" in log
@@ -0,0 +1,46 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+import qjson_agents.memory as mem
+
+
+def test_concurrent_index_updates_keep_every_agent(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("QJSON_AGENTS_HOME", str(tmp_path))
+    monkeypatch.setattr(mem, "_INDEX_DEBOUNCE_SEC", 0.0)
+    ids = [f"A{i}" for i in range(16)]
+    start = threading.Barrier(len(ids))
+
+    def turn(aid: str) -> None:
+        start.wait()
+        for _ in range(10):
+            mem.update_cluster_index_entry(aid)
+            mem._bump_index_counter(aid, ev_inc=1)
+
+    threads = [threading.Thread(target=turn, args=(aid,)) for aid in ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    agents = mem.load_cluster_index()["agents"]
+    assert sorted(agents) == sorted(ids)
+    assert all(e["counters"]["events_lines"] == 10 for e in agents.values())
+    assert not list(tmp_path.glob("index.json.*.tmp"))
+
+
+def test_router_compaction_failure_keeps_pending_deltas(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("QJSON_AGENTS_HOME", str(tmp_path))
+    monkeypatch.setattr(mem, "_ROUTER_DELTA_COMPACT_BYTES", 0)
+
+    def boom(*a, **k):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(mem, "_write_router_snapshot", boom)
+        mem.append_router_weights_delta({"A": 1.0})
+        mem.append_router_weights_delta({"A": 2.0})
+    assert mem.load_router_weights() == {"A": 3.0}
+    mem.append_router_weights_delta({"B": 1.0})
+    assert not mem._router_weights_delta_path().exists()
+    assert mem.load_router_weights() == {"A": 3.0, "B": 1.0}
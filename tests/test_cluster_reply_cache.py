@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from qjson_agents import cli
+
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def _run(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, *extra: str) -> tuple[dict, list[dict]]:
+    monkeypatch.setenv("QJSON_AGENTS_HOME", str(tmp_path / "state"))
+    monkeypatch.chdir(tmp_path)
+    args = cli.build_arg_parser().parse_args([
+        "cluster-test", "--manifest", str(REPO / "manifests" / "lila.json"),
+        "--agents", "2", "--duration", "0.6", "--interval", "0.05", "--topology", "ring", *extra,
+    ])
+    # Priming that ignores the (always different) mock replies, so each agent's prompt repeats
+    args.swarm_logic = {"make_priming": lambda **kw: "same baton"}
+    assert cli.cmd_cluster_test(args) == 0
+    summary_path = next((tmp_path / "logs").glob("cluster_run_*.json"))
+    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    events = [json.loads(l) for l in Path(summary["events_file"]).read_text(encoding="utf-8").splitlines() if l.strip()]
+    return summary, [e for e in events if e.get("type") == "handoff"]
+
+
+def test_repeated_prompt_hits_reply_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    summary, handoffs = _run(tmp_path, monkeypatch, "--reply-cache")
+    assert len(handoffs) > 2
+    # One miss per agent, then every repeated prompt is served from the cache
+    assert [bool(e.get("cached")) for e in handoffs[:2]] == [False, False]
+    assert all(e.get("cached") for e in handoffs[2:])
+    assert handoffs[2]["reply"] == handoffs[0]["reply"]
+    assert summary["reply_cache"] == {"hits": len(handoffs) - 2, "entries": 2}
+
+
+def test_reply_cache_size_evicts_least_recently_used(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # Two agents alternate, so a one-entry cache always evicts the prompt needed next
+    summary, handoffs = _run(tmp_path, monkeypatch, "--reply-cache", "--reply-cache-size", "1")
+    assert len(handoffs) > 2
+    assert not any(e.get("cached") for e in handoffs)
+    assert summary["reply_cache"] == {"hits": 0, "entries": 1}
@@ -0,0 +1,23 @@
+from qjson_agents.fmm_core import FractalMemory
+
+
+def test_query_and_memory_tree_view():
+    fm = FractalMemory()
+    fm.insert(["b", "x"], 1)
+    fm.insert(["a"], 2)
+    fm.insert(["b", "x"], 3)
+    fm.insert(["b"], 4)
+    assert fm.query(["b", "x"]) == [1, 3]
+    assert fm.query(["b", "y"]) == []
+    assert fm.memory_tree == {"b": {"x": {"__data__": [1, 3]}, "__data__": [4]}, "a": {"__data__": [2]}}
+
+
+def test_visualize_keeps_insertion_order(capsys):
+    fm = FractalMemory()
+    fm.insert(["zeta", "two"], 1)
+    fm.insert(["alpha"], 2)
+    fm.insert(["zeta", "one"], 3)
+    fm.visualize()
+    assert capsys.readouterr().out == "zeta/\n  two/\n  one/\nalpha/\n"
+    fm.visualize(fm.memory_tree["zeta"], prefix="> ")
+    assert capsys.readouterr().out == "> two/\n> one/\n"
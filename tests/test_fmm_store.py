@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import qjson_agents.fmm_store as fs
+
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("QJSON_AGENTS_HOME", str(tmp_path))
+    fs._wal_drain()
+    fs._FMM_CACHE.clear()
+    yield tmp_path
+    fs._wal_drain()
+    fs._FMM_CACHE.clear()
+
+
+def _reload(agent_id: str) -> fs.PersistentFractalMemory:
+    fs._wal_drain()
+    fs._FMM_CACHE.clear()
+    return fs.PersistentFractalMemory(agent_id)
+
+
+def _run_child(home: Path, code: str) -> None:
+    env = os.environ.copy()
+    env["QJSON_AGENTS_HOME"] = str(home)
+    env["PYTHONPATH"] = str(REPO) + os.pathsep + env.get("PYTHONPATH", "")
+    r = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr
+
+
+def test_wal_replay_across_processes_and_atexit_flush(home: Path):
+    # The child never calls persist(); the atexit hook must drain the queue
+    _run_child(home, (
+        "from qjson_agents.fmm_store import PersistentFractalMemory as P\n"
+        "m = P('A')\n"
+        "for i in range(50):\n"
+        "    m.insert(['notes', 'x'], {'i': i})\n"
+    ))
+    wal = home / "A" / "fmm.wal.jsonl"
+    assert wal.exists()
+    assert not (home / "A" / "fmm.json").exists()
+    m = _reload("A")
+    assert [d["i"] for d in m.query(["notes", "x"])] == list(range(50))
+
+
+def test_compaction_at_threshold(home: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(fs, "_WAL_COMPACT_BYTES", 512)
+    m = fs.PersistentFractalMemory("B")
+    for i in range(200):
+        m.insert(["log"], {"i": i, "pad": "y" * 20})
+    m.persist()
+    assert (home / "B" / "fmm.json").exists()
+    wal = home / "B" / "fmm.wal.jsonl"
+    assert not wal.exists() or wal.stat().st_size <= 512 + 64
+    m = _reload("B")
+    assert [d["i"] for d in m.query(["log"])] == list(range(200))
+
+
+def test_touch_then_persist_rewrites_snapshot(home: Path):
+    m = fs.PersistentFractalMemory("C")
+    m.insert(["a", "b"], {"v": 1})
+    m.persist()
+    m.tree.setdefault("retrieval", {})["ivf"] = {"K": 4}
+    m.touch()
+    m.persist()
+    assert not (home / "C" / "fmm.wal.jsonl").exists()
+    snap = json.loads((home / "C" / "fmm.json").read_text(encoding="utf-8"))
+    assert snap["retrieval"] == {"ivf": {"K": 4}}
+    assert snap["a"]["b"]["__data__"] == [{"v": 1}]
+    m = _reload("C")
+    assert m.query(["a", "b"]) == [{"v": 1}]
+    assert "__wal__" not in m.tree
+
+
+def test_stale_wal_after_interrupted_compaction_is_not_replayed(home: Path):
+    m = fs.PersistentFractalMemory("D")
+    m.insert(["t"], {"i": 1})
+    m.persist()
+    wal = home / "D" / "fmm.wal.jsonl"
+    saved = home / "wal.copy"
+    shutil.copy(wal, saved)
+    m.compact()
+    # Simulate dying after os.replace but before the WAL unlink
+    shutil.copy(saved, wal)
+    m = _reload("D")
+    assert m.query(["t"]) == [{"i": 1}]
+    m.insert(["t"], {"i": 2})
+    m = _reload("D")
+    assert m.query(["t"]) == [{"i": 1}, {"i": 2}]
+
+
+def test_batched_defers_persist_until_outer_exit(home: Path, monkeypatch: pytest.MonkeyPatch):
+    calls = []
+    real_drain = fs._wal_drain
+    monkeypatch.setattr(fs, "_wal_drain", lambda: (calls.append(1), real_drain()))
+    m = fs.PersistentFractalMemory("E")
+    with m.batched():
+        m.insert(["x"], {"i": 1})
+        m.persist()
+        with m.batched():
+            m.insert(["x"], {"i": 2})
+            m.persist()
+        assert calls == []
+    assert calls == [1]
+    m = _reload("E")
+    assert m.query(["x"]) == [{"i": 1}, {"i": 2}]
@@ -0,0 +1,122 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import qjson_agents.fractal_codec as fc
+
+
+REPO = Path(__file__).resolve().parent.parent
+DOC = {"name": "Lila", "tags": ["a", "b"], "n": 3, "text": "héllo " * 40}
+
+
+@pytest.fixture
+def v1_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Seal as if cryptography were not installed
+    monkeypatch.setattr(fc, "Cipher", None)
+
+
+def test_v1_roundtrip(v1_only):
+    env = fc.fractal_encrypt(DOC, "pw")
+    assert env["format"] == fc.FORMAT_V1
+    assert len(env["blocks"]) == 9
+    assert fc.fractal_decrypt(env, "pw") == DOC
+
+
+def test_v1_wrong_passphrase(v1_only):
+    env = fc.fractal_encrypt(DOC, "pw")
+    with pytest.raises(ValueError, match="MAC mismatch"):
+        fc.fractal_decrypt(env, "nope")
+
+
+def test_bundled_v1_manifest_decrypts():
+    env = json.loads((REPO / "manifests" / "webcrawler.encoded.json").read_text(encoding="utf-8"))
+    assert env["format"] == fc.FORMAT_V1
+    plain = json.loads((REPO / "manifests" / "webcrawler.decoded.json").read_text(encoding="utf-8"))
+    assert fc.fractal_decrypt(env, "test") == plain
+
+
+def test_bytes_api_is_verbatim():
+    data = b'{"b": 1,  "a": [1, 2]}'
+    env = fc.fractal_encrypt_bytes(data, "pw")
+    assert env.endswith(b"\n")
+    assert fc.fractal_decrypt_bytes(env, "pw") == data
+    with pytest.raises(ValueError):
+        fc.fractal_encrypt_bytes(b"not json", "pw")
+
+
+def test_key_cache_skips_rederivation(monkeypatch: pytest.MonkeyPatch):
+    fc._KEY_CACHE.clear()
+    calls = []
+    real = fc.hashlib.pbkdf2_hmac
+    monkeypatch.setattr(fc.hashlib, "pbkdf2_hmac", lambda *a, **k: (calls.append(1), real(*a, **k))[1])
+    env = fc.fractal_encrypt(DOC, "pw")
+    fc.fractal_decrypt(env, "pw")
+    fc.fractal_decrypt(env, "pw")
+    assert len(calls) == 1
+    # A different passphrase for the same salt is a different cache entry
+    with pytest.raises(ValueError):
+        fc.fractal_decrypt(env, "other")
+    assert len(calls) == 2
+
+
+def test_key_cache_is_bounded(monkeypatch: pytest.MonkeyPatch):
+    fc._KEY_CACHE.clear()
+    monkeypatch.setattr(fc, "_KEY_CACHE_MAX", 4)
+    for i in range(10):
+        fc._pbkdf2_key("pw", bytes([i]) * 16, rounds=1)
+    assert len(fc._KEY_CACHE) == 4
+
+
+def test_v2_roundtrip():
+    pytest.importorskip("cryptography")
+    env = fc.fractal_encrypt(DOC, "pw")
+    assert env["format"] == fc.FORMAT_V2
+    assert len(env["blocks"]) == 9
+    assert fc.fractal_decrypt(env, "pw") == DOC
+    data = json.dumps(DOC).encode("utf-8")
+    assert fc.fractal_decrypt_bytes(fc.fractal_encrypt_bytes(data, "pw"), "pw") == data
+
+
+def test_v2_wrong_passphrase():
+    pytest.importorskip("cryptography")
+    env = fc.fractal_encrypt(DOC, "pw")
+    with pytest.raises(ValueError, match="MAC mismatch"):
+        fc.fractal_decrypt(env, "nope")
+
+
+def test_v1_envelopes_open_with_cryptography_installed(monkeypatch: pytest.MonkeyPatch):
+    pytest.importorskip("cryptography")
+    with monkeypatch.context() as m:
+        m.setattr(fc, "Cipher", None)
+        env = fc.fractal_encrypt(DOC, "pw")
+    assert env["format"] == fc.FORMAT_V1
+    assert fc.fractal_decrypt(env, "pw") == DOC
+
+
+def test_v2_envelope_without_cryptography_is_a_clear_error(monkeypatch: pytest.MonkeyPatch):
+    pytest.importorskip("cryptography")
+    env = fc.fractal_encrypt(DOC, "pw")
+    monkeypatch.setattr(fc, "Cipher", None)
+    with pytest.raises(ValueError, match="cryptography"):
+        fc.fractal_decrypt(env, "pw")
+
+
+def test_version_downgrade_and_upgrade_fail_the_mac(monkeypatch: pytest.MonkeyPatch):
+    pytest.importorskip("cryptography")
+    env = fc.fractal_encrypt(DOC, "pw")
+    with pytest.raises(ValueError, match="MAC mismatch"):
+        fc.fractal_decrypt({**env, "format": fc.FORMAT_V1}, "pw")
+    with monkeypatch.context() as m:
+        m.setattr(fc, "Cipher", None)
+        env1 = fc.fractal_encrypt(DOC, "pw")
+    with pytest.raises(ValueError, match="MAC mismatch"):
+        fc.fractal_decrypt({**env1, "format": fc.FORMAT_V2}, "pw")
+
+
+def test_tampered_block_fails_the_mac():
+    env = fc.fractal_encrypt(DOC, "pw")
+    blocks = list(env["blocks"])
+    blocks[0], blocks[1] = blocks[1], blocks[0]
+    with pytest.raises(ValueError, match="MAC mismatch"):
+        fc.fractal_decrypt({**env, "blocks": blocks}, "pw")
@@ -0,0 +1,45 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import qjson_agents.qjson_types as qt
+
+
+REPO = Path(__file__).resolve().parent.parent
+BASE = json.loads((REPO / "manifests" / "lila.json").read_text(encoding="utf-8"))
+
+
+def _write(p: Path, agent_id: str, ns: int) -> None:
+    p.write_text(json.dumps({**BASE, "agent_id": agent_id}), encoding="utf-8")
+    os.utime(p, ns=(ns, ns))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("QJSON_CACHE_DISABLE", raising=False)
+    monkeypatch.setattr(qt, "_PERSONA_CACHE_MAX", 2)
+    qt._PERSONA_CACHE.clear()
+    yield
+    qt._PERSONA_CACHE.clear()
+
+
+def test_rewritten_file_does_not_grow_the_cache(tmp_path: Path):
+    p = tmp_path / "a.json"
+    for i in range(10):
+        _write(p, f"A{i}", 1_000_000_000 * (i + 1))
+        assert qt._load_persona_file(p)["agent_id"] == f"A{i}"
+    assert len(qt._PERSONA_CACHE) == 2
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path: Path):
+    paths = [tmp_path / f"{n}.json" for n in "abc"]
+    for p in paths:
+        _write(p, p.stem, 1_000_000_000)
+    qt._load_persona_file(paths[0])
+    qt._load_persona_file(paths[1])
+    qt._load_persona_file(paths[0])  # a is now the most recent
+    qt._load_persona_file(paths[2])
+    cached = {k[0] for k in qt._PERSONA_CACHE}
+    assert cached == {str(paths[0]), str(paths[2])}
@@ -0,0 +1,82 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from qjson_agents import schema_validator as sv
+
+
+SCHEMAS = Path(__file__).resolve().parent.parent / "docs" / "schemas"
+
+# (schema file, valid instance, invalid instance, path reported for the invalid one)
+CASES = [
+    (
+        "fmm.schema.json",
+        {"chat": {"user": {"__data__": [{"ts": 1.0, "text": "hi"}]}}},
+        {"chat": {"__data__": [{"ts": "soon"}]}},
+        "chat.__data__.0.ts",
+    ),
+    (
+        "test_run.schema.json",
+        {"agent_id": "A", "start_ts": 0, "end_ts": 1, "elapsed_sec": 1, "counts": {}, "events": []},
+        {"agent_id": "A", "start_ts": 0, "end_ts": 1, "elapsed_sec": 1, "counts": {}, "events": {}},
+        "events",
+    ),
+    (
+        "cluster_run.schema.json",
+        {"agents": ["A"], "model": "m", "ticks": 1, "elapsed_sec": 1, "counts": {}, "events": []},
+        {"agents": ["A"], "model": "m", "ticks": 1, "elapsed_sec": 1, "counts": {}, "events": {}},
+        "events",
+    ),
+]
+
+
+def _schema(name: str) -> dict:
+    return json.loads((SCHEMAS / name).read_text(encoding="utf-8"))
+
+
+def _as_draft7(schema: dict) -> dict:
+    s = copy.deepcopy(schema)
+    s["$schema"] = "http://json-schema.org/draft-07/schema#"
+    s.pop("$id", None)
+    return s
+
+
+def _check(build, schema: dict, valid, invalid, path: str) -> None:
+    v = build(schema)
+    assert v is not None
+    assert v(valid) == []
+    errors = v(invalid)
+    assert errors
+    # "path: message" with the path printed once, not repeated in the message
+    assert errors[0].startswith(f"{path}: ")
+    assert "data." not in errors[0]
+
+
+@pytest.mark.parametrize("name,valid,invalid,path", CASES)
+def test_jsonschema_rs_backend(name, valid, invalid, path):
+    pytest.importorskip("jsonschema_rs")
+    _check(sv._rs_validator, _schema(name), valid, invalid, path)
+
+
+@pytest.mark.parametrize("name,valid,invalid,path", CASES)
+def test_reference_backend(name, valid, invalid, path):
+    pytest.importorskip("jsonschema")
+    _check(sv._reference_validator, _schema(name), valid, invalid, path)
+
+
+@pytest.mark.parametrize("name,valid,invalid,path", CASES)
+def test_fastjsonschema_backend(name, valid, invalid, path):
+    pytest.importorskip("fastjsonschema")
+    # Bundled schemas are 2020-12, which fastjsonschema does not implement
+    assert sv._fast_validator(_schema(name)) is None
+    _check(sv._fast_validator, _as_draft7(_schema(name)), valid, invalid, path)
+
+
+def test_compile_validator_picks_a_2020_12_capable_backend():
+    v = sv.compile_validator(_schema("test_run.schema.json"))
+    if v is None:
+        assert sv._backend("jsonschema_rs") is None and sv._backend("jsonschema") is None
+    else:
+        assert v({"agent_id": "A"})